@@ -1 +1 @@
-
+
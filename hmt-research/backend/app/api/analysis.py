@@ -1 +1,109 @@
-from fastapi import APIRouter; router = APIRouter()
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy import delete, select
+from typing import Literal, Optional
+import uuid
+from ..core.database import get_db, get_async_db
+from ..models.session import ThematicAnalysis
+from ..schemas.analysis import ThematicAnalysisResponse, AnalysisQueueResponse
+from ..services.auth import get_current_active_user, get_admin_user
+from ..services.analysis_worker import analysis_worker
+from ..services import analytics
+from ..services.rollups import experiment_summary, rebuild_rollups
+
+router = APIRouter()
+
+@router.post("/thematic/queue", response_model=AnalysisQueueResponse)
+async def queue_thematic_analysis(
+    retry_failed: bool = False,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_admin_user)
+):
+    """Queue unanalyzed transcripts now instead of waiting for the next poll.
+    
+    With retry_failed, analyses that previously failed are discarded so
+    their transcripts are picked up again.
+    """
+    if not analysis_worker.running:
+        raise HTTPException(status_code=400, detail="Thematic analysis worker is not enabled")
+    
+    requeued = 0
+    if retry_failed:
+        result = await db.execute(delete(ThematicAnalysis).where(ThematicAnalysis.status == "failed"))
+        await db.commit()
+        requeued = result.rowcount
+    return AnalysisQueueResponse(queued=await analysis_worker.enqueue_pending(), requeued_failed=requeued)
+
+@router.get("/responses/{response_id}/thematic", response_model=ThematicAnalysisResponse)
+async def get_thematic_analysis(
+    response_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    analysis = (await db.execute(
+        select(ThematicAnalysis).where(ThematicAnalysis.response_id == response_id)
+    )).scalar_one_or_none()
+    if not analysis:
+        raise HTTPException(status_code=404, detail="Thematic analysis not found")
+    return analysis
+
+@router.get("/options")
+def option_distribution(
+    experiment_id: Optional[uuid.UUID] = None,
+    scenario_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Option choice counts and shares per scenario variant"""
+    return analytics.option_distribution(db, experiment_id, scenario_id)
+
+@router.get("/ratings")
+def rating_histograms(
+    experiment_id: Optional[uuid.UUID] = None,
+    scenario_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Confidence and risk rating histograms"""
+    return analytics.rating_histograms(db, experiment_id, scenario_id)
+
+@router.get("/response-times")
+def response_time_percentiles(
+    experiment_id: Optional[uuid.UUID] = None,
+    scenario_id: Optional[uuid.UUID] = None,
+    group_by: Optional[Literal["scenario", "ai_alignment", "ai_autonomy"]] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Response-time percentiles, overall and optionally per scenario or AI condition"""
+    return analytics.response_time_percentiles(db, experiment_id, scenario_id, group_by)
+
+@router.get("/breakdown")
+def facet_breakdown(
+    by: Literal["ai_alignment", "ai_autonomy"],
+    experiment_id: Optional[uuid.UUID] = None,
+    scenario_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Choices, ratings and latency per AI alignment or autonomy condition"""
+    return analytics.facet_breakdown(db, by, experiment_id, scenario_id)
+
+@router.get("/experiments/{experiment_id}/summary")
+def get_experiment_summary(
+    experiment_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Per-scenario choices, rating mean/std and latency percentiles from the rollup tables"""
+    return experiment_summary(db, experiment_id)
+
+@router.post("/rollups/rebuild")
+def rebuild_experiment_rollups(
+    experiment_id: Optional[uuid.UUID] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_admin_user)
+):
+    """Recompute the rollup tables from stored responses, for one experiment or all"""
+    return {"rows_written": rebuild_rollups(db, experiment_id)}
@@ -1,158 +1,221 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
-from typing import List
-import json
-from ..core.database import get_db
-from ..models.user import User
-from ..schemas.auth import UserCreate, UserResponse, Token, UserUpdate, UserPreferences
-from ..services.auth import create_access_token, get_current_active_user, get_admin_user, ACCESS_TOKEN_EXPIRE_MINUTES
-
-router = APIRouter()
-
-@router.post("/register", response_model=UserResponse)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
-    # Check if user exists
-    if db.query(User).filter(User.email == user_data.email).first():
-        raise HTTPException(
-            status_code=400,
-            detail="Email already registered"
-        )
-    
-    # Create user
-    user = User(
-        email=user_data.email,
-        hashed_password=User.hash_password(user_data.password),
-        full_name=user_data.full_name,
-        role=user_data.role
-    )
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    
-    # Parse preferences
-    user.preferences = json.loads(user.preferences or '{}')
-    return user
-
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    """Login and get access token"""
-    user = db.query(User).filter(User.email == form_data.username).first()
-    
-    if not user or not user.verify_password(form_data.password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Update last login
-    user.last_login = datetime.utcnow()
-    db.commit()
-    
-    # Create token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": str(user.id)}, expires_delta=access_token_expires
-    )
-    
-    # Parse preferences
-    user.preferences = json.loads(user.preferences or '{}')
-    
-    return {
-        "access_token": access_token,
-        "token_type": "bearer",
-        "user": user
-    }
-
-@router.get("/me", response_model=UserResponse)
-def get_me(current_user: User = Depends(get_current_active_user)):
-    """Get current user info"""
-    current_user.preferences = json.loads(current_user.preferences or '{}')
-    return current_user
-
-@router.put("/me", response_model=UserResponse)
-def update_me(
-    user_update: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Update current user"""
-    if user_update.email and user_update.email != current_user.email:
-        # Check if new email is taken
-        if db.query(User).filter(User.email == user_update.email).first():
-            raise HTTPException(status_code=400, detail="Email already taken")
-        current_user.email = user_update.email
-    
-    if user_update.full_name is not None:
-        current_user.full_name = user_update.full_name
-    
-    if user_update.password:
-        current_user.hashed_password = User.hash_password(user_update.password)
-    
-    db.commit()
-    db.refresh(current_user)
-    current_user.preferences = json.loads(current_user.preferences or '{}')
-    return current_user
-
-@router.put("/me/preferences", response_model=UserResponse)
-def update_preferences(
-    preferences: UserPreferences,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
-):
-    """Update user preferences"""
-    current_user.preferences = json.dumps(preferences.dict())
-    db.commit()
-    db.refresh(current_user)
-    current_user.preferences = json.loads(current_user.preferences)
-    return current_user
-
-# Admin endpoints
-@router.get("/users", response_model=List[UserResponse])
-def list_users(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
-):
-    """List all users (admin only)"""
-    users = db.query(User).all()
-    for user in users:
-        user.preferences = json.loads(user.preferences or '{}')
-    return users
-
-@router.put("/users/{user_id}/toggle-active")
-def toggle_user_active(
-    user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
-):
-    """Enable/disable user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    user.is_active = not user.is_active
-    db.commit()
-    
-    return {"message": f"User {'activated' if user.is_active else 'deactivated'}"}
-
-@router.delete("/users/{user_id}")
-def delete_user(
-    user_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
-):
-    """Delete user (admin only)"""
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
-    if user.id == current_user.id:
-        raise HTTPException(status_code=400, detail="Cannot delete yourself")
-    
-    db.delete(user)
-    db.commit()
-    
-    return {"message": "User deleted"}
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timedelta
+from typing import List, Optional
+import json
+import uuid
+from ..core.database import get_async_db
+from ..core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, parse_fields
+from ..models.user import User
+from ..schemas.auth import UserCreate, UserResponse, Token, UserUpdate, UserPreferences, CurrentUser
+from ..services.auth import create_access_token, get_current_active_user, get_admin_user, invalidate_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..services.passwords import password_hasher
+
+router = APIRouter()
+
+async def _get_user_by_email(db: AsyncSession, email: str):
+    return (await db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+
+async def _get_user_or_404(db: AsyncSession, user_id: uuid.UUID) -> User:
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+@router.post("/register", response_model=UserResponse)
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    """Register a new user"""
+    # Check if user exists
+    if await _get_user_by_email(db, user_data.email):
+        raise HTTPException(
+            status_code=400,
+            detail="Email already registered"
+        )
+    
+    # Create user
+    user = User(
+        email=user_data.email,
+        hashed_password=await password_hasher.hash(user_data.password),
+        full_name=user_data.full_name,
+        role=user_data.role
+    )
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    
+    # Parse preferences
+    user.preferences = json.loads(user.preferences or '{}')
+    return user
+
+@router.post("/login", response_model=Token)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_async_db)):
+    """Login and get access token"""
+    user = await _get_user_by_email(db, form_data.username)
+    
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(form_data.password, user.hashed_password)
+    
+    if not verified:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    # Upgrade the stored hash when BCRYPT_ROUNDS has changed
+    if new_hash:
+        user.hashed_password = new_hash
+    
+    # Update last login
+    user.last_login = datetime.utcnow()
+    await db.commit()
+    
+    # Create token
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = create_access_token(
+        data={"sub": str(user.id)}, expires_delta=access_token_expires
+    )
+    
+    # Parse preferences
+    user.preferences = json.loads(user.preferences or '{}')
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": user
+    }
+
+@router.get("/me", response_model=UserResponse)
+async def get_me(current_user: CurrentUser = Depends(get_current_active_user)):
+    """Get current user info"""
+    current_user.preferences = json.loads(current_user.preferences or '{}')
+    return current_user
+
+@router.put("/me", response_model=UserResponse)
+async def update_me(
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Update current user"""
+    user = await _get_user_or_404(db, current_user.id)
+    
+    if user_update.email and user_update.email != user.email:
+        # Check if new email is taken
+        if await _get_user_by_email(db, user_update.email):
+            raise HTTPException(status_code=400, detail="Email already taken")
+        user.email = user_update.email
+    
+    if user_update.full_name is not None:
+        user.full_name = user_update.full_name
+    
+    if user_update.password:
+        user.hashed_password = await password_hasher.hash(user_update.password)
+    
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.id)
+    user.preferences = json.loads(user.preferences or '{}')
+    return user
+
+@router.put("/me/preferences", response_model=UserResponse)
+async def update_preferences(
+    preferences: UserPreferences,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_current_active_user)
+):
+    """Update user preferences"""
+    user = await _get_user_or_404(db, current_user.id)
+    user.preferences = json.dumps(preferences.dict())
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.id)
+    user.preferences = json.loads(user.preferences)
+    return user
+
+# Admin endpoints
+# Columns a list request may project with ?fields=
+USER_FIELDS = tuple(UserResponse.model_fields)
+
+@router.get("/users", response_model=List[UserResponse])
+async def list_users(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """List users, oldest first, one keyset page at a time (admin only).
+    
+    Pass the X-Next-Cursor response header back as ?cursor= for the next
+    page. ?fields= selects columns; preferences are only decoded when
+    they are selected.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        selected = parse_fields(fields, USER_FIELDS) or list(USER_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # The keyset columns are always loaded so the next cursor can be built
+    columns = dict.fromkeys(selected + ["created_at", "id"])
+    query = select(*[getattr(User, field) for field in columns])
+    if after:
+        query = query.where(tuple_(User.created_at, User.id) > after)
+    rows = (await db.execute(query.order_by(User.created_at, User.id).limit(limit + 1))).all()
+    
+    headers = {}
+    if len(rows) > limit:
+        rows = rows[:limit]
+        headers[NEXT_CURSOR_HEADER] = encode_cursor((rows[-1].created_at, rows[-1].id))
+    
+    body = []
+    for row in rows:
+        item = {field: getattr(row, field) for field in selected}
+        if "preferences" in item:
+            item["preferences"] = json.loads(item["preferences"] or '{}')
+        body.append(item)
+    
+    if fields:
+        return JSONResponse(jsonable_encoder(body), headers=headers)
+    response.headers.update(headers)
+    return body
+
+@router.put("/users/{user_id}/toggle-active")
+async def toggle_user_active(
+    user_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """Enable/disable user (admin only)"""
+    user = await _get_user_or_404(db, user_id)
+    
+    user.is_active = not user.is_active
+    await db.commit()
+    invalidate_user(user.id)
+    
+    return {"message": f"User {'activated' if user.is_active else 'deactivated'}"}
+
+@router.delete("/users/{user_id}")
+async def delete_user(
+    user_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: CurrentUser = Depends(get_admin_user)
+):
+    """Delete user (admin only)"""
+    user = await _get_user_or_404(db, user_id)
+    
+    if user.id == current_user.id:
+        raise HTTPException(status_code=400, detail="Cannot delete yourself")
+    
+    await db.delete(user)
+    await db.commit()
+    invalidate_user(user_id)
+    
+    return {"message": "User deleted"}
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+import os
+import uuid
+from ..core.database import get_db
+from ..core.pagination import decode_cursor, decode_watermark, encode_watermark
+from ..core.timeutils import utc_naive
+from ..models.job import ExportJob
+from ..models.session import Experiment
+from ..schemas.export import ExportJobCreate, ExportJobResponse, ChangeFeedResponse
+from ..services.auth import get_current_active_user
+from ..services.export import TraceExporter
+from ..services.change_feed import read_changes, watermark_after_keyset
+from ..services.bulk_export import bulk_exporter, format_available, output_kind, FILE_EXTENSIONS, MEDIA_TYPES
+
+router = APIRouter()
+
+def _get_job_or_404(db: Session, job_id: uuid.UUID) -> ExportJob:
+    job = db.query(ExportJob).filter(ExportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Export job not found")
+    return job
+
+@router.post("/", response_model=ExportJobResponse, status_code=202)
+def create_export_job(
+    job_data: ExportJobCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Queue a background JSONL or Parquet export of every session in an experiment and/or date range"""
+    if not format_available(job_data.format, job_data.compression):
+        raise HTTPException(status_code=400, detail=f"{job_data.format}/{job_data.compression} export is not installed")
+    if job_data.experiment_id and not db.query(Experiment.id).filter(Experiment.id == job_data.experiment_id).first():
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    job = ExportJob(
+        experiment_id=job_data.experiment_id,
+        start_date=utc_naive(job_data.start_date),
+        end_date=utc_naive(job_data.end_date),
+        format=job_data.format,
+        compression=job_data.compression,
+        created_by=current_user.id
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    bulk_exporter.submit(job.id)
+    return job
+
+@router.get("/changes", response_model=ChangeFeedResponse)
+def export_changes(
+    cursor: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=5000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Traces recorded since the cursor, across all sessions, oldest first.
+    
+    Omit the cursor to start from the beginning. Keep the returned
+    next_cursor and pass it on the next pull; while has_more is true
+    there are further pages ready now.
+    """
+    after = None
+    if cursor:
+        try:
+            after = decode_watermark(cursor)
+        except ValueError:
+            try:
+                # Cursors from when the feed was ordered by recorded_at still resume
+                after = watermark_after_keyset(db, decode_cursor(cursor))
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+    
+    traces, watermark, has_more = read_changes(TraceExporter(db), after, limit)
+    return {
+        "traces": traces,
+        "next_cursor": encode_watermark(watermark) if watermark else None,
+        "has_more": has_more
+    }
+
+@router.get("/{job_id}", response_model=ExportJobResponse)
+def get_export_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get export job status and progress"""
+    return _get_job_or_404(db, job_id)
+
+@router.get("/{job_id}/download")
+def download_export(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Download the file produced by a completed export job"""
+    job = _get_job_or_404(db, job_id)
+    if job.status != "completed" or not job.file_path or not os.path.exists(job.file_path):
+        raise HTTPException(status_code=409, detail=f"Export is {job.status}")
+    
+    kind = output_kind(job.format, job.compression)
+    return FileResponse(
+        job.file_path,
+        media_type=MEDIA_TYPES[kind],
+        filename=f"export_{job_id}{FILE_EXTENSIONS[kind]}"
+    )
@@ -1,116 +1,261 @@
-﻿from fastapi import APIRouter, Depends, UploadFile, File, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from ..core.database import get_db
-from ..models.scenario import Scenario
-from ..schemas.scenario import ScenarioCreate, ScenarioResponse, ScenarioImportResponse, ScenarioUpdate
-from ..services.scenario_import import ScenarioImporter
-from ..services.auth import get_current_active_user
-
-router = APIRouter()
-
-@router.get("/", response_model=List[ScenarioResponse])
-def list_scenarios(
-    skip: int = 0,
-    limit: int = 100,
-    category: str = None,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """List all scenarios with optional filtering"""
-    query = db.query(Scenario).filter(Scenario.is_active == True)
-    
-    if category:
-        query = query.filter(Scenario.category == category)
-    
-    scenarios = query.offset(skip).limit(limit).all()
-    return scenarios
-
-@router.post("/", response_model=ScenarioResponse)
-def create_scenario(
-    scenario: ScenarioCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Create a new scenario"""
-    db_scenario = Scenario(**scenario.dict())
-    db.add(db_scenario)
-    db.commit()
-    db.refresh(db_scenario)
-    return db_scenario
-
-@router.get("/{scenario_id}", response_model=ScenarioResponse)
-def get_scenario(
-    scenario_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Get a specific scenario"""
-    scenario = db.query(Scenario).filter(
-        Scenario.id == scenario_id,
-        Scenario.is_active == True
-    ).first()
-    
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    
-    return scenario
-
-@router.put("/{scenario_id}", response_model=ScenarioResponse)
-def update_scenario(
-    scenario_id: uuid.UUID,
-    scenario_update: ScenarioUpdate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Update a scenario"""
-    scenario = db.query(Scenario).filter(
-        Scenario.id == scenario_id,
-        Scenario.is_active == True
-    ).first()
-    
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    
-    update_data = scenario_update.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(scenario, field, value)
-    
-    db.commit()
-    db.refresh(scenario)
-    return scenario
-
-@router.delete("/{scenario_id}")
-def delete_scenario(
-    scenario_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Delete a scenario (soft delete)"""
-    scenario = db.query(Scenario).filter(
-        Scenario.id == scenario_id,
-        Scenario.is_active == True
-    ).first()
-    
-    if not scenario:
-        raise HTTPException(status_code=404, detail="Scenario not found")
-    
-    scenario.is_active = False
-    db.commit()
-    
-    return {"message": "Scenario deleted successfully"}
-
-@router.post("/import", response_model=ScenarioImportResponse)
-async def import_scenarios(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Import scenarios from JSON file"""
-    if not file.filename.endswith(".json"):
-        raise HTTPException(status_code=400, detail="Only JSON files are supported")
-    
-    importer = ScenarioImporter(db)
-    result = await importer.import_json_file(file, str(current_user.id))
-    return result
+﻿from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, Response, Header
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import datetime
+import uuid
+from ..core.database import get_db
+from ..core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor, parse_fields
+from ..models.scenario import Scenario
+from ..models.job import ImportJob
+from ..schemas.scenario import ScenarioCreate, ScenarioResponse, ImportJobResponse, ScenarioUpdate
+from ..services.bulk_import import bulk_importer
+from ..services.scenario_import import ImportParseError, check_document_start
+from ..services.auth import get_current_active_user
+from ..services.scenario_search import apply_search, facet_counts
+from ..services.scenario_cache import CachedPayload, get_or_build, invalidate_scenarios, serialize
+
+router = APIRouter()
+
+# Columns a list request may project with ?fields=
+SCENARIO_FIELDS = tuple(ScenarioResponse.model_fields)
+
+def _cached_response(payload: CachedPayload, if_none_match: Optional[str]) -> Response:
+    etag, body, extra_headers = payload
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **extra_headers}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/", response_model=List[ScenarioResponse])
+def list_scenarios(
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    category: str = None,
+    q: Optional[str] = None,
+    dominant_kdma: Optional[str] = None,
+    ai_alignment: Optional[str] = None,
+    ai_autonomy: Optional[str] = None,
+    fields: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """List active scenarios, oldest first, one keyset page at a time.
+    
+    Pass the X-Next-Cursor response header back as ?cursor= for the next
+    page; it is absent on the last page. ?q= is full-text search over
+    title, description, context and decision point (web search syntax);
+    dominant_kdma, ai_alignment and ai_autonomy filter on meta_data.
+    ?fields=id,title,category selects only those columns, e.g. for
+    catalog views. Pages are cached until the next scenario write and
+    honor If-None-Match. ?skip= is still accepted for older clients and
+    offsets from the cursor (or the start); the skipped rows are still
+    scanned, so new clients should follow the cursor instead.
+    """
+    facets = {"dominant_kdma": dominant_kdma, "ai_alignment": ai_alignment, "ai_autonomy": ai_autonomy}
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        selected = parse_fields(fields, SCENARIO_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def build():
+        if selected:
+            # The keyset columns are always loaded so the next cursor can be built
+            columns = dict.fromkeys(selected + ["created_at", "id"])
+            query = db.query(*[getattr(Scenario, field) for field in columns])
+        else:
+            query = db.query(Scenario)
+        query = apply_search(query, q, category, facets)
+        if after:
+            query = query.filter(tuple_(Scenario.created_at, Scenario.id) > after)
+        
+        rows = query.order_by(Scenario.created_at, Scenario.id).offset(skip).limit(limit + 1).all()
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers[NEXT_CURSOR_HEADER] = encode_cursor((rows[-1].created_at, rows[-1].id))
+        
+        if selected:
+            body = [{field: getattr(row, field) for field in selected} for row in rows]
+        else:
+            body = [ScenarioResponse.model_validate(row).model_dump() for row in rows]
+        return serialize(jsonable_encoder(body)), headers
+    
+    key = ("list", cursor, skip, limit, category, q, *facets.values(), tuple(selected or ()))
+    payload = get_or_build(key, build)
+    return _cached_response(payload, if_none_match)
+
+@router.get("/facets")
+def scenario_facets(
+    category: str = None,
+    q: Optional[str] = None,
+    dominant_kdma: Optional[str] = None,
+    ai_alignment: Optional[str] = None,
+    ai_autonomy: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Match counts per category and meta_data facet for the same filters as the list"""
+    facets = {"dominant_kdma": dominant_kdma, "ai_alignment": ai_alignment, "ai_autonomy": ai_autonomy}
+    
+    def build():
+        return serialize(facet_counts(db, q, category, facets)), {}
+    
+    payload = get_or_build(("facets", category, q, *facets.values()), build)
+    return _cached_response(payload, if_none_match)
+
+@router.post("/", response_model=ScenarioResponse)
+def create_scenario(
+    scenario: ScenarioCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Create a new scenario"""
+    db_scenario = Scenario(**scenario.dict())
+    db.add(db_scenario)
+    db.commit()
+    db.refresh(db_scenario)
+    invalidate_scenarios()
+    return db_scenario
+
+@router.get("/{scenario_id}", response_model=ScenarioResponse)
+def get_scenario(
+    scenario_id: uuid.UUID,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get a specific scenario, cached until the next scenario write"""
+    def build():
+        scenario = db.query(Scenario).filter(
+            Scenario.id == scenario_id,
+            Scenario.is_active == True
+        ).first()
+        if not scenario:
+            return None
+        return serialize(jsonable_encoder(ScenarioResponse.model_validate(scenario))), {}
+    
+    payload = get_or_build(("get", scenario_id), build)
+    if not payload:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    return _cached_response(payload, if_none_match)
+
+@router.put("/{scenario_id}", response_model=ScenarioResponse)
+def update_scenario(
+    scenario_id: uuid.UUID,
+    scenario_update: ScenarioUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Update a scenario"""
+    scenario = db.query(Scenario).filter(
+        Scenario.id == scenario_id,
+        Scenario.is_active == True
+    ).first()
+    
+    if not scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    update_data = scenario_update.dict(exclude_unset=True)
+    for field, value in update_data.items():
+        setattr(scenario, field, value)
+    
+    db.commit()
+    db.refresh(scenario)
+    invalidate_scenarios()
+    return scenario
+
+@router.delete("/{scenario_id}")
+def delete_scenario(
+    scenario_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Delete a scenario (soft delete)"""
+    scenario = db.query(Scenario).filter(
+        Scenario.id == scenario_id,
+        Scenario.is_active == True
+    ).first()
+    
+    if not scenario:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    
+    scenario.is_active = False
+    db.commit()
+    invalidate_scenarios()
+    
+    return {"message": "Scenario deleted successfully"}
+
+@router.post("/import", response_model=ImportJobResponse, status_code=202)
+def import_scenarios(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Queue a background import of a JSON or NDJSON (.jsonl/.ndjson) scenario file"""
+    if not file.filename.endswith((".json", ".jsonl", ".ndjson")):
+        raise HTTPException(status_code=400, detail="Only JSON and NDJSON files are supported")
+    
+    format = "json" if file.filename.endswith(".json") else "ndjson"
+    try:
+        check_document_start(file.file, ndjson=format == "ndjson")
+    except ImportParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    file.file.seek(0)
+    
+    job = ImportJob(
+        id=uuid.uuid4(),
+        filename=file.filename[:255],
+        format=format,
+        created_by=current_user.id
+    )
+    job.file_path = bulk_importer.spool(job.id, file.file)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    bulk_importer.submit(job.id)
+    return job
+
+def _get_import_job_or_404(db: Session, job_id: uuid.UUID) -> ImportJob:
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+@router.get("/import/{job_id}", response_model=ImportJobResponse)
+def get_import_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get import job status and progress"""
+    return _get_import_job_or_404(db, job_id)
+
+@router.post("/import/{job_id}/cancel", response_model=ImportJobResponse)
+def cancel_import_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Cancel an import; batches already committed are kept"""
+    job = _get_import_job_or_404(db, job_id)
+    # Conditional updates so a job finishing concurrently isn't overwritten
+    db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.status == "queued").update(
+        {"status": "cancelled", "finished_at": datetime.utcnow()}, synchronize_session=False
+    )
+    db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.status == "running").update(
+        {"status": "cancelling"}, synchronize_session=False
+    )
+    db.commit()
+    db.refresh(job)
+    
+    if job.status not in ("cancelled", "cancelling"):
+        raise HTTPException(status_code=409, detail=f"Import is {job.status}")
+    return job
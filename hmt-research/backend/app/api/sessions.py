@@ -1,130 +1,476 @@
-﻿from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from typing import List
-import uuid
-from datetime import datetime
-from ..core.database import get_db
-from ..models.session import Session as SessionModel, Experiment, ScenarioResponse
-from ..models.scenario import Scenario
-from ..schemas.session import SessionCreate, SessionResponse, ScenarioResponseCreate, ExperimentCreate
-from ..services.export import TraceExporter
-from ..services.auth import get_current_active_user
-
-router = APIRouter()
-
-@router.post("/experiments", response_model=dict)
-def create_experiment(
-    experiment: ExperimentCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Create a new experiment"""
-    scenario_sequence_str = [str(sid) for sid in experiment.scenario_sequence]
-    
-    db_experiment = Experiment(
-        name=experiment.name,
-        description=experiment.description,
-        scenario_sequence=scenario_sequence_str,
-        config=experiment.config
-    )
-    db.add(db_experiment)
-    db.commit()
-    db.refresh(db_experiment)
-    return {"id": str(db_experiment.id), "name": db_experiment.name}
-
-@router.post("/", response_model=SessionResponse)
-def create_session(
-    session_data: SessionCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Start a new session"""
-    session = SessionModel(**session_data.dict())
-    db.add(session)
-    db.commit()
-    db.refresh(session)
-    return session
-
-@router.get("/{session_id}/next-scenario")
-def get_next_scenario(
-    session_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Get the next scenario in the sequence"""
-    session = db.query(SessionModel).filter_by(id=session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    experiment = session.experiment
-    if not experiment:
-        raise HTTPException(status_code=404, detail="Experiment not found")
-    
-    completed = db.query(ScenarioResponse).filter_by(session_id=session_id).count()
-    
-    if completed < len(experiment.scenario_sequence):
-        scenario_id = experiment.scenario_sequence[completed]
-        if isinstance(scenario_id, str):
-            scenario_id = uuid.UUID(scenario_id)
-        
-        scenario = db.query(Scenario).filter_by(id=scenario_id).first()
-        
-        if scenario:
-            return {
-                "step_number": completed + 1,
-                "total_steps": len(experiment.scenario_sequence),
-                "scenario": {
-                    "id": str(scenario.id),
-                    "title": scenario.title,
-                    "context": scenario.context,
-                    "decision_point": scenario.decision_point,
-                    "options": scenario.options
-                }
-            }
-    
-    return {"message": "No more scenarios", "completed": True}
-
-@router.post("/{session_id}/responses")
-def submit_response(
-    session_id: uuid.UUID,
-    scenario_id: uuid.UUID,
-    response_data: ScenarioResponseCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Submit a response to a scenario"""
-    step_number = db.query(ScenarioResponse).filter_by(session_id=session_id).count() + 1
-    
-    response = ScenarioResponse(
-        session_id=session_id,
-        scenario_id=scenario_id,
-        step_number=step_number,
-        presented_at=datetime.utcnow(),
-        responded_at=datetime.utcnow(),
-        **response_data.dict()
-    )
-    
-    db.add(response)
-    db.commit()
-    
-    return {"message": "Response recorded", "step": step_number}
-
-@router.get("/{session_id}/export/jsonl")
-def export_session_jsonl(
-    session_id: uuid.UUID,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_active_user)
-):
-    """Export session as KDMA-enriched JSONL"""
-    exporter = TraceExporter(db)
-    try:
-        jsonl_data = exporter.export_session_to_jsonl(str(session_id))
-        return Response(
-            content=jsonl_data,
-            media_type="application/x-ndjson",
-            headers={
-                "Content-Disposition": f"attachment; filename=session_{session_id}.jsonl"
-            }
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
+﻿from fastapi import APIRouter, Depends, HTTPException, Response, Header, UploadFile, File, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+from sqlalchemy import insert, null, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
+import os
+import tempfile
+import uuid
+from datetime import datetime
+from ..core.database import get_db, get_async_db
+from ..core.timeutils import utc_naive
+from ..models.session import Session as SessionModel, Experiment, ScenarioResponse
+from ..models.scenario import Scenario
+from ..models.job import TranscriptionJob
+from ..schemas.session import (
+    SessionCreate, SessionResponse, ScenarioResponseCreate, ScenarioResponseBatch, ExperimentCreate,
+    TranscriptionJobResponse
+)
+from ..services.export import TraceExporter
+from ..services.columnar_export import ParquetTraceWriter, parquet_available
+from ..services.auth import get_current_user, get_current_active_user
+from ..services.session_cursor import get_scenario_sequence, read_cursor, advance_cursor, finish_session, find_recorded_steps
+from ..services.experiment_bundle import build_experiment_bundle
+from ..services.transcription import transcriber, AUDIO_EXTENSIONS
+from ..services.rollups import record_responses
+from ..services.presentation_log import presentation_log
+from ..services.live_events import live_events, session_event
+
+router = APIRouter()
+
+@router.post("/experiments", response_model=dict)
+def create_experiment(
+    experiment: ExperimentCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Create a new experiment"""
+    scenario_sequence_str = [str(sid) for sid in experiment.scenario_sequence]
+    
+    db_experiment = Experiment(
+        name=experiment.name,
+        description=experiment.description,
+        scenario_sequence=scenario_sequence_str,
+        config=experiment.config
+    )
+    db.add(db_experiment)
+    db.commit()
+    db.refresh(db_experiment)
+    return {"id": str(db_experiment.id), "name": db_experiment.name}
+
+@router.get("/experiments/{experiment_id}/bundle")
+async def get_experiment_bundle(
+    experiment_id: uuid.UUID,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get every scenario of an experiment in sequence order for client-side stepping"""
+    bundle = await build_experiment_bundle(db, experiment_id)
+    if not bundle:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    etag, body = bundle
+    
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/", response_model=SessionResponse)
+async def create_session(
+    session_data: SessionCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Start a new session"""
+    session = SessionModel(**session_data.dict())
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    await live_events.publish(session_event(
+        "session_started", session.id, session.experiment_id,
+        participant_id=session.participant_id, operator_id=session.operator_id
+    ))
+    return session
+
+@router.get("/{session_id}/next-scenario")
+async def get_next_scenario(
+    session_id: uuid.UUID,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get the next scenario in the sequence"""
+    cursor = await read_cursor(db, session_id)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Session not found")
+    completed, experiment_id = cursor
+    
+    sequence = await get_scenario_sequence(db, experiment_id) if experiment_id else None
+    if sequence is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    if completed < len(sequence):
+        scenario = await db.get(Scenario, sequence[completed])
+        
+        if scenario:
+            presentation_log.record(session_id, completed + 1, scenario.id)
+            await live_events.publish(session_event(
+                "step_advanced", session_id, experiment_id,
+                step_number=completed + 1, total_steps=len(sequence), scenario_id=scenario.id, title=scenario.title
+            ))
+            return {
+                "step_number": completed + 1,
+                "total_steps": len(sequence),
+                "experiment_id": str(experiment_id),
+                "scenario": {
+                    "id": str(scenario.id),
+                    "title": scenario.title,
+                    "context": scenario.context,
+                    "decision_point": scenario.decision_point,
+                    "options": scenario.options
+                }
+            }
+    
+    return {"message": "No more scenarios", "completed": True}
+
+@router.post("/{session_id}/steps/{step_number}/presented")
+async def mark_step_presented(
+    session_id: uuid.UUID,
+    step_number: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Record that a client stepping through the bundle is showing a step.
+    
+    The bundle counterpart of next-scenario: it starts the server clock
+    for the step's response time and tells live observers.
+    """
+    cursor = await read_cursor(db, session_id)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Session not found")
+    experiment_id = cursor[1]
+    
+    sequence = await get_scenario_sequence(db, experiment_id) if experiment_id else None
+    if sequence is None:
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    if not 1 <= step_number <= len(sequence):
+        raise HTTPException(status_code=404, detail="Step not found")
+    
+    scenario_id = sequence[step_number - 1]
+    presented_at = presentation_log.record(session_id, step_number, scenario_id)
+    title = await db.scalar(select(Scenario.title).where(Scenario.id == scenario_id))
+    await live_events.publish(session_event(
+        "step_advanced", session_id, experiment_id,
+        step_number=step_number, total_steps=len(sequence), scenario_id=scenario_id, title=title
+    ))
+    return {"step_number": step_number, "presented_at": presented_at.isoformat() + "Z"}
+
+@router.post("/{session_id}/responses")
+async def submit_response(
+    session_id: uuid.UUID,
+    scenario_id: uuid.UUID,
+    response_data: ScenarioResponseCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Submit a response to a scenario"""
+    responded_at = datetime.utcnow()
+    if response_data.idempotency_key:
+        # Lock the session row first, so a retry racing the original waits
+        # for it to commit and then finds its step instead of inserting twice
+        if not await read_cursor(db, session_id, for_update=True):
+            raise HTTPException(status_code=404, detail="Session not found")
+        recorded = await find_recorded_steps(db, session_id, [response_data.idempotency_key])
+        if recorded:
+            await db.rollback()
+            return {"message": "Response already recorded", "step": recorded[response_data.idempotency_key]}
+    
+    cursor = await advance_cursor(db, session_id)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Session not found")
+    step_number, experiment_id = cursor
+    
+    sequence = await get_scenario_sequence(db, experiment_id) if experiment_id else None
+    if sequence is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    # A duplicate or out-of-order submit must not consume the next step
+    if step_number > len(sequence) or sequence[step_number - 1] != scenario_id:
+        await db.rollback()
+        raise HTTPException(status_code=409, detail="Response does not match the current step")
+    
+    # Latency is only known if next-scenario served this step; otherwise both stay null
+    # (null() rather than None, which would let the column default fill in now)
+    presented_at = await presentation_log.presented_at(db, session_id, step_number)
+    response = ScenarioResponse(
+        session_id=session_id,
+        scenario_id=scenario_id,
+        step_number=step_number,
+        presented_at=presented_at or null(),
+        responded_at=responded_at,
+        response_time_ms=max(int((responded_at - presented_at).total_seconds() * 1000), 0) if presented_at else None,
+        **response_data.dict()
+    )
+    
+    db.add(response)
+    submitted = {
+        "step_number": step_number,
+        "scenario_id": scenario_id,
+        "response_time_ms": response.response_time_ms,
+        **response_data.dict(include={"selected_option", "confidence_rating", "risk_rating"})
+    }
+    await record_responses(db, experiment_id, [submitted])
+    if step_number == len(sequence):
+        await finish_session(db, session_id, responded_at)
+    await db.commit()
+    
+    await _publish_responses(session_id, experiment_id, len(sequence), [submitted])
+    return {"message": "Response recorded", "step": step_number}
+
+@router.post("/{session_id}/responses/batch")
+async def submit_responses_batch(
+    session_id: uuid.UUID,
+    batch: ScenarioResponseBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Submit queued responses in step order; retried items are skipped by idempotency key"""
+    # Lock the session row so concurrent flushes from the same device serialize
+    cursor = await read_cursor(db, session_id, for_update=True)
+    if not cursor:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    recorded = await find_recorded_steps(db, session_id, [item.idempotency_key for item in batch.responses])
+    new_items = []
+    for item in batch.responses:
+        if item.idempotency_key not in recorded:
+            recorded[item.idempotency_key] = None
+            new_items.append(item)
+    
+    duplicates = len(batch.responses) - len(new_items)
+    if not new_items:
+        await db.rollback()
+        return {"message": "Responses recorded", "recorded": 0, "duplicates": duplicates, "step": cursor[0]}
+    
+    last_step, experiment_id = await advance_cursor(db, session_id, len(new_items))
+    sequence = await get_scenario_sequence(db, experiment_id) if experiment_id else None
+    if sequence is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="Experiment not found")
+    
+    first_step = last_step - len(new_items) + 1
+    now = datetime.utcnow()
+    rows = []
+    for step_number, item in enumerate(new_items, start=first_step):
+        if step_number > len(sequence) or sequence[step_number - 1] != item.scenario_id:
+            await db.rollback()
+            raise HTTPException(
+                status_code=409,
+                detail=f"Response {item.idempotency_key} does not match step {step_number}"
+            )
+        
+        # The server clock only times the newest item: earlier ones sat in the
+        # client's queue, so their arrival says nothing about when they were answered
+        presented_at = await presentation_log.presented_at(db, session_id, step_number) if step_number == last_step else None
+        rows.append({
+            "id": uuid.uuid4(),
+            "session_id": session_id,
+            "scenario_id": item.scenario_id,
+            "step_number": step_number,
+            # The participant's own timeline, as reported
+            "presented_at": utc_naive(item.presented_at),
+            "responded_at": utc_naive(item.responded_at) or now,
+            "response_time_ms": max(int((now - presented_at).total_seconds() * 1000), 0) if presented_at else None,
+            **item.dict(include={
+                "selected_option", "custom_response", "confidence_rating", "risk_rating",
+                "think_aloud_transcript", "idempotency_key", "client_response_time_ms"
+            })
+        })
+    
+    # Core insert: the ORM would replace a None presented_at with the column default
+    await db.execute(insert(ScenarioResponse.__table__), rows)
+    await record_responses(db, experiment_id, rows)
+    if last_step == len(sequence):
+        await finish_session(db, session_id, now)
+    await db.commit()
+    
+    await _publish_responses(session_id, experiment_id, len(sequence), rows)
+    return {"message": "Responses recorded", "recorded": len(rows), "duplicates": duplicates, "step": last_step}
+
+async def _publish_responses(session_id: uuid.UUID, experiment_id: uuid.UUID, total_steps: int, rows: List[dict]):
+    """Tell live observers about committed responses, and that the session ended if the last step was among them"""
+    events = [
+        session_event(
+            "response_submitted", session_id, experiment_id,
+            total_steps=total_steps,
+            **{key: row[key] for key in (
+                "step_number", "scenario_id", "selected_option", "confidence_rating", "risk_rating", "response_time_ms"
+            )}
+        )
+        for row in rows
+    ]
+    if rows and rows[-1]["step_number"] == total_steps:
+        events.append(session_event("session_ended", session_id, experiment_id, total_steps=total_steps))
+    await live_events.publish_many(events)
+
+@router.websocket("/live")
+async def live_session_events(
+    websocket: WebSocket,
+    token: str,
+    session_id: Optional[uuid.UUID] = None,
+    experiment_id: Optional[uuid.UUID] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Push session events to an observer, for one session, one experiment or all.
+    
+    Browsers can't set headers on a WebSocket, so the bearer token is a
+    query parameter. The first message is a snapshot of the sessions in
+    scope (active ones, or the requested session); every later message
+    is one event published by services.live_events. The subscription is
+    taken before the snapshot is read, so an event committed meanwhile
+    is delivered after it rather than lost; at worst an observer sees a
+    step it already has.
+    """
+    try:
+        await get_current_active_user(await get_current_user(token, db))
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    subscription = live_events.subscribe(session_id=session_id, experiment_id=experiment_id)
+    sender = None
+    try:
+        query = select(SessionModel)
+        if session_id:
+            query = query.where(SessionModel.id == session_id)
+        else:
+            query = query.where(SessionModel.status == "active")
+            if experiment_id:
+                query = query.where(SessionModel.experiment_id == experiment_id)
+        sessions = (await db.execute(query.order_by(SessionModel.start_time))).scalars().all()
+        snapshot = []
+        for session in sessions:
+            sequence = await get_scenario_sequence(db, session.experiment_id) if session.experiment_id else None
+            snapshot.append({
+                "session_id": str(session.id),
+                "experiment_id": str(session.experiment_id) if session.experiment_id else None,
+                "participant_id": session.participant_id,
+                "operator_id": session.operator_id,
+                "status": session.status,
+                "step_number": session.current_step,
+                "total_steps": len(sequence) if sequence else None,
+            })
+        # Don't hold a pooled connection for as long as the socket stays open
+        await db.close()
+        
+        await websocket.accept()
+        
+        async def forward():
+            await websocket.send_json({"type": "snapshot", "sessions": snapshot})
+            while True:
+                await websocket.send_json(await subscription.get())
+        
+        sender = asyncio.create_task(forward())
+        # Observers don't send anything; receiving is how a disconnect is noticed
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if sender is not None:
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+        live_events.unsubscribe(subscription)
+
+@router.post("/{session_id}/responses/{response_id}/audio", response_model=TranscriptionJobResponse, status_code=202)
+def upload_response_audio(
+    session_id: uuid.UUID,
+    response_id: uuid.UUID,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Queue transcription of a think-aloud recording into the response's transcript"""
+    extension = os.path.splitext(file.filename or "")[1].lower()
+    if extension not in AUDIO_EXTENSIONS:
+        raise HTTPException(status_code=400, detail=f"Supported audio formats: {', '.join(AUDIO_EXTENSIONS)}")
+    
+    response = db.query(ScenarioResponse.id).filter(
+        ScenarioResponse.id == response_id, ScenarioResponse.session_id == session_id
+    ).first()
+    if not response:
+        raise HTTPException(status_code=404, detail="Response not found")
+    
+    job = TranscriptionJob(
+        id=uuid.uuid4(),
+        response_id=response_id,
+        filename=file.filename[:255],
+        created_by=current_user.id
+    )
+    job.file_path = transcriber.spool(job.id, file.file, extension)
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    
+    transcriber.submit(job.id)
+    return job
+
+@router.get("/transcriptions/{job_id}", response_model=TranscriptionJobResponse)
+def get_transcription_job(
+    job_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Get transcription job status and segment progress"""
+    job = db.query(TranscriptionJob).filter(TranscriptionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Transcription job not found")
+    return job
+
+@router.get("/{session_id}/export/jsonl")
+def export_session_jsonl(
+    session_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Export session as KDMA-enriched JSONL"""
+    exporter = TraceExporter(db)
+    try:
+        lines = exporter.stream_session_jsonl(str(session_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    return StreamingResponse(
+        lines,
+        media_type="application/x-ndjson",
+        headers={
+            "Content-Disposition": f"attachment; filename=session_{session_id}.jsonl"
+        }
+    )
+
+@router.get("/{session_id}/export/parquet")
+def export_session_parquet(
+    session_id: uuid.UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_active_user)
+):
+    """Export session traces as typed, zstd-compressed Parquet"""
+    if not parquet_available():
+        raise HTTPException(status_code=400, detail="Parquet export is not installed")
+    
+    exporter = TraceExporter(db)
+    try:
+        traces = exporter.iter_session_traces(str(session_id))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    
+    # Parquet's footer is written last, so build the file before sending it
+    fd, path = tempfile.mkstemp(suffix=".parquet")
+    os.close(fd)
+    try:
+        with ParquetTraceWriter(path) as writer:
+            writer.write_traces(traces)
+    except Exception:
+        os.remove(path)
+        raise
+    
+    return FileResponse(
+        path,
+        media_type="application/vnd.apache.parquet",
+        filename=f"session_{session_id}.parquet",
+        background=BackgroundTask(os.remove, path)
+    )
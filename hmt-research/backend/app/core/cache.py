@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+class TTLCache:
+    """Bounded in-process cache with per-entry expiry and LRU eviction"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
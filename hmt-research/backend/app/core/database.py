@@ -1,15 +1,61 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from .config import settings
-
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker
+from .config import settings
+
+POOL_OPTIONS = {
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE,
+    "pool_pre_ping": settings.DB_POOL_PRE_PING,
+}
+
+def _async_database_url() -> str:
+    """Use the asyncpg driver for the same database unless overridden"""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    url = settings.DATABASE_URL
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+engine = create_engine(settings.DATABASE_URL, **POOL_OPTIONS)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = create_async_engine(_async_database_url(), **POOL_OPTIONS)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+Base = declarative_base()
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _pool_status(pool) -> dict:
+    checked_out = pool.checkedout()
+    capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": pool.overflow(),
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+def get_pool_status() -> dict:
+    """Connection pool usage for the sync and async engines"""
+    return {
+        "sync": _pool_status(engine.pool),
+        "async": _pool_status(async_engine.sync_engine.pool),
+    }
@@ -0,0 +1,60 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+# Response header carrying the cursor for the next page of a list endpoint
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+Keyset = Tuple[datetime, uuid.UUID]
+# Change-feed position: (writing transaction id, row id)
+Watermark = Tuple[int, uuid.UUID]
+
+def _encode(payload: dict) -> str:
+    encoded = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(encoded.encode()).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    return payload
+
+def encode_cursor(keyset: Keyset) -> str:
+    """Opaque, URL-safe token for a (timestamp, id) keyset position"""
+    timestamp, row_id = keyset
+    return _encode({"t": timestamp.isoformat(), "id": str(row_id)})
+
+def decode_cursor(cursor: str) -> Keyset:
+    try:
+        payload = _decode(cursor)
+        return datetime.fromisoformat(payload["t"]), uuid.UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def encode_watermark(watermark: Watermark) -> str:
+    """Opaque, URL-safe token for a change-feed position"""
+    xid, row_id = watermark
+    return _encode({"x": xid, "id": str(row_id)})
+
+def decode_watermark(cursor: str) -> Watermark:
+    try:
+        payload = _decode(cursor)
+        if not isinstance(payload["x"], int):
+            raise ValueError("Invalid cursor")
+        return payload["x"], uuid.UUID(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def parse_fields(fields: Optional[str], allowed: Sequence[str]) -> Optional[List[str]]:
+    """Split a comma-separated ?fields= value, keeping the allowed order"""
+    if not fields:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    unknown = requested - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [field for field in allowed if field in requested]
@@ -0,0 +1,8 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+def utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+    """Store client timestamps as naive UTC like the rest of the schema"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
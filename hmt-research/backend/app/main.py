@@ -1,65 +1,136 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
-from .core.config import settings
-from .api import scenarios, sessions, analysis, auth
-from .core.database import engine
-from .models import scenario, session, user
-
-# Create tables
-scenario.Base.metadata.create_all(bind=engine)
-session.Base.metadata.create_all(bind=engine)
-user.Base.metadata.create_all(bind=engine)
-
-app = FastAPI(
-    title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
-)
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Routers
-app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
-app.include_router(scenarios.router, prefix=f"{settings.API_V1_STR}/scenarios", tags=["scenarios"])
-app.include_router(sessions.router, prefix=f"{settings.API_V1_STR}/sessions", tags=["sessions"])
-app.include_router(analysis.router, prefix=f"{settings.API_V1_STR}/analysis", tags=["analysis"])
-
-@app.get("/")
-async def root():
-    return {"message": "HMT Research Platform API", "version": "1.0.0"}
-
-@app.get("/health")
-async def health_check():
-    return {"status": "healthy", "environment": settings.ENVIRONMENT}
-
-# Create default admin user on startup
-from sqlalchemy.orm import Session
-from .core.database import SessionLocal
-from .models.user import User
-
-def init_db():
-    db = SessionLocal()
-    try:
-        # Check if admin exists
-        admin = db.query(User).filter(User.email == "admin@hmt.local").first()
-        if not admin:
-            admin = User(
-                email="admin@hmt.local",
-                hashed_password=User.hash_password("admin123"),
-                full_name="Administrator",
-                role="admin"
-            )
-            db.add(admin)
-            db.commit()
-            print("Default admin user created: admin@hmt.local / admin123")
-    finally:
-        db.close()
-
-# Initialize database
-init_db()
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from .core.config import settings
+from .core.pagination import NEXT_CURSOR_HEADER
+from .api import scenarios, sessions, analysis, auth, exports
+from .core.database import engine, async_engine, get_pool_status
+from .services.passwords import password_hasher
+from .services import scenario_cache
+from .services.bulk_export import bulk_exporter
+from .services.bulk_import import bulk_importer
+from .services.transcription import transcriber
+from .services.analysis_worker import analysis_worker
+from .services.analysis_cache import analysis_cache
+from .services.presentation_log import presentation_log
+from .services.live_events import live_events
+from .models import scenario, session, user, job, rollup
+
+# Create tables
+scenario.Base.metadata.create_all(bind=engine)
+session.Base.metadata.create_all(bind=engine)
+user.Base.metadata.create_all(bind=engine)
+job.Base.metadata.create_all(bind=engine)
+rollup.Base.metadata.create_all(bind=engine)
+
+app = FastAPI(
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+)
+
+# CORS
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
+)
+
+# Routers
+app.include_router(auth.router, prefix=f"{settings.API_V1_STR}/auth", tags=["auth"])
+app.include_router(scenarios.router, prefix=f"{settings.API_V1_STR}/scenarios", tags=["scenarios"])
+app.include_router(sessions.router, prefix=f"{settings.API_V1_STR}/sessions", tags=["sessions"])
+app.include_router(analysis.router, prefix=f"{settings.API_V1_STR}/analysis", tags=["analysis"])
+app.include_router(exports.router, prefix=f"{settings.API_V1_STR}/exports", tags=["exports"])
+
+@app.get("/")
+async def root():
+    return {"message": "HMT Research Platform API", "version": "1.0.0"}
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy", "environment": settings.ENVIRONMENT}
+
+@app.get("/health/db")
+async def db_pool_status():
+    """Connection pool saturation for operators"""
+    return get_pool_status()
+
+@app.get("/health/password-hashing")
+async def password_hashing_status():
+    """Password hashing pool queue depth and throughput"""
+    return password_hasher.stats()
+
+@app.get("/health/scenario-cache")
+async def scenario_cache_status():
+    """Scenario catalog cache size and hit rate"""
+    return scenario_cache.stats()
+
+@app.get("/health/thematic-analysis")
+async def thematic_analysis_status():
+    """Analysis worker queue depth, retries and throughput"""
+    return analysis_worker.stats()
+
+@app.get("/health/analysis-cache")
+async def analysis_cache_status():
+    """Thematic analysis cache hit rate"""
+    return analysis_cache.stats()
+
+@app.get("/health/presentation-log")
+async def presentation_log_status():
+    """Buffered presentation events and submit lookup misses"""
+    return presentation_log.stats()
+
+@app.get("/health/live-events")
+async def live_events_status():
+    """Live session observers and event fan-out counts"""
+    return live_events.stats()
+
+@app.on_event("startup")
+async def startup():
+    bulk_exporter.recover()
+    bulk_importer.recover()
+    transcriber.recover()
+    presentation_log.start()
+    await live_events.start()
+    if settings.ANALYSIS_WORKER_ENABLED:
+        analysis_worker.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await analysis_worker.stop()
+    await presentation_log.stop()
+    await live_events.stop()
+    await async_engine.dispose()
+    engine.dispose()
+    password_hasher.shutdown()
+    bulk_exporter.shutdown()
+    bulk_importer.shutdown()
+    transcriber.shutdown()
+
+# Create default admin user on startup
+from sqlalchemy.orm import Session
+from .core.database import SessionLocal
+from .models.user import User
+
+def init_db():
+    db = SessionLocal()
+    try:
+        # Check if admin exists
+        admin = db.query(User).filter(User.email == "admin@hmt.local").first()
+        if not admin:
+            admin = User(
+                email="admin@hmt.local",
+                hashed_password=User.hash_password("admin123"),
+                full_name="Administrator",
+                role="admin"
+            )
+            db.add(admin)
+            db.commit()
+            print("Default admin user created: admin@hmt.local / admin123")
+    finally:
+        db.close()
+
+# Initialize database
+init_db()
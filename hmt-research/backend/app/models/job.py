@@ -0,0 +1,61 @@
+from sqlalchemy import Column, String, Text, DateTime, Integer, BigInteger, ForeignKey, JSON
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from ..core.database import Base
+
+class ExportJob(Base):
+    __tablename__ = "export_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    experiment_id = Column(UUID(as_uuid=True), ForeignKey("experiments.id"))
+    start_date = Column(DateTime)
+    end_date = Column(DateTime)
+    format = Column(String(10), nullable=False, default="jsonl")  # "jsonl" or "parquet"
+    compression = Column(String(10), nullable=False, default="gzip")  # "gzip" or "zstd"
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    total_sessions = Column(Integer, nullable=False, default=0)
+    completed_sessions = Column(Integer, nullable=False, default=0)
+    file_path = Column(Text)
+    file_size = Column(BigInteger)
+    error = Column(Text)
+    created_by = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class ImportJob(Base):
+    __tablename__ = "import_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    filename = Column(String(255), nullable=False)
+    format = Column(String(10), nullable=False, default="json")  # "json" or "ndjson"
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, cancelling, cancelled, completed, failed
+    items_parsed = Column(Integer, nullable=False, default=0)
+    items_inserted = Column(Integer, nullable=False, default=0)  # Scenarios inserted or updated; variants expand one item into several
+    items_unchanged = Column(Integer, nullable=False, default=0)  # Re-imported scenarios skipped by content hash
+    items_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(JSON, default=[])
+    file_path = Column(Text)  # Spooled upload, removed once the job finishes
+    error = Column(Text)
+    created_by = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class TranscriptionJob(Base):
+    __tablename__ = "transcription_jobs"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    response_id = Column(UUID(as_uuid=True), ForeignKey("scenario_responses.id"), nullable=False)
+    filename = Column(String(255), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    segments_total = Column(Integer, nullable=False, default=0)
+    segments_done = Column(Integer, nullable=False, default=0)
+    transcript_length = Column(Integer)
+    file_path = Column(Text)  # Spooled upload, removed once the job finishes
+    error = Column(Text)
+    created_by = Column(UUID(as_uuid=True))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
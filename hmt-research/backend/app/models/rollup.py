@@ -0,0 +1,32 @@
+from sqlalchemy import Column, String, DateTime, Integer, BigInteger, Float, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from datetime import datetime
+from ..core.database import Base
+
+class ResponseRollup(Base):
+    """Running totals per (experiment, scenario, option), see services.rollups"""
+    __tablename__ = "response_rollups"
+    
+    experiment_id = Column(UUID(as_uuid=True), ForeignKey("experiments.id"), primary_key=True)
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), primary_key=True)
+    option = Column(String(50), primary_key=True)  # selected_option, or "custom" when none was chosen
+    responses = Column(BigInteger, nullable=False, default=0)
+    confidence_n = Column(BigInteger, nullable=False, default=0)
+    confidence_sum = Column(BigInteger, nullable=False, default=0)
+    confidence_sumsq = Column(BigInteger, nullable=False, default=0)
+    risk_n = Column(BigInteger, nullable=False, default=0)
+    risk_sum = Column(BigInteger, nullable=False, default=0)
+    risk_sumsq = Column(BigInteger, nullable=False, default=0)
+    response_time_n = Column(BigInteger, nullable=False, default=0)
+    response_time_sum = Column(BigInteger, nullable=False, default=0)
+    response_time_sumsq = Column(Float, nullable=False, default=0)  # ms^2 outgrows BIGINT on long studies
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class ResponseTimeRollup(Base):
+    """Fixed-bucket response-time histogram per (experiment, scenario)"""
+    __tablename__ = "response_time_rollups"
+    
+    experiment_id = Column(UUID(as_uuid=True), ForeignKey("experiments.id"), primary_key=True)
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # Index into services.rollups.RESPONSE_TIME_BUCKETS_MS
+    count = Column(BigInteger, nullable=False, default=0)
@@ -1,20 +1,37 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-import uuid
-from datetime import datetime
-from ..core.database import Base
-
-class Scenario(Base):
-    __tablename__ = "scenarios"
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    title = Column(String(255), nullable=False)
-    category = Column(String(100))
-    description = Column(Text, nullable=False)
-    context = Column(Text, nullable=False)
-    decision_point = Column(Text, nullable=False)
-    options = Column(JSON, nullable=False)
-    meta_data = Column(JSON, default={})
-    created_at = Column(DateTime, default=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, ForeignKey, JSON, Index, Computed, text
+from sqlalchemy.dialects.postgresql import UUID, JSONB, TSVECTOR
+from sqlalchemy.orm import relationship, deferred
+import uuid
+from datetime import datetime
+from ..core.database import Base
+
+class Scenario(Base):
+    __tablename__ = "scenarios"
+    __table_args__ = (
+        Index("idx_scenarios_created_at_id", "created_at", "id"),  # Keyset pagination
+        Index("idx_scenarios_search_vector", "search_vector", postgresql_using="gin"),
+        Index("idx_scenarios_meta_data", "meta_data", postgresql_using="gin", postgresql_ops={"meta_data": "jsonb_path_ops"}),
+        # Older versions of a re-imported scenario stay behind, inactive
+        Index("uq_scenarios_import_key_active", "import_key", unique=True, postgresql_where=text("is_active")),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    title = Column(String(255), nullable=False)
+    category = Column(String(100))
+    description = Column(Text, nullable=False)
+    context = Column(Text, nullable=False)
+    decision_point = Column(Text, nullable=False)
+    options = Column(JSON, nullable=False)
+    meta_data = Column(JSONB, default={})
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    is_active = Column(Boolean, default=True)
+    # Set by imports: import_key identifies the scenario across re-imports,
+    # content_hash detects whether its transformed content changed
+    import_key = Column(String(64))
+    content_hash = Column(String(64))
+    # Maintained by Postgres from the text columns; see scenario_search
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || "
+        "coalesce(context, '') || ' ' || coalesce(decision_point, ''))",
+        persisted=True
+    )))
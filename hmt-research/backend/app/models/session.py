@@ -1,54 +1,109 @@
-from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, ForeignKey, JSON
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
-import uuid
-from datetime import datetime
-from ..core.database import Base
-
-class Experiment(Base):
-    __tablename__ = "experiments"
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = Column(String(255), nullable=False)
-    description = Column(Text)
-    scenario_sequence = Column(JSON, nullable=False)
-    config = Column(JSON, default={})
-    created_at = Column(DateTime, default=datetime.utcnow)
-    created_by = Column(UUID(as_uuid=True))
-    is_active = Column(Boolean, default=True)
-    
-    sessions = relationship("Session", back_populates="experiment")
-
-class Session(Base):
-    __tablename__ = "sessions"
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    experiment_id = Column(UUID(as_uuid=True), ForeignKey("experiments.id"))
-    participant_id = Column(String(50), nullable=False)
-    operator_id = Column(String(50), nullable=False)
-    start_time = Column(DateTime, default=datetime.utcnow)
-    end_time = Column(DateTime)
-    status = Column(String(20), default="active")
-    meta_data = Column(JSON, default={})
-    
-    experiment = relationship("Experiment", back_populates="sessions")
-    responses = relationship("ScenarioResponse", back_populates="session")
-
-class ScenarioResponse(Base):
-    __tablename__ = "scenario_responses"
-    
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"))
-    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"))
-    step_number = Column(Integer, nullable=False)
-    presented_at = Column(DateTime, default=datetime.utcnow)
-    responded_at = Column(DateTime)
-    selected_option = Column(String(50))
-    custom_response = Column(Text)
-    confidence_rating = Column(Integer)
-    risk_rating = Column(Integer)
-    response_time_ms = Column(Integer)
-    think_aloud_transcript = Column(Text)
-    
-    session = relationship("Session", back_populates="responses")
-    scenario = relationship("Scenario")
+from sqlalchemy import Column, String, Text, DateTime, Boolean, Integer, BigInteger, ForeignKey, JSON, UniqueConstraint, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+import uuid
+from datetime import datetime
+from ..core.database import Base
+
+class Experiment(Base):
+    __tablename__ = "experiments"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    name = Column(String(255), nullable=False)
+    description = Column(Text)
+    scenario_sequence = Column(JSON, nullable=False)
+    config = Column(JSON, default={})
+    created_at = Column(DateTime, default=datetime.utcnow)
+    created_by = Column(UUID(as_uuid=True))
+    is_active = Column(Boolean, default=True)
+    
+    sessions = relationship("Session", back_populates="experiment")
+
+class Session(Base):
+    __tablename__ = "sessions"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    experiment_id = Column(UUID(as_uuid=True), ForeignKey("experiments.id"))
+    participant_id = Column(String(50), nullable=False)
+    operator_id = Column(String(50), nullable=False)
+    start_time = Column(DateTime, default=datetime.utcnow)
+    end_time = Column(DateTime)
+    status = Column(String(20), default="active")
+    current_step = Column(Integer, nullable=False, default=0)  # Responses recorded so far
+    meta_data = Column(JSON, default={})
+    
+    experiment = relationship("Experiment", back_populates="sessions")
+    responses = relationship("ScenarioResponse", back_populates="session")
+
+class ScenarioResponse(Base):
+    __tablename__ = "scenario_responses"
+    __table_args__ = (
+        UniqueConstraint("session_id", "step_number", name="uq_responses_session_step"),
+        UniqueConstraint("session_id", "idempotency_key", name="uq_responses_session_idempotency_key"),
+        Index("idx_responses_recorded_at_id", "recorded_at", "id"),
+        Index("idx_responses_recorded_xid_id", "recorded_xid", "id"),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"))
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"))
+    step_number = Column(Integer, nullable=False)
+    presented_at = Column(DateTime, default=datetime.utcnow)
+    responded_at = Column(DateTime)
+    selected_option = Column(String(50))
+    custom_response = Column(Text)
+    confidence_rating = Column(Integer)
+    risk_rating = Column(Integer)
+    response_time_ms = Column(Integer)  # Server clock: presentation event to submit
+    client_response_time_ms = Column(Integer)  # Client monotonic clock, as reported
+    think_aloud_transcript = Column(Text)
+    idempotency_key = Column(String(64))  # Client-generated, dedups retried submits
+    recorded_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # Server time
+    # Id of the inserting transaction, assigned by Postgres; change-feed watermark
+    recorded_xid = Column(BigInteger, nullable=False, server_default=text("pg_current_xact_id()::text::bigint"))
+    
+    session = relationship("Session", back_populates="responses")
+    scenario = relationship("Scenario")
+
+class PresentationEvent(Base):
+    """When the server first showed a session step, appended by services.presentation_log"""
+    __tablename__ = "presentation_events"
+    
+    session_id = Column(UUID(as_uuid=True), ForeignKey("sessions.id"), primary_key=True)
+    step_number = Column(Integer, primary_key=True)
+    scenario_id = Column(UUID(as_uuid=True), ForeignKey("scenarios.id"))
+    presented_at = Column(DateTime, nullable=False)
+
+class ThematicAnalysis(Base):
+    __tablename__ = "thematic_analyses"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    response_id = Column(UUID(as_uuid=True), ForeignKey("scenario_responses.id"), nullable=False, unique=True)
+    status = Column(String(20), nullable=False, default="completed")  # pending (claimed by a worker) | completed | failed
+    themes = Column(JSON, default=[])
+    codes = Column(JSON, default=[])
+    key_concepts = Column(JSON, default=[])
+    cognitive_strategies = Column(JSON, default=[])
+    uncertainty_expressions = Column(JSON, default=[])
+    risk_factors = Column(JSON, default=[])
+    sentiment = Column(JSON, default={})
+    cta_phase = Column(String(50))  # Rule-based, see services.kdma_enrichment
+    kdm_cues = Column(JSON, default=[])
+    kdm_heuristic = Column(String(50))
+    model = Column(String(100))
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text)
+    analyzed_by = Column(UUID(as_uuid=True))  # Null when produced by the background worker
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    response = relationship("ScenarioResponse")
+
+class AnalysisCacheEntry(Base):
+    """Model output keyed by a hash of everything that went into the prompt"""
+    __tablename__ = "analysis_cache"
+    
+    cache_key = Column(String(64), primary_key=True)  # sha256 hex, see thematic_analysis.cache_key
+    model = Column(String(100), nullable=False)
+    prompt_version = Column(String(20), nullable=False)
+    result = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
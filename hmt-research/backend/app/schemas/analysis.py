@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+import uuid
+
+class ThematicAnalysisResponse(BaseModel):
+    id: uuid.UUID
+    response_id: uuid.UUID
+    status: str
+    themes: Optional[List[Any]] = None
+    codes: Optional[List[Any]] = None
+    key_concepts: Optional[List[Any]] = None
+    cognitive_strategies: Optional[List[Any]] = None
+    uncertainty_expressions: Optional[List[Any]] = None
+    risk_factors: Optional[List[Any]] = None
+    sentiment: Optional[Dict[str, Any]] = None
+    cta_phase: Optional[str] = None
+    kdm_cues: Optional[List[str]] = None
+    kdm_heuristic: Optional[str] = None
+    model: Optional[str] = None
+    attempts: int
+    error: Optional[str] = None
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+class AnalysisQueueResponse(BaseModel):
+    queued: int
+    requeued_failed: int = 0
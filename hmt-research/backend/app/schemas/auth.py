@@ -1,39 +1,52 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
-from datetime import datetime
-import uuid
-
-class UserCreate(BaseModel):
-    email: EmailStr
-    password: str
-    full_name: str
-    role: str = "user"
-
-class UserLogin(BaseModel):
-    email: EmailStr
-    password: str
-
-class UserUpdate(BaseModel):
-    email: Optional[EmailStr] = None
-    full_name: Optional[str] = None
-    password: Optional[str] = None
-
-class UserPreferences(BaseModel):
-    darkMode: Optional[bool] = False
-
-class UserResponse(BaseModel):
-    id: uuid.UUID
-    email: str
-    full_name: str
-    role: str
-    is_active: bool
-    created_at: datetime
-    preferences: dict
-    
-    class Config:
-        from_attributes = True
-
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-    user: UserResponse
+from pydantic import BaseModel, EmailStr
+from typing import Optional
+from datetime import datetime
+import uuid
+
+class UserCreate(BaseModel):
+    email: EmailStr
+    password: str
+    full_name: str
+    role: str = "user"
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+class UserUpdate(BaseModel):
+    email: Optional[EmailStr] = None
+    full_name: Optional[str] = None
+    password: Optional[str] = None
+
+class UserPreferences(BaseModel):
+    darkMode: Optional[bool] = False
+
+class UserResponse(BaseModel):
+    id: uuid.UUID
+    email: str
+    full_name: str
+    role: str
+    is_active: bool
+    created_at: datetime
+    preferences: dict
+    
+    class Config:
+        from_attributes = True
+
+class CurrentUser(BaseModel):
+    """Cached snapshot of the authenticated user"""
+    id: uuid.UUID
+    email: str
+    full_name: Optional[str] = None
+    role: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+    preferences: Optional[str] = '{}'
+    
+    class Config:
+        from_attributes = True
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+    user: UserResponse
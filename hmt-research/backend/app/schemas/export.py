@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Literal
+from datetime import datetime
+import uuid
+
+class ExportJobCreate(BaseModel):
+    experiment_id: Optional[uuid.UUID] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    format: Literal["jsonl", "parquet"] = "jsonl"
+    compression: Literal["gzip", "zstd"] = "gzip"
+
+class ExportJobResponse(BaseModel):
+    id: uuid.UUID
+    experiment_id: Optional[uuid.UUID] = None
+    start_date: Optional[datetime] = None
+    end_date: Optional[datetime] = None
+    format: str
+    compression: str
+    status: str
+    total_sessions: int
+    completed_sessions: int
+    file_size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ChangeFeedResponse(BaseModel):
+    traces: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None  # Pass back as ?cursor= to resume after these traces
+    has_more: bool
@@ -1,47 +1,70 @@
-from pydantic import BaseModel
-from typing import List, Dict, Optional
-from datetime import datetime
-import uuid
-
-class ScenarioOption(BaseModel):
-    id: str
-    label: str
-    description: str
-
-class ScenarioCreate(BaseModel):
-    title: str
-    category: str
-    description: str
-    context: str
-    decision_point: str
-    options: List[ScenarioOption]
-    meta_data: Optional[Dict] = {}
-
-class ScenarioUpdate(BaseModel):
-    title: Optional[str] = None
-    category: Optional[str] = None
-    description: Optional[str] = None
-    context: Optional[str] = None
-    decision_point: Optional[str] = None
-    options: Optional[List[ScenarioOption]] = None
-    meta_data: Optional[Dict] = None
-
-class ScenarioResponse(BaseModel):
-    id: uuid.UUID
-    title: str
-    category: str
-    description: str
-    context: str
-    decision_point: str
-    options: List[ScenarioOption]
-    meta_data: Dict
-    created_at: datetime
-    is_active: bool
-    
-    class Config:
-        from_attributes = True
-
-class ScenarioImportResponse(BaseModel):
-    imported_count: int
-    scenarios: List[ScenarioResponse]
-    errors: List[str] = []
+from pydantic import BaseModel
+from typing import List, Dict, Optional
+from datetime import datetime
+import uuid
+
+class ScenarioOption(BaseModel):
+    id: str
+    label: str
+    description: str
+
+class ScenarioCreate(BaseModel):
+    title: str
+    category: str
+    description: str
+    context: str
+    decision_point: str
+    options: List[ScenarioOption]
+    meta_data: Optional[Dict] = {}
+
+class ScenarioUpdate(BaseModel):
+    title: Optional[str] = None
+    category: Optional[str] = None
+    description: Optional[str] = None
+    context: Optional[str] = None
+    decision_point: Optional[str] = None
+    options: Optional[List[ScenarioOption]] = None
+    meta_data: Optional[Dict] = None
+
+class ScenarioResponse(BaseModel):
+    id: uuid.UUID
+    title: str
+    category: str
+    description: str
+    context: str
+    decision_point: str
+    options: List[ScenarioOption]
+    meta_data: Dict
+    created_at: datetime
+    is_active: bool
+    
+    class Config:
+        from_attributes = True
+
+class ScenarioImportError(BaseModel):
+    index: int  # Position of the item in the uploaded file
+    error: str
+
+class ScenarioImportResponse(BaseModel):
+    imported_count: int  # Scenarios inserted or updated
+    unchanged_count: int = 0  # Already imported with identical content
+    failed_count: int = 0
+    errors: List[ScenarioImportError] = []
+
+class ImportJobResponse(BaseModel):
+    id: uuid.UUID
+    filename: str
+    format: str
+    status: str
+    items_parsed: int
+    items_inserted: int
+    items_unchanged: int
+    items_failed: int
+    errors: List[ScenarioImportError] = []
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
@@ -1,35 +1,64 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, List
-from datetime import datetime
-import uuid
-
-class SessionCreate(BaseModel):
-    experiment_id: uuid.UUID
-    participant_id: str
-    operator_id: str
-
-class SessionResponse(BaseModel):
-    id: uuid.UUID
-    experiment_id: uuid.UUID
-    participant_id: str
-    operator_id: str
-    start_time: datetime
-    end_time: Optional[datetime] = None
-    status: str
-    meta_data: Dict
-    
-    class Config:
-        from_attributes = True
-
-class ScenarioResponseCreate(BaseModel):
-    selected_option: Optional[str] = None
-    custom_response: Optional[str] = None
-    confidence_rating: Optional[int] = None
-    risk_rating: Optional[int] = None
-    think_aloud_transcript: Optional[str] = None
-
-class ExperimentCreate(BaseModel):
-    name: str
-    description: str
-    scenario_sequence: List[uuid.UUID]
-    config: Optional[Dict] = {}
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, List
+from datetime import datetime
+import uuid
+
+class SessionCreate(BaseModel):
+    experiment_id: uuid.UUID
+    participant_id: str
+    operator_id: str
+
+class SessionResponse(BaseModel):
+    id: uuid.UUID
+    experiment_id: uuid.UUID
+    participant_id: str
+    operator_id: str
+    start_time: datetime
+    end_time: Optional[datetime] = None
+    status: str
+    meta_data: Dict
+    
+    class Config:
+        from_attributes = True
+
+class ScenarioResponseCreate(BaseModel):
+    selected_option: Optional[str] = None
+    custom_response: Optional[str] = None
+    confidence_rating: Optional[int] = None
+    risk_rating: Optional[int] = None
+    think_aloud_transcript: Optional[str] = None
+    idempotency_key: Optional[str] = Field(None, min_length=1, max_length=64)
+    # Measured by the client on a monotonic clock (e.g. performance.now()),
+    # stored beside the server-measured latency for comparison
+    client_response_time_ms: Optional[int] = Field(None, ge=0)
+
+class ScenarioResponseBatchItem(ScenarioResponseCreate):
+    scenario_id: uuid.UUID
+    idempotency_key: str = Field(..., min_length=1, max_length=64)
+    presented_at: Optional[datetime] = None
+    responded_at: Optional[datetime] = None
+
+class ScenarioResponseBatch(BaseModel):
+    responses: List[ScenarioResponseBatchItem] = Field(..., max_length=500)
+
+class TranscriptionJobResponse(BaseModel):
+    id: uuid.UUID
+    response_id: uuid.UUID
+    filename: str
+    status: str
+    segments_total: int
+    segments_done: int
+    transcript_length: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+class ExperimentCreate(BaseModel):
+    name: str
+    description: str
+    scenario_sequence: List[uuid.UUID]
+    config: Optional[Dict] = {}
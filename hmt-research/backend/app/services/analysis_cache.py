@@ -0,0 +1,61 @@
+from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..core.database import AsyncSessionLocal
+from ..models.session import AnalysisCacheEntry
+
+class AnalysisCache:
+    """Persistent, content-addressed store of model analysis results.
+    
+    Keys are hashes of the full prompt input, so an entry never goes
+    stale: changing the transcript, context, prompt or model changes the
+    key instead. Lookup or write failures are treated as misses so the
+    cache can never fail an analysis.
+    """
+    
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.errors = 0
+    
+    async def get(self, key: str) -> Optional[Dict]:
+        try:
+            async with AsyncSessionLocal() as db:
+                result = (await db.execute(
+                    select(AnalysisCacheEntry.result).where(AnalysisCacheEntry.cache_key == key)
+                )).scalar_one_or_none()
+        except Exception as e:
+            self.errors += 1
+            print(f"Analysis cache read error: {e}")
+            result = None
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+    
+    async def put(self, key: str, model: str, prompt_version: str, result: Dict):
+        stmt = pg_insert(AnalysisCacheEntry).values(
+            cache_key=key, model=model, prompt_version=prompt_version, result=result
+        ).on_conflict_do_nothing(index_elements=[AnalysisCacheEntry.cache_key])
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+            self.stores += 1
+        except Exception as e:
+            self.errors += 1
+            print(f"Analysis cache write error: {e}")
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "errors": self.errors,
+        }
+
+analysis_cache = AnalysisCache()
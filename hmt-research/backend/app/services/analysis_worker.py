@@ -0,0 +1,358 @@
+import asyncio
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+from sqlalchemy import bindparam, delete, exists, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.scenario import Scenario
+from ..models.session import ScenarioResponse, ThematicAnalysis
+from .thematic_analysis import ThematicAnalyzer, RETRYABLE_ERRORS, retry_after
+from .kdma_enrichment import kdma_enricher
+
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+# Partial result batches are written after this long even if not full
+FLUSH_SECONDS = 2.0
+# A pending claim this old belongs to a worker that died and is taken over
+CLAIM_TIMEOUT_SECONDS = 15 * 60
+
+WRITE_COLUMNS = (
+    "response_id", "status", "themes", "codes", "key_concepts", "cognitive_strategies",
+    "uncertainty_expressions", "risk_factors", "sentiment", "cta_phase", "kdm_cues", "kdm_heuristic",
+    "model", "attempts", "error", "created_at"
+)
+
+class TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursting up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.waits = 0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    async def acquire(self, tokens: float = 1.0):
+        # The lock makes waiters queue in order instead of racing for refills
+        async with self._lock:
+            self._refill()
+            if self.tokens < tokens:
+                self.waits += 1
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+    
+    def drain(self):
+        """Empty the bucket, e.g. after the server reports a rate limit"""
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+
+class AnalysisWorker:
+    """Background thematic analysis of think-aloud transcripts.
+    
+    A poller claims responses that have a transcript but no analysis by
+    inserting a pending analysis row, so workers in other processes skip
+    them, and queues them. A fixed number of consumers call the model
+    concurrently, each request first taking a token from a shared bucket
+    so the whole worker stays under the configured requests per minute.
+    Transient errors are retried with jittered exponential backoff.
+    Results are buffered and written over their claims in batches by a
+    single writer.
+    
+    Transcripts already analyzed with the same context, prompt version
+    and model are served from the analysis cache without a request.
+    
+    Everything runs on the application's event loop; the OpenAI client
+    and database sessions are both async, so nothing blocks it.
+    """
+    
+    def __init__(
+        self,
+        concurrency: int,
+        requests_per_minute: int,
+        max_retries: int,
+        batch_size: int,
+        poll_seconds: float,
+        analyzer: Optional[ThematicAnalyzer] = None
+    ):
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.analyzer = analyzer
+        self._owns_analyzer = analyzer is None
+        # A full minute's budget may burst, then requests are paced evenly
+        self.bucket = TokenBucket(rate=requests_per_minute / 60.0, capacity=max(1, requests_per_minute))
+        self._queue: Optional[asyncio.Queue] = None
+        self._results: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # Queued, being analyzed, or waiting to be written
+        self._claimed: Set[uuid.UUID] = set()
+        self._enqueue_lock = asyncio.Lock()
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.retries = 0
+        self.written = 0
+        self.write_errors = 0
+    
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+    
+    def start(self):
+        if self.running:
+            return
+        if self.analyzer is None:
+            self.analyzer = ThematicAnalyzer()
+        self._queue = asyncio.Queue(maxsize=self.batch_size * self.concurrency)
+        self._results = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._poll_loop()), asyncio.create_task(self._write_loop())]
+        self._tasks += [asyncio.create_task(self._consume()) for _ in range(self.concurrency)]
+    
+    async def stop(self):
+        """Cancel outstanding work; results already produced are still written"""
+        if not self.running:
+            return
+        writer = self._tasks[1]
+        for task in self._tasks:
+            if task is not writer:
+                task.cancel()
+        await asyncio.gather(*[task for task in self._tasks if task is not writer], return_exceptions=True)
+        await self._results.put(None)
+        await writer
+        self._tasks = []
+        await self._release_claims()
+        if self._owns_analyzer:
+            await self.analyzer.close()
+            self.analyzer = None
+    
+    async def enqueue_pending(self) -> int:
+        """Claim unanalyzed transcripts, oldest first, as far as the queue has room.
+        
+        The poller and the queue endpoint both call this; the lock keeps
+        them from each claiming the same free room, which would overflow
+        the queue after the claims had committed.
+        """
+        async with self._enqueue_lock:
+            room = self._queue.maxsize - self._queue.qsize()
+            if room <= 0:
+                return 0
+            
+            now = datetime.utcnow()
+            # SKIP LOCKED lets pollers in several processes claim disjoint rows
+            stale = select(ThematicAnalysis.id).where(
+                ThematicAnalysis.status == "pending",
+                ThematicAnalysis.created_at < now - timedelta(seconds=CLAIM_TIMEOUT_SECONDS),
+                ThematicAnalysis.response_id.notin_(self._claimed)
+            ).limit(room).with_for_update(skip_locked=True)
+            unclaimed = select(ScenarioResponse.id).where(
+                ScenarioResponse.think_aloud_transcript.isnot(None),
+                ~exists().where(ThematicAnalysis.response_id == ScenarioResponse.id)
+            ).order_by(ScenarioResponse.recorded_at, ScenarioResponse.id).with_for_update(skip_locked=True)
+            
+            async with AsyncSessionLocal() as db:
+                claimed = list((await db.execute(
+                    update(ThematicAnalysis).where(ThematicAnalysis.id.in_(stale)).values(created_at=now)
+                    .returning(ThematicAnalysis.response_id)
+                )).scalars())
+                if len(claimed) < room:
+                    response_ids = (await db.execute(unclaimed.limit(room - len(claimed)))).scalars().all()
+                    if response_ids:
+                        claimed += (await db.execute(
+                            pg_insert(ThematicAnalysis).values([
+                                {"response_id": response_id, "status": "pending", "model": self.analyzer.model, "created_at": now}
+                                for response_id in response_ids
+                            ]).on_conflict_do_nothing(index_elements=[ThematicAnalysis.response_id])
+                            .returning(ThematicAnalysis.response_id)
+                        )).scalars().all()
+                rows = (await db.execute(select(
+                    ScenarioResponse.id,
+                    ScenarioResponse.think_aloud_transcript,
+                    ScenarioResponse.selected_option,
+                    Scenario.title
+                ).outerjoin(Scenario, Scenario.id == ScenarioResponse.scenario_id).where(
+                    ScenarioResponse.id.in_(claimed)
+                ).order_by(ScenarioResponse.recorded_at, ScenarioResponse.id))).all() if claimed else []
+                await db.commit()
+            
+            for response_id, transcript, selected_option, scenario_title in rows:
+                self._claimed.add(response_id)
+                self._queue.put_nowait({
+                    "response_id": response_id,
+                    "transcript": transcript,
+                    "context": {"scenario_title": scenario_title, "selected_option": selected_option}
+                })
+            return len(rows)
+    
+    async def _release_claims(self):
+        """Drop the claims of work cancelled by stop() so the next start picks it up at once"""
+        claimed, self._claimed = self._claimed, set()
+        if not claimed:
+            return
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(delete(ThematicAnalysis).where(
+                    ThematicAnalysis.response_id.in_(claimed), ThematicAnalysis.status == "pending"
+                ))
+                await db.commit()
+        except Exception as e:
+            # They are taken over once CLAIM_TIMEOUT_SECONDS has passed
+            print(f"Thematic analysis claim release error: {e}")
+    
+    async def _poll_loop(self):
+        while True:
+            try:
+                await self.enqueue_pending()
+            except Exception as e:
+                print(f"Thematic analysis poll error: {e}")
+            await asyncio.sleep(self.poll_seconds)
+    
+    async def _consume(self):
+        while True:
+            item = await self._queue.get()
+            self.active += 1
+            try:
+                row = await self._analyze(item)
+            except Exception as e:
+                # Anything _analyze didn't anticipate still settles the claim
+                row = self._failure(
+                    {"response_id": item["response_id"], "model": self.analyzer.model, "created_at": datetime.utcnow()}, 0, e
+                )
+            finally:
+                self.active -= 1
+                self._queue.task_done()
+            await self._results.put(row)
+    
+    async def _analyze(self, item: Dict) -> Dict:
+        row = {
+            "response_id": item["response_id"],
+            "model": self.analyzer.model,
+            "created_at": datetime.utcnow(),
+            # Local and cheap, so recorded even when the model call fails
+            **kdma_enricher.enrich(item["transcript"])
+        }
+        needs_request = self.analyzer.needs_request(item["transcript"])
+        attempt = 0
+        # A cache hit costs neither a rate-limit token nor a request
+        cached = await self.analyzer.lookup(item["transcript"], item["context"])
+        if cached is not None:
+            self.completed += 1
+            return {**row, **cached, "status": "completed", "attempts": 0}
+        while True:
+            if needs_request:
+                await self.bucket.acquire()
+                attempt += 1
+            try:
+                analysis = await self.analyzer.analyze_transcript(item["transcript"], item["context"], check_cache=False)
+                self.completed += 1
+                return {**row, **analysis, "status": "completed", "attempts": attempt}
+            except RETRYABLE_ERRORS as e:
+                if attempt > self.max_retries:
+                    return self._failure(row, attempt, e)
+                delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+                delay = random.uniform(delay / 2, delay)
+                server_delay = retry_after(e)
+                if server_delay is not None:
+                    delay = max(delay, server_delay)
+                    self.bucket.drain()
+                self.retries += 1
+                await asyncio.sleep(delay)
+            except Exception as e:
+                return self._failure(row, attempt, e)
+    
+    def _failure(self, row: Dict, attempt: int, error: Exception) -> Dict:
+        self.failed += 1
+        print(f"Thematic analysis error for response {row['response_id']}: {error}")
+        return {**row, "status": "failed", "attempts": attempt, "error": str(error)}
+    
+    async def _write_loop(self):
+        """Insert results in batches of batch_size, or whatever arrived within FLUSH_SECONDS"""
+        buffer: List[Dict] = []
+        stopping = False
+        while not stopping:
+            try:
+                row = await asyncio.wait_for(self._results.get(), timeout=FLUSH_SECONDS)
+                if row is None:
+                    stopping = True
+                else:
+                    buffer.append(row)
+                    if len(buffer) < self.batch_size:
+                        continue
+            except asyncio.TimeoutError:
+                pass
+            if buffer:
+                await self._write(buffer)
+                buffer = []
+    
+    async def _write(self, rows: List[Dict]):
+        """Write results over their pending claims; a failed batch is retried row by row"""
+        # Every row needs the same keys for an executemany UPDATE
+        values = [
+            {"claim_id": row["response_id"], **{column: row.get(column) for column in WRITE_COLUMNS if column != "response_id"}}
+            for row in rows
+        ]
+        try:
+            await self._store(values)
+        except Exception as e:
+            self.write_errors += 1
+            print(f"Thematic analysis write error: {e}")
+            for value in values:
+                try:
+                    await self._store([value])
+                except Exception as e:
+                    await self._store_failure(value, e)
+        self._claimed.difference_update(row["response_id"] for row in rows)
+    
+    async def _store(self, values: List[Dict]):
+        # A claim deleted meanwhile (the transcript was replaced) discards its result
+        table = ThematicAnalysis.__table__
+        stmt = update(table).where(table.c.response_id == bindparam("claim_id"), table.c.status == "pending")
+        async with AsyncSessionLocal() as db:
+            await db.execute(stmt, values)
+            await db.commit()
+        self.written += len(values)
+    
+    async def _store_failure(self, value: Dict, error: Exception):
+        """Mark a result that can't be written as failed so it isn't polled again"""
+        self.failed += 1
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(ThematicAnalysis).where(
+                    ThematicAnalysis.response_id == value["claim_id"], ThematicAnalysis.status == "pending"
+                ).values(status="failed", attempts=value["attempts"], error=f"Write error: {error}"))
+                await db.commit()
+        except Exception as e:
+            # Left pending, so it's analyzed again once the claim goes stale
+            print(f"Thematic analysis write error for response {value['claim_id']}: {e}")
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "retries": self.retries,
+            "rate_limit_waits": self.bucket.waits,
+            "written": self.written,
+            "write_errors": self.write_errors,
+        }
+
+analysis_worker = AnalysisWorker(
+    concurrency=settings.ANALYSIS_CONCURRENCY,
+    requests_per_minute=settings.ANALYSIS_REQUESTS_PER_MINUTE,
+    max_retries=settings.ANALYSIS_MAX_RETRIES,
+    batch_size=settings.ANALYSIS_BATCH_SIZE,
+    poll_seconds=settings.ANALYSIS_POLL_SECONDS
+)
@@ -0,0 +1,178 @@
+import uuid
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from ..models.scenario import Scenario
+from ..models.session import Session as SessionModel, ScenarioResponse
+
+PERCENTILES = (50, 90, 95, 99)
+RATING_LEVELS = np.arange(1, 6)
+# Scenario meta_data keys responses can be broken down by
+BREAKDOWN_KEYS = ("ai_alignment", "ai_autonomy")
+FACET_COLUMNS = ("variant_code",) + BREAKDOWN_KEYS
+
+def _scoped(stmt, experiment_id: Optional[uuid.UUID], scenario_id: Optional[uuid.UUID]):
+    if experiment_id is not None:
+        stmt = stmt.join(SessionModel, SessionModel.id == ScenarioResponse.session_id).where(
+            SessionModel.experiment_id == experiment_id
+        )
+    if scenario_id is not None:
+        stmt = stmt.where(ScenarioResponse.scenario_id == scenario_id)
+    return stmt
+
+def _frame(db: Session, stmt, columns: List[str]) -> pd.DataFrame:
+    return pd.DataFrame(db.execute(stmt).all(), columns=columns)
+
+def _scenario_facets(db: Session, scenario_ids) -> pd.DataFrame:
+    """Title and variant facets per scenario, one row per scenario referenced"""
+    rows = db.execute(
+        select(Scenario.id, Scenario.title, Scenario.meta_data).where(Scenario.id.in_(list(scenario_ids)))
+    ).all()
+    return pd.DataFrame(
+        [[scenario_id, title] + [(meta_data or {}).get(key) for key in FACET_COLUMNS] for scenario_id, title, meta_data in rows],
+        columns=["scenario_id", "title", *FACET_COLUMNS]
+    )
+
+def _option_counts(db: Session, experiment_id, scenario_id) -> pd.DataFrame:
+    """(scenario_id, option, count); a response with no selected option counts as custom"""
+    stmt = _scoped(
+        select(ScenarioResponse.scenario_id, ScenarioResponse.selected_option, func.count()),
+        experiment_id, scenario_id
+    ).group_by(ScenarioResponse.scenario_id, ScenarioResponse.selected_option)
+    counts = _frame(db, stmt, ["scenario_id", "option", "count"])
+    counts["option"] = counts["option"].fillna("custom")
+    return counts
+
+def _response_times(db: Session, experiment_id, scenario_id) -> pd.DataFrame:
+    """Per-response latency in ms; the stored value, else responded_at - presented_at"""
+    stmt = _scoped(
+        select(
+            ScenarioResponse.scenario_id,
+            ScenarioResponse.response_time_ms,
+            ScenarioResponse.presented_at,
+            ScenarioResponse.responded_at
+        ),
+        experiment_id, scenario_id
+    )
+    times = _frame(db, stmt, ["scenario_id", "response_time_ms", "presented_at", "responded_at"])
+    derived = (
+        pd.to_datetime(times["responded_at"]) - pd.to_datetime(times["presented_at"])
+    ).dt.total_seconds() * 1000
+    times["ms"] = pd.to_numeric(times["response_time_ms"], errors="coerce").fillna(derived)
+    return times.dropna(subset=["ms"])[["scenario_id", "ms"]]
+
+def _percentiles(values: np.ndarray) -> Dict:
+    if not len(values):
+        return {"count": 0, "mean": None, **{f"p{p}": None for p in PERCENTILES}}
+    points = np.percentile(values, PERCENTILES)
+    return {
+        "count": int(len(values)),
+        "mean": round(float(values.mean()), 1),
+        **{f"p{p}": round(float(point), 1) for p, point in zip(PERCENTILES, points)}
+    }
+
+def option_distribution(db: Session, experiment_id=None, scenario_id=None) -> List[Dict]:
+    """Option choice counts and shares per scenario (each variant is its own scenario)"""
+    counts = _option_counts(db, experiment_id, scenario_id)
+    if counts.empty:
+        return []
+    table = counts.pivot_table(index="scenario_id", columns="option", values="count", aggfunc="sum", fill_value=0)
+    totals = table.to_numpy().sum(axis=1)
+    shares = table.to_numpy() / totals[:, None]
+    facets = _scenario_facets(db, table.index).set_index("scenario_id")
+    
+    result = []
+    for row, scenario_id in enumerate(table.index):
+        facet = facets.loc[scenario_id] if scenario_id in facets.index else None
+        result.append({
+            "scenario_id": str(scenario_id),
+            "title": None if facet is None else facet["title"],
+            **{key: None if facet is None else facet[key] for key in FACET_COLUMNS},
+            "responses": int(totals[row]),
+            "options": {option: int(table.iat[row, column]) for column, option in enumerate(table.columns) if table.iat[row, column]},
+            "shares": {option: round(float(shares[row, column]), 4) for column, option in enumerate(table.columns) if table.iat[row, column]},
+        })
+    return result
+
+def _histogram(db: Session, column, experiment_id, scenario_id) -> Dict:
+    stmt = _scoped(select(column, func.count()), experiment_id, scenario_id).where(column.isnot(None)).group_by(column)
+    found = dict(db.execute(stmt).all())
+    counts = np.array([found.get(int(level), 0) for level in RATING_LEVELS])
+    n = int(counts.sum())
+    if not n:
+        return {"levels": RATING_LEVELS.tolist(), "counts": counts.tolist(), "count": 0, "mean": None, "std": None}
+    mean = float((RATING_LEVELS * counts).sum() / n)
+    std = float(np.sqrt(((RATING_LEVELS - mean) ** 2 * counts).sum() / n))
+    return {"levels": RATING_LEVELS.tolist(), "counts": counts.tolist(), "count": n, "mean": round(mean, 3), "std": round(std, 3)}
+
+def rating_histograms(db: Session, experiment_id=None, scenario_id=None) -> Dict:
+    """Counts per 1-5 level for confidence and risk ratings, with mean and std"""
+    return {
+        "confidence": _histogram(db, ScenarioResponse.confidence_rating, experiment_id, scenario_id),
+        "risk": _histogram(db, ScenarioResponse.risk_rating, experiment_id, scenario_id),
+    }
+
+def response_time_percentiles(db: Session, experiment_id=None, scenario_id=None, group_by: Optional[str] = None) -> Dict:
+    """Response-time percentiles overall and, optionally, per scenario or per breakdown key"""
+    times = _response_times(db, experiment_id, scenario_id)
+    result = {"overall": _percentiles(times["ms"].to_numpy())}
+    if group_by is None:
+        return result
+    
+    if group_by == "scenario":
+        keys = times["scenario_id"].astype(str)
+    else:
+        facets = _scenario_facets(db, times["scenario_id"].unique())
+        keys = times[["scenario_id"]].merge(facets, on="scenario_id", how="left")[group_by].fillna("unknown")
+    result["groups"] = {
+        str(key): _percentiles(group.to_numpy())
+        for key, group in times["ms"].groupby(keys.to_numpy())
+    }
+    return result
+
+def facet_breakdown(db: Session, key: str, experiment_id=None, scenario_id=None) -> List[Dict]:
+    """Responses, option shares, mean ratings and median latency per value of a scenario facet"""
+    stmt = _scoped(
+        select(
+            ScenarioResponse.scenario_id,
+            func.count(),
+            func.sum(ScenarioResponse.confidence_rating),
+            func.count(ScenarioResponse.confidence_rating),
+            func.sum(ScenarioResponse.risk_rating),
+            func.count(ScenarioResponse.risk_rating)
+        ),
+        experiment_id, scenario_id
+    ).group_by(ScenarioResponse.scenario_id)
+    per_scenario = _frame(db, stmt, ["scenario_id", "responses", "confidence_sum", "confidence_n", "risk_sum", "risk_n"])
+    if per_scenario.empty:
+        return []
+    
+    facets = _scenario_facets(db, per_scenario["scenario_id"])[["scenario_id", key]]
+    per_scenario = per_scenario.merge(facets, on="scenario_id", how="left")
+    per_scenario[key] = per_scenario[key].fillna("unknown")
+    grouped = per_scenario.groupby(key)[["responses", "confidence_sum", "confidence_n", "risk_sum", "risk_n"]].sum()
+    
+    options = _option_counts(db, experiment_id, scenario_id).merge(facets, on="scenario_id", how="left")
+    options[key] = options[key].fillna("unknown")
+    option_table = options.pivot_table(index=key, columns="option", values="count", aggfunc="sum", fill_value=0)
+    
+    times = _response_times(db, experiment_id, scenario_id).merge(facets, on="scenario_id", how="left")
+    times[key] = times[key].fillna("unknown")
+    medians = times.groupby(key)["ms"].median()
+    
+    result = []
+    for value, row in grouped.iterrows():
+        options_row = option_table.loc[value] if value in option_table.index else pd.Series(dtype=int)
+        result.append({
+            key: value,
+            "responses": int(row["responses"]),
+            "option_shares": {
+                option: round(float(count) / row["responses"], 4) for option, count in options_row.items() if count
+            },
+            "mean_confidence": round(float(row["confidence_sum"] / row["confidence_n"]), 3) if row["confidence_n"] else None,
+            "mean_risk": round(float(row["risk_sum"] / row["risk_n"]), 3) if row["risk_n"] else None,
+            "median_response_time_ms": round(float(medians[value]), 1) if value in medians.index else None,
+        })
+    return result
@@ -0,0 +1,208 @@
+import glob
+import gzip
+import os
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import datetime
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.job import ExportJob
+from ..models.session import Session as SessionModel
+from .export import TraceExporter
+from .columnar_export import ParquetTraceWriter, merge_parquet_parts, parquet_available
+
+try:
+    import zstandard
+except ImportError:  # Optional; gzip is always available
+    zstandard = None
+
+FILE_EXTENSIONS = {"gzip": ".jsonl.gz", "zstd": ".jsonl.zst", "parquet": ".parquet"}
+MEDIA_TYPES = {"gzip": "application/gzip", "zstd": "application/zstd", "parquet": "application/vnd.apache.parquet"}
+
+def output_kind(format: str, compression: str) -> str:
+    """Key into FILE_EXTENSIONS/MEDIA_TYPES; Parquet compresses internally"""
+    return "parquet" if format == "parquet" else compression
+
+def format_available(format: str, compression: str) -> bool:
+    if format == "parquet":
+        return parquet_available()
+    return compression == "gzip" or (compression == "zstd" and zstandard is not None)
+
+def _open_compressed(path: str, compression: str):
+    if compression == "zstd":
+        return zstandard.ZstdCompressor(level=3).stream_writer(open(path, "wb"))
+    return gzip.open(path, "wb", compresslevel=6)
+
+def _shard(items: List, count: int) -> List[List]:
+    """Split into contiguous chunks so concatenated output keeps session order"""
+    size, remainder = divmod(len(items), count)
+    shards, start = [], 0
+    for index in range(count):
+        end = start + size + (1 if index < remainder else 0)
+        if end > start:
+            shards.append(items[start:end])
+        start = end
+    return shards
+
+class BulkExporter:
+    """Background export of many sessions into one compressed JSONL or Parquet file.
+
+    Sessions are sharded across a worker pool. Each shard streams its
+    sessions through TraceExporter into its own part, and the parts are
+    combined at the end. Both gzip members and zstd frames stay valid when
+    concatenated, so a JSONL export is one readable file with exactly the
+    per-session trace schema. Parquet parts are merged batch by batch.
+    """
+
+    # Progress is written back every this many sessions per shard
+    PROGRESS_EVERY = 25
+
+    def __init__(self, max_workers: int, export_dir: str):
+        self.export_dir = export_dir
+        self.max_workers = max_workers
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-job")
+        self._shards = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="export-shard")
+        self._started = datetime.utcnow()
+
+    def submit(self, job_id: uuid.UUID):
+        self._jobs.submit(self._run, job_id)
+
+    def recover(self):
+        """Settle jobs that an earlier server process left unfinished.
+
+        Queued jobs are submitted again; running ones died with their
+        process, so they are marked failed and their parts removed. Only
+        jobs created before this process started are touched, and _run
+        claims a job atomically, so workers starting together never run
+        one twice.
+        """
+        db = SessionLocal()
+        try:
+            stale = db.query(ExportJob.id, ExportJob.status).filter(
+                ExportJob.status.in_(("queued", "running")), ExportJob.created_at < self._started
+            ).all()
+            for job_id, status in stale:
+                if status == "queued":
+                    self.submit(job_id)
+                    continue
+                db.execute(update(ExportJob).where(ExportJob.id == job_id, ExportJob.status == "running").values(
+                    status="failed", error="Interrupted by a server restart", finished_at=datetime.utcnow()
+                ))
+                for part_path in glob.glob(os.path.join(self.export_dir, f"export_{job_id}.*.part*")):
+                    os.remove(part_path)
+            db.commit()
+        finally:
+            db.close()
+
+    def _select_sessions(self, db: Session, job: ExportJob) -> List[uuid.UUID]:
+        query = db.query(SessionModel.id)
+        if job.experiment_id:
+            query = query.filter(SessionModel.experiment_id == job.experiment_id)
+        if job.start_date:
+            query = query.filter(SessionModel.start_time >= job.start_date)
+        if job.end_date:
+            query = query.filter(SessionModel.start_time < job.end_date)
+        return [session_id for (session_id,) in query.order_by(SessionModel.start_time, SessionModel.id)]
+
+    def _run(self, job_id: uuid.UUID):
+        db = SessionLocal()
+        part_paths = []
+        try:
+            # Claim the job so a resubmitted one only runs once
+            claimed = db.execute(update(ExportJob).where(
+                ExportJob.id == job_id, ExportJob.status == "queued"
+            ).values(status="running", started_at=datetime.utcnow()))
+            db.commit()
+            if not claimed.rowcount:
+                return
+
+            job = db.get(ExportJob, job_id)
+            session_ids = self._select_sessions(db, job)
+            job.total_sessions = len(session_ids)
+            db.commit()
+
+            os.makedirs(self.export_dir, exist_ok=True)
+            final_path = os.path.join(
+                self.export_dir, f"export_{job_id}{FILE_EXTENSIONS[output_kind(job.format, job.compression)]}"
+            )
+
+            futures = []
+            for index, shard in enumerate(_shard(session_ids, self.max_workers)):
+                part_path = f"{final_path}.part{index}"
+                part_paths.append(part_path)
+                futures.append(self._shards.submit(
+                    self._export_shard, job_id, shard, part_path, job.format, job.compression
+                ))
+            # Every shard must stop writing before a failure removes the parts
+            wait(futures)
+            for future in futures:
+                future.result()
+
+            if job.format == "parquet":
+                merge_parquet_parts(part_paths, final_path, job.compression)
+            elif part_paths:
+                with open(final_path, "wb") as out:
+                    for part_path in part_paths:
+                        with open(part_path, "rb") as part:
+                            shutil.copyfileobj(part, out)
+            else:
+                # No matching sessions: still produce a valid, empty archive
+                _open_compressed(final_path, job.compression).close()
+
+            job.status = "completed"
+            job.file_path = final_path
+            job.file_size = os.path.getsize(final_path)
+            job.finished_at = datetime.utcnow()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.execute(update(ExportJob).where(ExportJob.id == job_id).values(
+                status="failed", error=str(e), finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        finally:
+            for part_path in part_paths:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            db.close()
+
+    def _export_shard(self, job_id: uuid.UUID, session_ids: List[uuid.UUID], path: str, format: str, compression: str):
+        db = SessionLocal()
+        try:
+            exporter = TraceExporter(db)
+            pending = 0
+            if format == "parquet":
+                out = ParquetTraceWriter(path, compression=compression)
+            else:
+                out = _open_compressed(path, compression)
+            with out:
+                for session_id in session_ids:
+                    if format == "parquet":
+                        out.write_traces(exporter.iter_session_traces(str(session_id)))
+                    else:
+                        for line in exporter.stream_session_jsonl(str(session_id)):
+                            out.write(line.encode())
+                    pending += 1
+                    if pending >= self.PROGRESS_EVERY:
+                        self._record_progress(db, job_id, pending)
+                        pending = 0
+            self._record_progress(db, job_id, pending)
+        finally:
+            db.close()
+
+    def _record_progress(self, db: Session, job_id: uuid.UUID, count: int):
+        if count:
+            db.execute(update(ExportJob).where(ExportJob.id == job_id).values(
+                completed_sessions=ExportJob.completed_sessions + count
+            ))
+            db.commit()
+
+    def shutdown(self):
+        self._jobs.shutdown(wait=False)
+        self._shards.shutdown(wait=False)
+
+bulk_exporter = BulkExporter(max_workers=settings.EXPORT_WORKERS, export_dir=settings.EXPORT_DIR)
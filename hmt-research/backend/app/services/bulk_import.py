@@ -0,0 +1,141 @@
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import BinaryIO
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.job import ImportJob
+from .scenario_import import ScenarioImporter, ImportCancelled
+
+CHUNK_SIZE = 1024 * 1024
+
+class BulkImporter:
+    """Background scenario library imports.
+    
+    The upload is spooled to disk by the request, then a small worker
+    pool runs it through ScenarioImporter. Progress is written back after
+    every committed batch, which is also where cancellation is observed.
+    """
+    
+    def __init__(self, max_workers: int, import_dir: str):
+        self.import_dir = import_dir
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="import-job")
+        self._started = datetime.utcnow()
+    
+    def spool(self, job_id: uuid.UUID, upload: BinaryIO) -> str:
+        """Copy an upload to the import directory without reading it into memory"""
+        os.makedirs(self.import_dir, exist_ok=True)
+        path = os.path.join(self.import_dir, f"import_{job_id}")
+        with open(path, "wb") as out:
+            while True:
+                chunk = upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+        return path
+    
+    def submit(self, job_id: uuid.UUID):
+        self._workers.submit(self._run, job_id)
+    
+    def recover(self):
+        """Settle jobs that an earlier server process left unfinished.
+        
+        Queued jobs whose upload is still spooled are submitted again.
+        Running ones died with their process and are marked failed (or
+        cancelled, if that was asked for); batches they committed are
+        kept. Only jobs created before this process started are touched,
+        and _run claims a job atomically, so workers starting together
+        never run one twice.
+        """
+        db = SessionLocal()
+        try:
+            stale = db.query(ImportJob.id, ImportJob.status, ImportJob.file_path).filter(
+                ImportJob.status.in_(("queued", "running", "cancelling")), ImportJob.created_at < self._started
+            ).all()
+            for job_id, status, file_path in stale:
+                if status == "queued" and file_path and os.path.exists(file_path):
+                    self.submit(job_id)
+                    continue
+                db.execute(update(ImportJob).where(ImportJob.id == job_id, ImportJob.status == status).values(
+                    status="cancelled" if status == "cancelling" else "failed",
+                    error=None if status == "cancelling" else (
+                        "Upload was lost" if status == "queued" else "Interrupted by a server restart"
+                    ),
+                    finished_at=datetime.utcnow()
+                ))
+                if file_path and os.path.exists(file_path):
+                    os.remove(file_path)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _run(self, job_id: uuid.UUID):
+        db = SessionLocal()
+        job = db.get(ImportJob, job_id)
+        file_path = job.file_path
+        # Claim the job unless it was cancelled while queued or another worker took it
+        claimed = db.execute(update(ImportJob).where(
+            ImportJob.id == job_id, ImportJob.status == "queued"
+        ).values(status="running", started_at=datetime.utcnow()))
+        db.commit()
+        if not claimed.rowcount:
+            if job.status == "cancelled" and file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            db.close()
+            return
+        
+        try:
+            importer = ScenarioImporter(db)
+            with open(file_path, "rb") as stream:
+                result = importer.import_stream(
+                    stream,
+                    ndjson=job.format == "ndjson",
+                    on_batch=lambda progress: self._record_progress(db, job_id, progress)
+                )
+            db.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+                status="completed",
+                items_parsed=importer.parsed_count,
+                items_inserted=result.imported_count,
+                items_unchanged=result.unchanged_count,
+                items_failed=result.failed_count,
+                errors=[error.model_dump() for error in result.errors],
+                finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        except ImportCancelled:
+            db.rollback()
+            db.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+                status="cancelled",
+                errors=[error.model_dump() for error in importer.errors],
+                finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+                status="failed", error=str(e), finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        finally:
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            db.close()
+    
+    def _record_progress(self, db: Session, job_id: uuid.UUID, importer: ScenarioImporter):
+        status = db.execute(update(ImportJob).where(ImportJob.id == job_id).values(
+            items_parsed=importer.parsed_count,
+            items_inserted=importer.imported_count,
+            items_unchanged=importer.unchanged_count,
+            items_failed=importer.failed_count
+        ).returning(ImportJob.status)).scalar()
+        db.commit()
+        if status == "cancelling":
+            raise ImportCancelled()
+    
+    def shutdown(self):
+        self._workers.shutdown(wait=False)
+
+bulk_importer = BulkImporter(max_workers=settings.IMPORT_WORKERS, import_dir=settings.IMPORT_DIR)
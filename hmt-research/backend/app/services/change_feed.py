@@ -0,0 +1,67 @@
+import uuid
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import BigInteger, Text, cast, func, tuple_
+from sqlalchemy.orm import Session
+from ..core.pagination import Keyset, Watermark
+from ..models.session import Session as SessionModel, ScenarioResponse
+from .export import TraceExporter
+
+# Every transaction with a lower id has committed or aborted, in this
+# statement's snapshot; no row with a lower recorded_xid can appear later
+SAFE_HORIZON = cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger)
+
+def read_changes(
+    exporter: TraceExporter,
+    after: Optional[Watermark],
+    limit: int
+) -> Tuple[List[Dict], Optional[Watermark], bool]:
+    """Return (traces, new watermark, has_more) for responses recorded after the watermark.
+
+    The watermark is (inserting transaction id, row id) rather than a
+    timestamp, and only rows below the oldest transaction still running
+    are served. A transaction that commits late (say, a batch waiting on
+    a rollup rebuild's lock) therefore holds the feed back until it
+    finishes instead of landing below a watermark already handed out,
+    and app server clocks play no part. Keyset pagination on
+    (recorded_xid, id) rides the composite index, so each page costs the
+    same however much history precedes it. Responses outside any
+    session have no trace and are passed over.
+    """
+    db = exporter.db
+    query = db.query(ScenarioResponse).filter(
+        ScenarioResponse.recorded_xid < SAFE_HORIZON,
+        ScenarioResponse.session_id.isnot(None)
+    )
+    if after is not None:
+        query = query.filter(tuple_(ScenarioResponse.recorded_xid, ScenarioResponse.id) > after)
+    responses = query.order_by(ScenarioResponse.recorded_xid, ScenarioResponse.id).limit(limit + 1).all()
+
+    has_more = len(responses) > limit
+    responses = responses[:limit]
+    if not responses:
+        return [], after, False
+
+    # One IN query each for sessions and scenarios across the whole page
+    session_ids = {response.session_id for response in responses}
+    sessions = {
+        session.id: session
+        for session in db.query(SessionModel).filter(SessionModel.id.in_(session_ids))
+    }
+    traces = exporter.build_traces(responses, lambda response: sessions[response.session_id])
+    last = responses[-1]
+    return traces, (last.recorded_xid, last.id), has_more
+
+def watermark_after_keyset(db: Session, keyset: Keyset) -> Watermark:
+    """Translate a (recorded_at, id) cursor handed out before the feed was ordered by transaction.
+
+    Resumes at the oldest transaction that wrote a row after the old
+    position, so nothing is skipped; earlier rows of that transaction
+    or later ones may be delivered a second time.
+    """
+    after = tuple_(ScenarioResponse.recorded_at, ScenarioResponse.id) > keyset
+    xid = db.query(func.min(ScenarioResponse.recorded_xid)).filter(after).scalar()
+    if xid is not None:
+        return xid, uuid.UUID(int=0)
+    # Everything was delivered; continue after the newest row
+    xid = db.query(func.max(ScenarioResponse.recorded_xid)).scalar()
+    return (xid, uuid.UUID(int=2 ** 128 - 1)) if xid is not None else (0, uuid.UUID(int=0))
@@ -0,0 +1,117 @@
+from datetime import datetime
+from typing import Dict, Iterable, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional; only needed for the Parquet format
+    pa = None
+    pq = None
+
+def parquet_available() -> bool:
+    return pa is not None
+
+def _trace_schema():
+    option = pa.struct([
+        ("id", pa.string()),
+        ("label", pa.string()),
+        ("description", pa.string()),
+    ])
+    return pa.schema([
+        ("dataset_version", pa.string()),
+        ("session_id", pa.string()),
+        ("operator_id", pa.string()),
+        ("scenario_id", pa.string()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("step", pa.int32()),
+        # obs_t, flattened
+        ("obs_scenario_title", pa.string()),
+        ("obs_scenario_context", pa.string()),
+        ("obs_decision_point", pa.string()),
+        ("obs_available_options", pa.list_(option)),
+        ("act_t", pa.string()),
+        ("r_env_t", pa.float64()),
+        ("r_human_t", pa.int32()),
+        ("rationale_t", pa.string()),
+        ("cta_phase", pa.string()),
+        ("kdm_cues", pa.list_(pa.string())),
+        ("kdm_heuristic", pa.string()),
+        ("kdm_risk_rating", pa.int32()),
+        ("kdm_confidence", pa.int32()),
+        ("response_time_ms", pa.int64()),
+        ("client_response_time_ms", pa.int64()),
+        # provenance, flattened
+        ("provenance_session_id", pa.string()),
+        ("provenance_response_id", pa.string()),
+    ])
+
+def _flatten(trace: Dict) -> Dict:
+    obs_t = trace["obs_t"]
+    provenance = trace["provenance"]
+    return {
+        "dataset_version": trace["dataset_version"],
+        "session_id": trace["session_id"],
+        "operator_id": trace["operator_id"],
+        "scenario_id": trace["scenario_id"],
+        "timestamp": datetime.fromisoformat(trace["timestamp"].replace("Z", "+00:00")),
+        "step": trace["step"],
+        "obs_scenario_title": obs_t["scenario_title"],
+        "obs_scenario_context": obs_t["scenario_context"],
+        "obs_decision_point": obs_t["decision_point"],
+        "obs_available_options": obs_t["available_options"],
+        "act_t": trace["act_t"],
+        "r_env_t": trace["r_env_t"],
+        "r_human_t": trace["r_human_t"],
+        "rationale_t": trace["rationale_t"],
+        "cta_phase": trace["cta_phase"],
+        "kdm_cues": trace["kdm_cues"],
+        "kdm_heuristic": trace["kdm_heuristic"],
+        "kdm_risk_rating": trace["kdm_risk_rating"],
+        "kdm_confidence": trace["kdm_confidence"],
+        "response_time_ms": trace["response_time_ms"],
+        "client_response_time_ms": trace["client_response_time_ms"],
+        "provenance_session_id": provenance["session_id"],
+        "provenance_response_id": provenance["response_id"],
+    }
+
+class ParquetTraceWriter:
+    """Writes TraceExporter traces as typed, flattened Parquet in record batches.
+
+    Memory is bounded by batch_size rows; each flushed batch becomes a
+    row group, so readers can memory-map the file and skip what they
+    don't need.
+    """
+
+    def __init__(self, sink, compression: str = "zstd", batch_size: int = 5000):
+        self.schema = _trace_schema()
+        self.batch_size = batch_size
+        self._rows: List[Dict] = []
+        self._writer = pq.ParquetWriter(sink, self.schema, compression=compression)
+
+    def write_traces(self, traces: Iterable[Dict]):
+        for trace in traces:
+            self._rows.append(_flatten(trace))
+            if len(self._rows) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_batch(pa.RecordBatch.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def merge_parquet_parts(part_paths: List[str], path: str, compression: str, batch_size: int = 5000):
+    """Concatenate Parquet parts batch by batch without loading any part whole"""
+    with pq.ParquetWriter(path, _trace_schema(), compression=compression) as writer:
+        for part_path in part_paths:
+            for batch in pq.ParquetFile(part_path).iter_batches(batch_size=batch_size):
+                writer.write_batch(batch)
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import uuid
+from typing import Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..models.scenario import Scenario
+from .session_cursor import get_scenario_sequence
+
+# experiment id -> (etag, serialized body)
+_bundle_cache = TTLCache(maxsize=256, ttl=600)
+
+def invalidate_bundles():
+    """Scenario edits can change any bundle that references them"""
+    _bundle_cache.clear()
+
+def _serialize_scenario(scenario: Scenario) -> dict:
+    return {
+        "id": str(scenario.id),
+        "title": scenario.title,
+        "context": scenario.context,
+        "decision_point": scenario.decision_point,
+        "options": scenario.options
+    }
+
+async def build_experiment_bundle(db: AsyncSession, experiment_id: uuid.UUID) -> Optional[Tuple[str, bytes]]:
+    """Return (etag, JSON body) with every scenario of the experiment in sequence order"""
+    cached = _bundle_cache.get(experiment_id)
+    if cached is not None:
+        return cached
+
+    sequence = await get_scenario_sequence(db, experiment_id)
+    if sequence is None:
+        return None
+
+    # One IN query for the whole sequence, however many steps it has
+    rows = (await db.execute(select(Scenario).where(Scenario.id.in_(set(sequence))))).scalars().all()
+    by_id = {scenario.id: _serialize_scenario(scenario) for scenario in rows}
+
+    steps = [
+        {"step_number": index + 1, "scenario": by_id[scenario_id]}
+        for index, scenario_id in enumerate(sequence)
+        if scenario_id in by_id
+    ]
+    payload = {
+        "experiment_id": str(experiment_id),
+        "total_steps": len(sequence),
+        "steps": steps
+    }
+    body = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+    _bundle_cache.set(experiment_id, (etag, body))
+    return etag, body
@@ -1,78 +1,165 @@
-import json
-from datetime import datetime
-from typing import List
-from sqlalchemy.orm import Session
-from ..models.session import Session as SessionModel, ScenarioResponse
-from ..models.scenario import Scenario
-
-class TraceExporter:
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def export_session_to_jsonl(self, session_id: str) -> str:
-        """Export session data in KDMA-enriched JSONL format"""
-        session = self.db.query(SessionModel).filter_by(id=session_id).first()
-        if not session:
-            raise ValueError("Session not found")
-            
-        responses = self.db.query(ScenarioResponse).filter_by(
-            session_id=session_id
-        ).order_by(ScenarioResponse.step_number).all()
-        
-        traces = []
-        
-        for response in responses:
-            scenario = response.scenario
-            
-            # Build observation
-            obs_t = {
-                "scenario_title": scenario.title,
-                "scenario_context": scenario.context,
-                "decision_point": scenario.decision_point,
-                "available_options": scenario.options
-            }
-            
-            # Calculate response time
-            response_time = 0
-            if response.responded_at and response.presented_at:
-                response_time = int((response.responded_at - response.presented_at).total_seconds() * 1000)
-            
-            # Build trace entry matching KDMA spec
-            trace = {
-                "dataset_version": "1.0.0",
-                "session_id": str(session_id),
-                "operator_id": session.operator_id,
-                "scenario_id": str(response.scenario_id),
-                "timestamp": response.responded_at.isoformat() + "Z" if response.responded_at else datetime.utcnow().isoformat() + "Z",
-                "step": response.step_number,
-                "obs_t": obs_t,
-                "act_t": response.selected_option or response.custom_response or "",
-                "r_env_t": 0.0,  # No environmental reward in text scenarios
-                "r_human_t": response.confidence_rating,
-                "rationale_t": self._extract_rationale(response.think_aloud_transcript),
-                "cta_phase": None,  # Will be filled by analysis
-                "kdm_cues": [],     # Will be filled by analysis
-                "kdm_heuristic": None,  # Will be filled by analysis
-                "kdm_risk_rating": response.risk_rating,
-                "kdm_confidence": response.confidence_rating,
-                "provenance": {
-                    "session_id": str(session_id),
-                    "response_id": str(response.id)
-                }
-            }
-            
-            traces.append(trace)
-        
-        # Convert to JSONL
-        return "\n".join(json.dumps(trace) for trace in traces)
-    
-    def _extract_rationale(self, transcript: str) -> str:
-        """Extract concise rationale from transcript"""
-        if not transcript:
-            return ""
-        
-        # Take first 280 characters
-        if len(transcript) <= 280:
-            return transcript
-        else:
-            return transcript[:277] + "..."
+import json
+import uuid
+from datetime import datetime
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy.orm import Session
+from ..models.session import Session as SessionModel, ScenarioResponse
+from ..models.scenario import Scenario
+from .kdma_enrichment import KdmaEnricher, kdma_enricher, empty_enrichment
+
+# Responses without a scenario (unset, or since deleted) still export, observing nothing
+EMPTY_OBSERVATION = {"scenario_title": None, "scenario_context": None, "decision_point": None, "available_options": []}
+
+class TraceExporter:
+    # Rows fetched per round trip from the server-side cursor
+    BATCH_SIZE = 500
+    
+    def __init__(self, db: Session, enricher: Optional[KdmaEnricher] = kdma_enricher):
+        self.db = db
+        # Fills cta_phase/kdm_cues/kdm_heuristic; None leaves them empty
+        self.enricher = enricher
+        # Observation blocks memoized per scenario id, shared across sessions
+        self._observations: Dict[uuid.UUID, Dict] = {}
+    
+    def export_session_to_jsonl(self, session_id: str) -> str:
+        """Export session data in KDMA-enriched JSONL format"""
+        return "\n".join(json.dumps(trace) for trace in self.iter_session_traces(session_id))
+    
+    def stream_session_jsonl(self, session_id: str) -> Iterator[str]:
+        """Stream session traces as JSONL lines.
+        
+        The session lookup runs eagerly so a missing session raises
+        ValueError before the first byte is sent.
+        """
+        session = self._get_session(session_id)
+        return (json.dumps(trace) + "\n" for trace in self._iter_traces(session))
+    
+    def iter_session_traces(self, session_id: str) -> Iterator[Dict]:
+        """Yield KDMA trace dicts one at a time, in step order"""
+        session = self._get_session(session_id)
+        return self._iter_traces(session)
+    
+    def build_traces(
+        self,
+        responses: List[ScenarioResponse],
+        session_for: Callable[[ScenarioResponse], SessionModel]
+    ) -> List[Dict]:
+        """Traces for any batch of responses, e.g. a page spanning several sessions.
+        
+        Scenarios not seen before are loaded in one query and memoized,
+        and the batch's transcripts are enriched in one call.
+        """
+        self._load_observations(response.scenario_id for response in responses)
+        if self.enricher is None:
+            enrichments = [empty_enrichment() for _ in responses]
+        else:
+            enrichments = self.enricher.enrich_batch(response.think_aloud_transcript for response in responses)
+        return [
+            self._build_trace(
+                session_for(response), response, self._observations.get(response.scenario_id, EMPTY_OBSERVATION), enrichment
+            )
+            for response, enrichment in zip(responses, enrichments)
+        ]
+    
+    def _get_session(self, session_id) -> SessionModel:
+        session = self.db.query(SessionModel).filter_by(id=uuid.UUID(str(session_id))).first()
+        if not session:
+            raise ValueError("Session not found")
+        return session
+    
+    def _iter_traces(self, session: SessionModel) -> Iterator[Dict]:
+        self._prefetch_observations(session.id)
+        
+        responses = self.db.query(ScenarioResponse).filter_by(
+            session_id=session.id
+        ).order_by(ScenarioResponse.step_number).yield_per(self.BATCH_SIZE)
+        
+        responses = iter(responses)
+        while True:
+            batch = list(islice(responses, self.BATCH_SIZE))
+            if not batch:
+                break
+            yield from self.build_traces(batch, lambda response: session)
+    
+    def _prefetch_observations(self, session_id: uuid.UUID):
+        """Load every scenario the session references in one query instead of one per response"""
+        referenced = self.db.query(ScenarioResponse.scenario_id).filter(
+            ScenarioResponse.session_id == session_id
+        ).distinct()
+        self._load_observations(scenario_id for (scenario_id,) in referenced)
+    
+    def _load_observations(self, scenario_ids: Iterable[uuid.UUID]):
+        missing = {
+            scenario_id for scenario_id in scenario_ids
+            if scenario_id is not None and scenario_id not in self._observations
+        }
+        if not missing:
+            return
+        
+        scenarios = self.db.query(
+            Scenario.id, Scenario.title, Scenario.context, Scenario.decision_point, Scenario.options
+        ).filter(Scenario.id.in_(missing))
+        
+        for scenario in scenarios:
+            self._observations[scenario.id] = {
+                "scenario_title": scenario.title,
+                "scenario_context": scenario.context,
+                "decision_point": scenario.decision_point,
+                "available_options": scenario.options
+            }
+        for scenario_id in missing:
+            self._observations.setdefault(scenario_id, EMPTY_OBSERVATION)
+    
+    def _build_trace(
+        self,
+        session: SessionModel,
+        response: ScenarioResponse,
+        obs_t: Dict,
+        enrichment: Optional[Dict] = None
+    ) -> Dict:
+        session_id = session.id
+        if enrichment is None:
+            enrichment = self.enricher.enrich(response.think_aloud_transcript) if self.enricher else empty_enrichment()
+        
+        # Server-measured latency; rows recorded before it was stored fall back to the timestamps
+        response_time = response.response_time_ms
+        if response_time is None and response.responded_at and response.presented_at:
+            response_time = int((response.responded_at - response.presented_at).total_seconds() * 1000)
+        
+        # Build trace entry matching KDMA spec
+        return {
+            "dataset_version": "1.0.0",
+            "session_id": str(session_id),
+            "operator_id": session.operator_id,
+            "scenario_id": str(response.scenario_id) if response.scenario_id else None,
+            "timestamp": response.responded_at.isoformat() + "Z" if response.responded_at else datetime.utcnow().isoformat() + "Z",
+            "step": response.step_number,
+            "obs_t": obs_t,
+            "act_t": response.selected_option or response.custom_response or "",
+            "r_env_t": 0.0,  # No environmental reward in text scenarios
+            "r_human_t": response.confidence_rating,
+            "rationale_t": self._extract_rationale(response.think_aloud_transcript),
+            "cta_phase": enrichment["cta_phase"],
+            "kdm_cues": enrichment["kdm_cues"],
+            "kdm_heuristic": enrichment["kdm_heuristic"],
+            "kdm_risk_rating": response.risk_rating,
+            "kdm_confidence": response.confidence_rating,
+            "response_time_ms": response_time,
+            "client_response_time_ms": response.client_response_time_ms,
+            "provenance": {
+                "session_id": str(session_id),
+                "response_id": str(response.id)
+            }
+        }
+    
+    def _extract_rationale(self, transcript: str) -> str:
+        """Extract concise rationale from transcript"""
+        if not transcript:
+            return ""
+        
+        # Take first 280 characters
+        if len(transcript) <= 280:
+            return transcript
+        else:
+            return transcript[:277] + "..."
@@ -0,0 +1,145 @@
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Lexicon = Dict[str, Sequence[str]]
+
+# Cognitive task analysis phase the participant is voicing, in CTA order
+CTA_PHASES: Lexicon = {
+    "detection": ("noticed", "alert", "flagged", "spotted", "detected", "suspicious", "red flag"),
+    "situation_assessment": (
+        "investigate", "look into", "figure out", "what's going on", "logs", "indicators",
+        "assess", "context", "check the"
+    ),
+    "option_evaluation": (
+        "options", "alternatively", "on the other hand", "compare", "trade-off", "tradeoff",
+        "versus", "pros and cons", "weigh", "could either"
+    ),
+    "decision": ("i'll", "i will", "i'm going to", "going with", "decide", "decided", "choose", "chose", "my decision"),
+    "monitoring": ("monitor", "keep an eye", "watch for", "follow up", "track"),
+}
+
+# Situation cues the participant attends to
+KDM_CUES: Lexicon = {
+    "phishing": ("phishing", "phish", "suspicious email", "spoofed", "credential harvesting"),
+    "malware": ("malware", "ransomware", "trojan", "payload", "virus"),
+    "anomalous_access": (
+        "unusual login", "failed login", "failed logins", "brute force", "impossible travel",
+        "unauthorized access", "privilege escalation"
+    ),
+    "data_exfiltration": ("exfiltration", "exfiltrate", "data leak", "large transfer", "outbound traffic"),
+    "lateral_movement": ("lateral movement", "pivot", "spreading"),
+    "ai_recommendation": ("the ai", "ai recommends", "ai suggests", "ai's", "recommendation", "the system suggests"),
+    "ai_explanation": ("rationale", "explanation", "reasoning", "justification"),
+    "time_pressure": ("quickly", "urgent", "time pressure", "no time", "immediately", "asap", "right away"),
+    "business_impact": ("downtime", "business impact", "production", "customers", "revenue", "disrupt"),
+    "uncertainty": ("not sure", "unsure", "uncertain", "maybe", "might be", "i don't know", "unclear", "ambiguous"),
+    "false_positive": ("false positive", "benign", "legitimate"),
+}
+
+# Decision heuristic the participant applies
+KDM_HEURISTICS: Lexicon = {
+    "trust_automation": (
+        "trust the ai", "ai is right", "go with the ai", "follow the ai", "accept the recommendation",
+        "agree with the ai"
+    ),
+    "distrust_automation": ("don't trust", "override", "ai is wrong", "ignore the ai", "second-guess", "disagree with the ai"),
+    "seek_information": ("more information", "need more", "gather more", "ask for", "verify", "double check", "confirm first"),
+    "risk_aversion": (
+        "better safe than sorry", "err on the side of caution", "to be safe", "worst case", "can't risk",
+        "just in case"
+    ),
+    "precedent": ("last time", "seen this before", "in my experience", "usually", "typically"),
+    "containment_first": ("isolate", "contain", "quarantine", "block", "shut down", "disconnect"),
+}
+
+def empty_enrichment() -> Dict:
+    return {"cta_phase": None, "kdm_cues": [], "kdm_heuristic": None}
+
+class KdmaEnricher:
+    """Offline, rule-based tagging of think-aloud transcripts.
+    
+    Each lexicon is compiled into one regex shaped like a trie (shared
+    prefixes are matched once, longer phrases win) and run over the
+    lowercased transcript, so a field is annotated in a single pass
+    whose cost barely grows with the lexicon. The fields are scanned
+    separately because their phrases overlap: in "I will trust the AI"
+    the heuristic's "trust the ai" must not swallow the cue "the ai".
+    The phase and heuristic are the labels with the most matches (ties go
+    to whichever was mentioned first); cues are every label matched, in
+    order of first mention.
+    """
+    
+    def __init__(
+        self,
+        phases: Lexicon = CTA_PHASES,
+        cues: Lexicon = KDM_CUES,
+        heuristics: Lexicon = KDM_HEURISTICS
+    ):
+        # field -> (pattern, phrase -> [label]); one phrase may feed several labels
+        self._fields: Dict[str, Tuple[re.Pattern, Dict[str, List[str]]]] = {}
+        for field, lexicon in (("cta_phase", phases), ("kdm_cues", cues), ("kdm_heuristic", heuristics)):
+            labels: Dict[str, List[str]] = {}
+            for label, phrases in lexicon.items():
+                for phrase in phrases:
+                    labels.setdefault(phrase.lower(), []).append(label)
+            pattern = re.compile(rf"(?<!\w){_trie_pattern(labels)}(?!\w)")
+            self._fields[field] = (pattern, labels)
+    
+    def enrich(self, transcript: Optional[str]) -> Dict:
+        """cta_phase, kdm_cues and kdm_heuristic for one transcript"""
+        if not transcript:
+            return empty_enrichment()
+        
+        # Lowercasing once, rather than matching case-insensitively, keeps every
+        # match a lexicon key: IGNORECASE also matches "ſ" for "s", or "İ" for "i"
+        text = transcript.replace("’", "'").lower()
+        # Counter keeps first-seen order: most_common breaks ties by it, and cues are listed in it
+        counts = {field: Counter() for field in self._fields}
+        for field, (pattern, labels) in self._fields.items():
+            for match in pattern.finditer(text):
+                counts[field].update(labels[match.group()])
+        
+        return {
+            "cta_phase": _top(counts["cta_phase"]),
+            "kdm_cues": list(counts["kdm_cues"]),
+            "kdm_heuristic": _top(counts["kdm_heuristic"]),
+        }
+    
+    def enrich_batch(self, transcripts: Iterable[Optional[str]]) -> List[Dict]:
+        """enrich() over a batch, scanning each distinct transcript once"""
+        transcripts = list(transcripts)
+        distinct = {transcript: self.enrich(transcript) for transcript in set(transcripts)}
+        return [distinct[transcript] for transcript in transcripts]
+
+def _trie_pattern(phrases: Iterable[str]) -> str:
+    """Regex matching any of phrases, built as a prefix trie.
+    
+    re tries a flat alternation branch by branch at every position; the
+    trie form rejects a position after one character in most cases.
+    Branches are greedy, so the longest phrase at a position matches.
+    """
+    trie: Dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    
+    def render(node: Dict) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if "" in node:
+            # A phrase may end here; prefer continuing to a longer one
+            body = "(?:" + body + ")?"
+        return body
+    
+    return render(trie)
+
+def _top(counter: Counter) -> Optional[str]:
+    ranked = counter.most_common(1)
+    return ranked[0][0] if ranked else None
+
+kdma_enricher = KdmaEnricher()
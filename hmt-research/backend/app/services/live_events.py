@@ -0,0 +1,236 @@
+import asyncio
+import json
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Set
+import asyncpg
+from sqlalchemy import func, select
+from ..core.config import settings
+from ..core.database import async_engine
+
+NOTIFY_CHANNEL = "hmt_session_events"
+# Postgres caps NOTIFY payloads at 8000 bytes; events are a few hundred
+NOTIFY_PAYLOAD_LIMIT = 7900
+RECONNECT_SECONDS = 5.0
+
+def session_event(event_type: str, session_id: uuid.UUID, experiment_id: Optional[uuid.UUID], **fields) -> Dict:
+    """JSON-ready event: session_started, step_advanced, response_submitted or session_ended"""
+    return {
+        "type": event_type,
+        "session_id": str(session_id),
+        "experiment_id": str(experiment_id) if experiment_id else None,
+        "at": datetime.utcnow().isoformat() + "Z",
+        **{key: str(value) if isinstance(value, uuid.UUID) else value for key, value in fields.items()}
+    }
+
+class Subscription:
+    """One observer's bounded event queue, optionally scoped to a session or experiment"""
+    
+    def __init__(self, maxsize: int, session_id: Optional[uuid.UUID] = None, experiment_id: Optional[uuid.UUID] = None):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.session_id = str(session_id) if session_id else None
+        self.experiment_id = str(experiment_id) if experiment_id else None
+        self.dropped = 0
+    
+    def matches(self, event: Dict) -> bool:
+        return (
+            (self.session_id is None or event["session_id"] == self.session_id)
+            and (self.experiment_id is None or event["experiment_id"] == self.experiment_id)
+        )
+    
+    def offer(self, event: Dict):
+        # A slow observer loses its oldest events rather than stalling the publisher
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(event)
+    
+    async def get(self) -> Dict:
+        return await self.queue.get()
+
+class LiveEventHub:
+    """In-process fan-out of session events to every matching subscriber"""
+    
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self.delivered = 0
+        self.dropped = 0
+    
+    def subscribe(self, session_id: Optional[uuid.UUID] = None, experiment_id: Optional[uuid.UUID] = None) -> Subscription:
+        subscription = Subscription(self.queue_size, session_id, experiment_id)
+        self._subscribers.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        self.dropped += subscription.dropped
+    
+    def fan_out(self, event: Dict):
+        for subscription in list(self._subscribers):
+            if subscription.matches(event):
+                subscription.offer(event)
+                self.delivered += 1
+    
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "delivered": self.delivered,
+            "dropped": self.dropped + sum(subscription.dropped for subscription in self._subscribers),
+        }
+
+class MemoryBroker:
+    """Single-process deployments: publishing is the local fan-out itself"""
+    
+    def __init__(self, hub: LiveEventHub):
+        self.hub = hub
+        self.published = 0
+    
+    async def start(self):
+        pass
+    
+    async def stop(self):
+        pass
+    
+    async def publish_many(self, events: Sequence[Dict]):
+        for event in events:
+            self.published += 1
+            self.hub.fan_out(event)
+    
+    def stats(self) -> dict:
+        return {"broker": "memory", "published": self.published}
+
+class PostgresBroker:
+    """Multi-worker deployments: events travel through Postgres LISTEN/NOTIFY.
+    
+    Each worker publishes with pg_notify over its normal pool and keeps
+    one dedicated connection listening on NOTIFY_CHANNEL, whose callback
+    feeds the worker's own hub. Every worker therefore sees every event,
+    and the database already in the stack is the only broker needed.
+    A payload is a JSON array of events, so a batch of responses costs
+    one notification rather than one per row.
+    """
+    
+    def __init__(self, hub: LiveEventHub):
+        self.hub = hub
+        self.published = 0
+        self.received = 0
+        self.errors = 0
+        self._connection = None
+        self._task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen_loop())
+    
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+    
+    async def publish_many(self, events: Sequence[Dict]):
+        if not events:
+            return
+        try:
+            async with async_engine.connect() as conn:
+                for payload in _payloads(events):
+                    await conn.execute(select(func.pg_notify(NOTIFY_CHANNEL, payload)))
+                await conn.commit()
+            self.published += len(events)
+        except Exception as e:
+            # Observers miss these updates; the write that caused them has already committed
+            self.errors += 1
+            print(f"Live event publish error: {e}")
+    
+    def _on_notify(self, connection, pid, channel, payload):
+        for event in json.loads(payload):
+            self.received += 1
+            self.hub.fan_out(event)
+    
+    async def _listen_loop(self):
+        dsn = async_engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            try:
+                self._connection = await asyncpg.connect(dsn)
+                await self._connection.add_listener(NOTIFY_CHANNEL, self._on_notify)
+                while not self._connection.is_closed():
+                    await asyncio.sleep(RECONNECT_SECONDS)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.errors += 1
+                print(f"Live event listener error: {e}")
+            finally:
+                if self._connection is not None and not self._connection.is_closed():
+                    await self._connection.close()
+                self._connection = None
+            await asyncio.sleep(RECONNECT_SECONDS)
+    
+    def stats(self) -> dict:
+        return {
+            "broker": "postgres",
+            "listening": self._connection is not None and not self._connection.is_closed(),
+            "published": self.published,
+            "received": self.received,
+            "errors": self.errors,
+        }
+
+def _payloads(events: Sequence[Dict]) -> List[str]:
+    """JSON arrays of events, each within NOTIFY_PAYLOAD_LIMIT bytes"""
+    payloads: List[str] = []
+    chunk: List[str] = []
+    size = 2
+    for event in events:
+        encoded = json.dumps(event)
+        if chunk and size + len(encoded.encode()) + 1 > NOTIFY_PAYLOAD_LIMIT:
+            payloads.append("[" + ",".join(chunk) + "]")
+            chunk, size = [], 2
+        chunk.append(encoded)
+        size += len(encoded.encode()) + 1
+    payloads.append("[" + ",".join(chunk) + "]")
+    return payloads
+
+BROKERS = {"memory": MemoryBroker, "postgres": PostgresBroker}
+
+class LiveEvents:
+    """Session event publishing and subscription for live monitoring.
+    
+    Writers publish after their transaction commits; the broker delivers
+    the event to the hub of every worker, which copies it to each
+    matching observer's queue. One write costs one publish however many
+    operators are watching, and publish_many sends a write's events
+    together.
+    """
+    
+    def __init__(self, backend_name: str, queue_size: int):
+        if backend_name not in BROKERS:
+            raise ValueError(f"Unknown live events backend: {backend_name}")
+        self.hub = LiveEventHub(queue_size)
+        self.broker = BROKERS[backend_name](self.hub)
+    
+    async def start(self):
+        await self.broker.start()
+    
+    async def stop(self):
+        await self.broker.stop()
+    
+    async def publish(self, event: Dict):
+        await self.broker.publish_many([event])
+    
+    async def publish_many(self, events: Sequence[Dict]):
+        await self.broker.publish_many(events)
+    
+    def subscribe(self, session_id: Optional[uuid.UUID] = None, experiment_id: Optional[uuid.UUID] = None) -> Subscription:
+        return self.hub.subscribe(session_id, experiment_id)
+    
+    def unsubscribe(self, subscription: Subscription):
+        self.hub.unsubscribe(subscription)
+    
+    def stats(self) -> dict:
+        return {**self.broker.stats(), **self.hub.stats()}
+
+live_events = LiveEvents(
+    backend_name=settings.LIVE_EVENTS_BACKEND,
+    queue_size=settings.LIVE_EVENTS_QUEUE_SIZE
+)
@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from ..core.config import settings
+from ..models.user import pwd_context
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded worker pool so it never blocks the event loop.
+
+    bcrypt releases the GIL while hashing, so a thread pool gets real
+    parallelism without the cost of shipping work to other processes.
+    """
+
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_seconds = 0.0
+
+    def _timed(self, fn, *args):
+        with self._lock:
+            self.active += 1
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.total_seconds += time.perf_counter() - started
+
+    async def _submit(self, fn, *args):
+        # Admission control: shed load instead of queueing logins forever
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many concurrent password operations, please retry",
+                headers={"Retry-After": "1"},
+            )
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._timed, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(pwd_context.hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password, returning a new hash if the stored one uses outdated settings"""
+        return await self._submit(pwd_context.verify_and_update, password, hashed_password)
+
+    def stats(self) -> dict:
+        with self._lock:
+            active = self.active
+            completed = self.completed
+            total_seconds = self.total_seconds
+        return {
+            "workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "active": active,
+            "queue_depth": max(self.pending - active, 0),
+            "completed": completed,
+            "rejected": self.rejected,
+            "avg_ms": round(total_seconds / completed * 1000, 1) if completed else 0.0,
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+password_hasher = PasswordHasher(
+    max_workers=settings.MAX_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
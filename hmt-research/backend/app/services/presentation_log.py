@@ -0,0 +1,123 @@
+import asyncio
+import uuid
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..core.config import settings
+from ..core.database import AsyncSessionLocal
+from ..models.session import PresentationEvent
+
+# Longer than any participant should dwell on a step; older lookups go to the table
+RECENT_TTL_SECONDS = 6 * 3600
+
+class PresentationLog:
+    """Server-side record of when each session step was first shown.
+    
+    record() only touches memory, so serving a scenario costs no write:
+    the first presentation of a step is kept (a reload doesn't restart
+    the clock) and queued, and a background task appends the queue to
+    presentation_events in one INSERT every flush_seconds. A submit
+    handled by the same worker finds the time in memory; one handled by
+    another worker reads it from the table once it has been flushed.
+    """
+    
+    def __init__(self, flush_seconds: float, cache_size: int):
+        self.flush_seconds = flush_seconds
+        self._recent = TTLCache(maxsize=cache_size, ttl=RECENT_TTL_SECONDS)
+        self._pending: Dict[Tuple[uuid.UUID, int], Dict] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.recorded = 0
+        self.flushed = 0
+        self.flush_errors = 0
+        self.lookups = 0
+        self.misses = 0
+    
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+    
+    def start(self):
+        if not self.running:
+            self._task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self):
+        """Stop the flush loop and write whatever is still queued"""
+        if self.running:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        await self.flush()
+    
+    def record(self, session_id: uuid.UUID, step_number: int, scenario_id: uuid.UUID) -> datetime:
+        """Note that a step is being shown now; returns its first presentation time"""
+        key = (session_id, step_number)
+        presented_at = self._recent.get(key)
+        if presented_at is None:
+            presented_at = datetime.utcnow()
+            self._recent.set(key, presented_at)
+            self._pending.setdefault(key, {
+                "session_id": session_id,
+                "step_number": step_number,
+                "scenario_id": scenario_id,
+                "presented_at": presented_at
+            })
+            self.recorded += 1
+        return presented_at
+    
+    async def presented_at(self, db: AsyncSession, session_id: uuid.UUID, step_number: int) -> Optional[datetime]:
+        """When the step was first shown, or None if no worker has recorded it yet"""
+        self.lookups += 1
+        presented_at = self._recent.get((session_id, step_number))
+        if presented_at is None:
+            presented_at = await db.scalar(select(PresentationEvent.presented_at).where(
+                PresentationEvent.session_id == session_id,
+                PresentationEvent.step_number == step_number
+            ))
+            if presented_at is None:
+                self.misses += 1
+        return presented_at
+    
+    async def flush(self) -> bool:
+        if not self._pending:
+            return True
+        batch, self._pending = self._pending, {}
+        # Another worker may have shown the same step first; its row wins
+        stmt = pg_insert(PresentationEvent).values(list(batch.values())).on_conflict_do_nothing(
+            index_elements=[PresentationEvent.session_id, PresentationEvent.step_number]
+        )
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(stmt)
+                await db.commit()
+        except Exception as e:
+            # Keep the batch and try again on the next flush
+            self.flush_errors += 1
+            print(f"Presentation log write error: {e}")
+            self._pending = {**batch, **self._pending}
+            return False
+        self.flushed += len(batch)
+        return True
+    
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(self.flush_seconds)
+            await self.flush()
+    
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "pending": len(self._pending),
+            "recorded": self.recorded,
+            "flushed": self.flushed,
+            "flush_errors": self.flush_errors,
+            "lookups": self.lookups,
+            "misses": self.misses,
+        }
+
+presentation_log = PresentationLog(
+    flush_seconds=settings.PRESENTATION_FLUSH_SECONDS,
+    cache_size=settings.PRESENTATION_CACHE_SIZE
+)
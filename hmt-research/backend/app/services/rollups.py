@@ -0,0 +1,215 @@
+import uuid
+from bisect import bisect_right
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import Float, cast, delete, func, insert, select, text
+from sqlalchemy.dialects.postgresql import array, insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from ..models.rollup import ResponseRollup, ResponseTimeRollup
+from ..models.scenario import Scenario
+from ..models.session import Session as SessionModel, ScenarioResponse
+
+# Upper-exclusive bucket edges in ms: bucket i holds edges[i-1] <= t < edges[i],
+# bucket 0 everything faster and the last bucket everything slower. Matches
+# Postgres width_bucket(t, edges), which the rebuild uses.
+RESPONSE_TIME_BUCKETS_MS = (
+    250, 500, 750, 1000, 1500, 2000, 3000, 4000, 5000, 7500, 10000,
+    15000, 20000, 30000, 45000, 60000, 90000, 120000, 180000, 300000
+)
+SUM_COLUMNS = (
+    "responses", "confidence_n", "confidence_sum", "confidence_sumsq", "risk_n", "risk_sum", "risk_sumsq",
+    "response_time_n", "response_time_sum", "response_time_sumsq"
+)
+PERCENTILES = (50, 90, 95, 99)
+
+def response_time_bucket(ms: int) -> int:
+    return bisect_right(RESPONSE_TIME_BUCKETS_MS, ms)
+
+def _accumulate(experiment_id: uuid.UUID, rows: Iterable[Dict]) -> Tuple[Dict, Dict]:
+    """Fold response dicts into per-key deltas for the two rollup tables"""
+    totals: Dict[Tuple, Dict[str, float]] = {}
+    buckets: Dict[Tuple, int] = {}
+    for row in rows:
+        if row.get("scenario_id") is None:
+            continue
+        key = (experiment_id, row["scenario_id"], row.get("selected_option") or "custom")
+        delta = totals.setdefault(key, dict.fromkeys(SUM_COLUMNS, 0))
+        delta["responses"] += 1
+        for name in ("confidence", "risk"):
+            value = row.get(f"{name}_rating")
+            if value is not None:
+                delta[f"{name}_n"] += 1
+                delta[f"{name}_sum"] += value
+                delta[f"{name}_sumsq"] += value * value
+        ms = row.get("response_time_ms")
+        if ms is not None:
+            delta["response_time_n"] += 1
+            delta["response_time_sum"] += ms
+            delta["response_time_sumsq"] += float(ms) * ms
+            bucket_key = (experiment_id, row["scenario_id"], response_time_bucket(ms))
+            buckets[bucket_key] = buckets.get(bucket_key, 0) + 1
+    return totals, buckets
+
+async def record_responses(db: AsyncSession, experiment_id: uuid.UUID, rows: Iterable[Dict]):
+    """Add newly inserted responses to the rollups inside the caller's transaction.
+    
+    Each touched rollup row is bumped with one INSERT ... ON CONFLICT DO
+    UPDATE, so the totals commit or roll back together with the responses.
+    Keys are written in sorted order so concurrent batches lock rows in
+    the same order and can't deadlock.
+    """
+    totals, buckets = _accumulate(experiment_id, rows)
+    if not totals:
+        return
+    
+    now = datetime.utcnow()
+    stmt = pg_insert(ResponseRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ResponseRollup.experiment_id, ResponseRollup.scenario_id, ResponseRollup.option],
+        set_={
+            **{column: getattr(ResponseRollup, column) + stmt.excluded[column] for column in SUM_COLUMNS},
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    await db.execute(stmt, [
+        {"experiment_id": key[0], "scenario_id": key[1], "option": key[2], "updated_at": now, **totals[key]}
+        for key in sorted(totals, key=str)
+    ])
+    
+    if buckets:
+        stmt = pg_insert(ResponseTimeRollup)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ResponseTimeRollup.experiment_id, ResponseTimeRollup.scenario_id, ResponseTimeRollup.bucket],
+            set_={"count": ResponseTimeRollup.count + stmt.excluded["count"]}
+        )
+        await db.execute(stmt, [
+            {"experiment_id": key[0], "scenario_id": key[1], "bucket": key[2], "count": buckets[key]}
+            for key in sorted(buckets, key=str)
+        ])
+
+def rebuild_rollups(db: Session, experiment_id: Optional[uuid.UUID] = None) -> int:
+    """Recompute the rollups from scenario_responses, for one experiment or all.
+    
+    Runs as two INSERT ... SELECT GROUP BY statements in one transaction.
+    The tables are locked against concurrent submits for the duration, so
+    a response is counted either by the rebuild or by its own increment,
+    never both or neither. Returns the number of rollup rows written.
+    """
+    db.execute(text("LOCK TABLE response_rollups, response_time_rollups IN SHARE ROW EXCLUSIVE MODE"))
+    clear_totals = delete(ResponseRollup)
+    clear_buckets = delete(ResponseTimeRollup)
+    scope = [SessionModel.experiment_id.isnot(None), ScenarioResponse.scenario_id.isnot(None)]
+    if experiment_id is not None:
+        clear_totals = clear_totals.where(ResponseRollup.experiment_id == experiment_id)
+        clear_buckets = clear_buckets.where(ResponseTimeRollup.experiment_id == experiment_id)
+        scope.append(SessionModel.experiment_id == experiment_id)
+    db.execute(clear_totals)
+    db.execute(clear_buckets)
+    
+    confidence, risk, ms = ScenarioResponse.confidence_rating, ScenarioResponse.risk_rating, ScenarioResponse.response_time_ms
+    option = func.coalesce(ScenarioResponse.selected_option, "custom")
+    totals = select(
+        SessionModel.experiment_id,
+        ScenarioResponse.scenario_id,
+        option,
+        func.count(),
+        func.count(confidence),
+        func.coalesce(func.sum(confidence), 0),
+        func.coalesce(func.sum(confidence * confidence), 0),
+        func.count(risk),
+        func.coalesce(func.sum(risk), 0),
+        func.coalesce(func.sum(risk * risk), 0),
+        func.count(ms),
+        func.coalesce(func.sum(ms), 0),
+        func.coalesce(func.sum(cast(ms, Float) * ms), 0),
+        func.now()
+    ).join(SessionModel, SessionModel.id == ScenarioResponse.session_id).where(*scope).group_by(
+        SessionModel.experiment_id, ScenarioResponse.scenario_id, option
+    )
+    written = db.execute(insert(ResponseRollup).from_select(
+        ["experiment_id", "scenario_id", "option", *SUM_COLUMNS, "updated_at"], totals
+    )).rowcount
+    
+    bucket = func.width_bucket(ms, array(RESPONSE_TIME_BUCKETS_MS))
+    histogram = select(
+        SessionModel.experiment_id, ScenarioResponse.scenario_id, bucket, func.count()
+    ).join(SessionModel, SessionModel.id == ScenarioResponse.session_id).where(*scope, ms.isnot(None)).group_by(
+        SessionModel.experiment_id, ScenarioResponse.scenario_id, bucket
+    )
+    written += db.execute(insert(ResponseTimeRollup).from_select(
+        ["experiment_id", "scenario_id", "bucket", "count"], histogram
+    )).rowcount
+    db.commit()
+    return written
+
+def _mean_std(n: int, total: float, sumsq: float) -> Tuple[Optional[float], Optional[float]]:
+    if not n:
+        return None, None
+    mean = total / n
+    return round(mean, 3), round(float(np.sqrt(max(sumsq / n - mean * mean, 0.0))), 3)
+
+def histogram_percentiles(counts: np.ndarray) -> Dict[str, Optional[float]]:
+    """Estimate percentiles from bucket counts, interpolating linearly within a bucket"""
+    n = counts.sum()
+    if not n:
+        return {f"p{p}": None for p in PERCENTILES}
+    edges = np.array((0,) + RESPONSE_TIME_BUCKETS_MS, dtype=float)
+    # The open-ended last bucket is reported at its lower edge
+    upper = np.append(edges[1:], edges[-1])
+    cumulative = np.cumsum(counts)
+    result = {}
+    for p in PERCENTILES:
+        rank = n * p / 100
+        index = int(np.searchsorted(cumulative, rank))
+        before = cumulative[index - 1] if index else 0
+        fraction = (rank - before) / counts[index] if counts[index] else 0.0
+        result[f"p{p}"] = round(float(edges[index] + fraction * (upper[index] - edges[index])), 1)
+    return result
+
+def experiment_summary(db: Session, experiment_id: uuid.UUID) -> List[Dict]:
+    """Per-scenario statistics for an experiment, read from the rollups alone"""
+    totals = db.execute(
+        select(ResponseRollup).where(ResponseRollup.experiment_id == experiment_id)
+    ).scalars().all()
+    if not totals:
+        return []
+    
+    histograms: Dict[uuid.UUID, np.ndarray] = {}
+    for scenario_id, bucket, count in db.execute(
+        select(ResponseTimeRollup.scenario_id, ResponseTimeRollup.bucket, ResponseTimeRollup.count)
+        .where(ResponseTimeRollup.experiment_id == experiment_id)
+    ):
+        histograms.setdefault(scenario_id, np.zeros(len(RESPONSE_TIME_BUCKETS_MS) + 1, dtype=np.int64))[bucket] += count
+    
+    by_scenario: Dict[uuid.UUID, Dict] = {}
+    for rollup in totals:
+        scenario = by_scenario.setdefault(rollup.scenario_id, {"options": {}, **dict.fromkeys(SUM_COLUMNS, 0)})
+        scenario["options"][rollup.option] = rollup.responses
+        for column in SUM_COLUMNS:
+            scenario[column] += getattr(rollup, column)
+    
+    titles = dict(db.execute(select(Scenario.id, Scenario.title).where(Scenario.id.in_(list(by_scenario)))).all())
+    result = []
+    for scenario_id, stats in by_scenario.items():
+        confidence_mean, confidence_std = _mean_std(stats["confidence_n"], stats["confidence_sum"], stats["confidence_sumsq"])
+        risk_mean, risk_std = _mean_std(stats["risk_n"], stats["risk_sum"], stats["risk_sumsq"])
+        time_mean, time_std = _mean_std(stats["response_time_n"], stats["response_time_sum"], stats["response_time_sumsq"])
+        histogram = histograms.get(scenario_id, np.zeros(len(RESPONSE_TIME_BUCKETS_MS) + 1, dtype=np.int64))
+        result.append({
+            "scenario_id": str(scenario_id),
+            "title": titles.get(scenario_id),
+            "responses": stats["responses"],
+            "options": stats["options"],
+            "confidence": {"count": stats["confidence_n"], "mean": confidence_mean, "std": confidence_std},
+            "risk": {"count": stats["risk_n"], "mean": risk_mean, "std": risk_std},
+            "response_time_ms": {
+                "count": stats["response_time_n"],
+                "mean": time_mean,
+                "std": time_std,
+                **histogram_percentiles(histogram),
+                "histogram": histogram.tolist()
+            },
+        })
+    return result
@@ -0,0 +1,52 @@
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from ..core.cache import TTLCache
+from ..core.config import settings
+from .experiment_bundle import invalidate_bundles
+
+# (catalog version, *request key) -> (etag, serialized body, extra headers)
+_payload_cache = TTLCache(maxsize=settings.SCENARIO_CACHE_MAX_SIZE, ttl=settings.SCENARIO_CACHE_TTL_SECONDS)
+_version = 0
+_version_lock = threading.Lock()
+
+CachedPayload = Tuple[str, bytes, Dict[str, str]]
+
+def invalidate_scenarios():
+    """Call after any scenario write; also drops experiment bundles built from them"""
+    global _version
+    with _version_lock:
+        _version += 1
+    _payload_cache.clear()
+    invalidate_bundles()
+
+def serialize(payload) -> bytes:
+    """Compact JSON, matching FastAPI's own JSONResponse rendering"""
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+def get_or_build(
+    key: Tuple[Hashable, ...],
+    build: Callable[[], Optional[Tuple[bytes, Dict[str, str]]]]
+) -> Optional[CachedPayload]:
+    """Return a cached (etag, body, headers) for key, building it on a miss.
+
+    The catalog version is read before building, so a payload built from
+    rows that a concurrent write has since changed is stored under the
+    old version and never served afterwards.
+    """
+    cache_key = (_version,) + key
+    cached = _payload_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    built = build()
+    if built is None:
+        return None
+    body, headers = built
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    _payload_cache.set(cache_key, (etag, body, headers))
+    return etag, body, headers
+
+def stats() -> dict:
+    return {"version": _version, **_payload_cache.stats()}
@@ -1,144 +1,363 @@
-import json
-from typing import List, Dict
-from fastapi import UploadFile, HTTPException
-from sqlalchemy.orm import Session
-from ..models.scenario import Scenario
-from ..schemas.scenario import ScenarioImportResponse
-
-class ScenarioImporter:
-    def __init__(self, db: Session):
-        self.db = db
-    
-    async def import_json_file(self, file: UploadFile, user_id: str) -> ScenarioImportResponse:
-        """Import scenarios from JSON file"""
-        try:
-            content = await file.read()
-            data = json.loads(content)
-            
-            # Handle both single scenario and array
-            scenarios_data = data if isinstance(data, list) else [data]
-            
-            imported_scenarios = []
-            errors = []
-            
-            for idx, scenario_data in enumerate(scenarios_data):
-                try:
-                    # Transform the format to match our schema
-                    transformed_scenarios = self._transform_scenario_format(scenario_data)
-                    
-                    for transformed in transformed_scenarios:
-                        scenario = Scenario(
-                            title=transformed["title"],
-                            category=transformed["category"],
-                            description=transformed["description"],
-                            context=transformed["context"],
-                            decision_point=transformed["decision_point"],
-                            options=transformed["options"],
-                            meta_data=transformed["meta_data"]
-                            # Removed created_by since it's not in the model
-                        )
-                        
-                        self.db.add(scenario)
-                        imported_scenarios.append(scenario)
-                    
-                except Exception as e:
-                    errors.append(f"Scenario {idx}: {str(e)}")
-            
-            self.db.commit()
-            
-            return ScenarioImportResponse(
-                imported_count=len(imported_scenarios),
-                scenarios=imported_scenarios,
-                errors=errors
-            )
-            
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid JSON file")
-        except Exception as e:
-            self.db.rollback()
-            raise HTTPException(status_code=400, detail=str(e))
-    
-    def _transform_scenario_format(self, scenario_data: Dict) -> List[Dict]:
-        """Transform your scenario format to our expected format"""
-        # Check if this is your format (has variants)
-        if "variants" in scenario_data:
-            transformed_scenarios = []
-            
-            # Create a scenario for each variant
-            for variant in scenario_data.get("variants", []):
-                context = f"""Domain: {scenario_data.get('domain', 'Unknown')}
-Scenario: {scenario_data.get('title', 'Unknown')}
-AI Alignment: {variant.get('ai_alignment', 'unknown')}
-AI Autonomy Level: {variant.get('ai_autonomy', 'unknown')}
-
-This scenario tests decision-making in a {scenario_data.get('dominant_kdma', 'general')} situation."""
-                
-                decision_point = "How would you respond to this incident?"
-                
-                # Create options based on AI suggestions
-                options = [
-                    {
-                        "id": "A",
-                        "label": "Accept AI Recommendation",
-                        "description": variant.get('ai_rationale_clear', 'Follow the AI recommendation')
-                    },
-                    {
-                        "id": "B", 
-                        "label": "Override AI Recommendation",
-                        "description": "Reject the AI suggestion and take alternative action"
-                    },
-                    {
-                        "id": "C",
-                        "label": "Modify AI Recommendation",
-                        "description": "Partially accept but adjust the AI suggestion"
-                    },
-                    {
-                        "id": "D",
-                        "label": "Request More Information",
-                        "description": "Ask for additional analysis before deciding"
-                    }
-                ]
-                
-                # If AI rationale is ambiguous, add that as context
-                if variant.get('ai_rationale_ambiguous'):
-                    context += f"\n\nAI's explanation: {variant['ai_rationale_ambiguous']}"
-                
-                transformed = {
-                    "title": f"{scenario_data['title']} - {variant['code']}",
-                    "category": scenario_data.get('domain', 'General'),
-                    "description": f"{scenario_data['title']} with {variant['ai_alignment']} AI in {variant['ai_autonomy']} mode",
-                    "context": context,
-                    "decision_point": decision_point,
-                    "options": options,
-                    "meta_data": {
-                        "original_id": scenario_data.get('id'),
-                        "variant_code": variant.get('code'),
-                        "dominant_kdma": scenario_data.get('dominant_kdma'),
-                        "ai_alignment": variant.get('ai_alignment'),
-                        "ai_autonomy": variant.get('ai_autonomy'),
-                        "ai_rationale_clear": variant.get('ai_rationale_clear'),
-                        "ai_rationale_ambiguous": variant.get('ai_rationale_ambiguous')
-                    }
-                }
-                
-                transformed_scenarios.append(transformed)
-            
-            return transformed_scenarios
-        
-        # If it's already in the expected format
-        else:
-            # Validate required fields
-            required = ["title", "context", "decision_point", "options"]
-            for field in required:
-                if field not in scenario_data:
-                    raise ValueError(f"Missing required field: {field}")
-            
-            return [{
-                "title": scenario_data["title"],
-                "category": scenario_data.get("category", "General"),
-                "description": scenario_data.get("description", scenario_data["title"]),
-                "context": scenario_data["context"],
-                "decision_point": scenario_data["decision_point"],
-                "options": scenario_data["options"],
-                "meta_data": scenario_data.get("metadata", scenario_data.get("meta_data", {}))
-            }]
+import codecs
+import hashlib
+import json
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from ..models.scenario import Scenario
+from ..schemas.scenario import ScenarioImportResponse, ScenarioImportError
+from .scenario_cache import invalidate_scenarios
+
+READ_CHUNK_SIZE = 64 * 1024
+# A single item larger than this is treated as malformed rather than buffered
+MAX_ITEM_SIZE = 16 * 1024 * 1024
+# Characters that may continue a JSON number
+NUMBER_CHARS = "0123456789+-.eE"
+
+class ImportParseError(ValueError):
+    """The upload stopped being valid JSON at item `index`"""
+    
+    def __init__(self, index: int, message: str):
+        super().__init__(message)
+        self.index = index
+
+class ImportCancelled(Exception):
+    """Raised from a progress callback to stop an import between batches"""
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def scenario_hashes(transformed: Dict) -> Tuple[str, str]:
+    """Return (import_key, content_hash) for a transformed scenario.
+    
+    Variants are identified by original_id + variant_code, so an edited
+    pack gives them a new version. Anything else is identified by its
+    content, so only exact re-imports are deduplicated.
+    """
+    content_hash = _sha256(json.dumps(transformed, sort_keys=True, separators=(",", ":"), default=str))
+    meta_data = transformed.get("meta_data")
+    if isinstance(meta_data, dict) and meta_data.get("original_id") is not None and meta_data.get("variant_code") is not None:
+        return _sha256(f"variant:{meta_data['original_id']}:{meta_data['variant_code']}"), content_hash
+    return content_hash, content_hash
+
+def _insert_statement():
+    # A concurrent import that wrote the same key first wins; the row counts as unchanged
+    return pg_insert(Scenario).on_conflict_do_nothing(
+        index_elements=[Scenario.import_key],
+        index_where=Scenario.is_active
+    ).returning(Scenario.id)
+
+def _read_text(stream: BinaryIO) -> Iterator[Tuple[str, bool]]:
+    """Yield (text, is_last) decoded chunks"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        yield decoder.decode(chunk), False
+    yield decoder.decode(b"", final=True), True
+
+def iter_ndjson_items(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (index, item) per line; a bad line yields its exception instead of stopping"""
+    index = 0
+    pending = ""
+    for text, _ in _read_text(stream):
+        pending += text
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            if line.strip():
+                try:
+                    yield index, json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield index, e
+                index += 1
+        if len(pending) > MAX_ITEM_SIZE:
+            raise ImportParseError(index, "Line exceeds maximum item size")
+    if pending.strip():
+        try:
+            yield index, json.loads(pending)
+        except json.JSONDecodeError as e:
+            yield index, e
+
+def check_document_start(stream: BinaryIO, ndjson: bool = False):
+    """Reject an upload that is blank or, for JSON, doesn't open an array or object"""
+    for text, _ in _read_text(stream):
+        text = text.lstrip()
+        if text:
+            if not ndjson and text[0] not in "[{":
+                raise ImportParseError(0, "Expected a JSON array or object")
+            return
+    raise ImportParseError(0, "Empty document")
+
+def iter_json_items(stream: BinaryIO) -> Iterator[Tuple[int, Any]]:
+    """Yield (index, item) from a top-level JSON array, or a single object, without loading it whole"""
+    decoder = json.JSONDecoder()
+    buffer, pos, index = "", 0, 0
+    # What may come next: None before the document, then "first" (an item or "]"),
+    # "item", "separator" ("," or "]") and finally "end"
+    expect = None
+    
+    for text, final in _read_text(stream):
+        buffer = buffer[pos:] + text
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos == len(buffer):
+                break
+            char = buffer[pos]
+            if expect == "end":
+                raise ImportParseError(index, "Unexpected data after end of JSON")
+            if expect is None:
+                if char == "[":
+                    expect = "first"
+                    pos += 1
+                    continue
+                if char != "{":
+                    raise ImportParseError(index, "Expected a JSON array or object")
+            elif expect == "separator":
+                if char not in ",]":
+                    raise ImportParseError(index, "Expected ',' or ']' after array item")
+                expect = "item" if char == "," else "end"
+                pos += 1
+                continue
+            elif char == "]" and expect == "first":
+                expect = "end"
+                pos += 1
+                continue
+            elif char in ",]":
+                raise ImportParseError(index, "Expected an array item")
+            
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if final:
+                    raise ImportParseError(index, f"Invalid JSON: {e.msg}")
+                # Most likely the item continues in the next chunk
+                if len(buffer) - pos > MAX_ITEM_SIZE:
+                    raise ImportParseError(index, "Item exceeds maximum item size")
+                break
+            if not final and isinstance(item, (int, float)) and not buffer[end:].strip(NUMBER_CHARS):
+                # A number cut off by the chunk boundary still decodes; retry with more input
+                break
+            yield index, item
+            index += 1
+            pos = end
+            expect = "end" if expect is None else "separator"
+    
+    if expect is None:
+        raise ImportParseError(index, "Empty document")
+    if expect != "end":
+        raise ImportParseError(index, "Unterminated JSON array")
+
+class ScenarioImporter:
+    # Scenarios per INSERT statement and per transaction
+    BATCH_SIZE = 500
+    # Item errors reported back in full; the rest are only counted
+    MAX_REPORTED_ERRORS = 100
+    
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def import_stream(
+        self,
+        stream: BinaryIO,
+        ndjson: bool = False,
+        on_batch: Optional[Callable[["ScenarioImporter"], None]] = None
+    ) -> ScenarioImportResponse:
+        """Import scenarios from a JSON or NDJSON upload in bounded memory.
+        
+        Items are parsed incrementally, transformed, and written with one
+        INSERT per batch, each batch in its own transaction. Scenarios
+        already imported with identical content are counted as unchanged;
+        changed ones are inserted as a new version and the old row is
+        deactivated, so responses recorded against it keep its content. The response summarizes counts and per-item
+        errors. on_batch runs after every committed batch and may raise
+        ImportCancelled.
+        """
+        self.parsed_count = 0
+        self.imported_count = 0
+        self.unchanged_count = 0
+        self.failed_count = 0
+        self.errors: List[ScenarioImportError] = []
+        batch: List[Tuple[int, Dict]] = []
+        
+        items = iter_ndjson_items(stream) if ndjson else iter_json_items(stream)
+        try:
+            for index, scenario_data in items:
+                self.parsed_count = index + 1
+                try:
+                    if isinstance(scenario_data, Exception):
+                        raise ValueError(f"Invalid JSON: {scenario_data}")
+                    if not isinstance(scenario_data, dict):
+                        raise ValueError("Expected a JSON object")
+                    # Transform the format to match our schema
+                    for transformed in self._transform_scenario_format(scenario_data):
+                        batch.append((index, transformed))
+                except Exception as e:
+                    self._record_error(index, e)
+                
+                if len(batch) >= self.BATCH_SIZE:
+                    self._flush(batch)
+                    batch = []
+                    if on_batch:
+                        on_batch(self)
+        except ImportParseError as e:
+            self._flush(batch)
+            batch = []
+            if not self.parsed_count:
+                raise
+            # Earlier items are already processed and committed (possibly
+            # all unchanged); report where parsing stopped
+            self._record_error(e.index, e)
+        
+        self._flush(batch)
+        return ScenarioImportResponse(
+            imported_count=self.imported_count,
+            unchanged_count=self.unchanged_count,
+            failed_count=self.failed_count,
+            errors=self.errors
+        )
+    
+    def _flush(self, batch: List[Tuple[int, Dict]]):
+        if not batch:
+            return
+        
+        # A scenario repeated within the batch is written in a later round,
+        # so each of its versions is compared with the one before it
+        rounds: List[Dict[str, Tuple[int, Dict]]] = []
+        for index, row in batch:
+            import_key, content_hash = scenario_hashes(row)
+            item = (index, {**row, "import_key": import_key, "content_hash": content_hash})
+            for keyed in rounds:
+                if import_key not in keyed:
+                    keyed[import_key] = item
+                    break
+            else:
+                rounds.append({import_key: item})
+        
+        for keyed in rounds:
+            try:
+                self._upsert([row for _, row in keyed.values()])
+            except Exception:
+                # Rare path: retry row by row so only the offending items fail
+                self.db.rollback()
+                for index, row in keyed.values():
+                    try:
+                        self._upsert([row])
+                    except Exception as e:
+                        self.db.rollback()
+                        self._record_error(index, e)
+    
+    def _upsert(self, rows: List[Dict]):
+        # Locks the current versions so concurrent imports of the same pack serialize
+        current = dict(self.db.execute(
+            select(Scenario.import_key, Scenario.content_hash).where(
+                Scenario.import_key.in_([row["import_key"] for row in rows]),
+                Scenario.is_active == True
+            ).with_for_update()
+        ).all())
+        changed = [row["import_key"] for row in rows if row["import_key"] in current and current[row["import_key"]] != row["content_hash"]]
+        if changed:
+            self.db.execute(update(Scenario).where(
+                Scenario.import_key.in_(changed), Scenario.is_active == True
+            ).values(is_active=False))
+        
+        rows = [row for row in rows if current.get(row["import_key"]) != row["content_hash"]]
+        written = len(self.db.execute(_insert_statement(), rows).all()) if rows else 0
+        self.db.commit()
+        self.imported_count += written
+        self.unchanged_count += len(current) - len(changed) + len(rows) - written
+        if written or changed:
+            invalidate_scenarios()
+    
+    def _record_error(self, index: int, error: Exception):
+        self.failed_count += 1
+        if len(self.errors) < self.MAX_REPORTED_ERRORS:
+            self.errors.append(ScenarioImportError(index=index, error=str(error)))
+    
+    def _transform_scenario_format(self, scenario_data: Dict) -> List[Dict]:
+        """Transform your scenario format to our expected format"""
+        # Check if this is your format (has variants)
+        if "variants" in scenario_data:
+            transformed_scenarios = []
+            
+            # Create a scenario for each variant
+            for variant in scenario_data.get("variants", []):
+                context = f"""Domain: {scenario_data.get('domain', 'Unknown')}
+Scenario: {scenario_data.get('title', 'Unknown')}
+AI Alignment: {variant.get('ai_alignment', 'unknown')}
+AI Autonomy Level: {variant.get('ai_autonomy', 'unknown')}
+
+This scenario tests decision-making in a {scenario_data.get('dominant_kdma', 'general')} situation."""
+                
+                decision_point = "How would you respond to this incident?"
+                
+                # Create options based on AI suggestions
+                options = [
+                    {
+                        "id": "A",
+                        "label": "Accept AI Recommendation",
+                        "description": variant.get('ai_rationale_clear', 'Follow the AI recommendation')
+                    },
+                    {
+                        "id": "B", 
+                        "label": "Override AI Recommendation",
+                        "description": "Reject the AI suggestion and take alternative action"
+                    },
+                    {
+                        "id": "C",
+                        "label": "Modify AI Recommendation",
+                        "description": "Partially accept but adjust the AI suggestion"
+                    },
+                    {
+                        "id": "D",
+                        "label": "Request More Information",
+                        "description": "Ask for additional analysis before deciding"
+                    }
+                ]
+                
+                # If AI rationale is ambiguous, add that as context
+                if variant.get('ai_rationale_ambiguous'):
+                    context += f"\n\nAI's explanation: {variant['ai_rationale_ambiguous']}"
+                
+                transformed = {
+                    "title": f"{scenario_data['title']} - {variant['code']}",
+                    "category": scenario_data.get('domain', 'General'),
+                    "description": f"{scenario_data['title']} with {variant['ai_alignment']} AI in {variant['ai_autonomy']} mode",
+                    "context": context,
+                    "decision_point": decision_point,
+                    "options": options,
+                    "meta_data": {
+                        "original_id": scenario_data.get('id'),
+                        "variant_code": variant.get('code'),
+                        "dominant_kdma": scenario_data.get('dominant_kdma'),
+                        "ai_alignment": variant.get('ai_alignment'),
+                        "ai_autonomy": variant.get('ai_autonomy'),
+                        "ai_rationale_clear": variant.get('ai_rationale_clear'),
+                        "ai_rationale_ambiguous": variant.get('ai_rationale_ambiguous')
+                    }
+                }
+                
+                transformed_scenarios.append(transformed)
+            
+            return transformed_scenarios
+        
+        # If it's already in the expected format
+        else:
+            # Validate required fields
+            required = ["title", "context", "decision_point", "options"]
+            for field in required:
+                if field not in scenario_data:
+                    raise ValueError(f"Missing required field: {field}")
+            
+            return [{
+                "title": scenario_data["title"],
+                "category": scenario_data.get("category", "General"),
+                "description": scenario_data.get("description", scenario_data["title"]),
+                "context": scenario_data["context"],
+                "decision_point": scenario_data["decision_point"],
+                "options": scenario_data["options"],
+                "meta_data": scenario_data.get("metadata", scenario_data.get("meta_data", {}))
+            }]
@@ -0,0 +1,59 @@
+from typing import Dict, Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.orm import Query, Session
+from ..models.scenario import Scenario
+
+# meta_data keys that can be filtered on and are counted by facet_counts
+FACET_KEYS = ("dominant_kdma", "ai_alignment", "ai_autonomy")
+SEARCH_CONFIG = "english"
+
+def search_filters(q: Optional[str], category: Optional[str], facets: Dict[str, str]) -> list:
+    """WHERE clauses for active scenarios matching the search and facet filters.
+    
+    Text search runs against the generated search_vector column (GIN
+    index) and facets use JSONB containment on meta_data (GIN
+    jsonb_path_ops index), so neither needs a sequential scan.
+    """
+    clauses = [Scenario.is_active == True]
+    if q:
+        clauses.append(Scenario.search_vector.op("@@")(func.websearch_to_tsquery(SEARCH_CONFIG, q)))
+    if category:
+        clauses.append(Scenario.category == category)
+    selected = {key: value for key, value in facets.items() if value is not None}
+    if selected:
+        clauses.append(Scenario.meta_data.contains(selected))
+    return clauses
+
+def apply_search(query: Query, q: Optional[str], category: Optional[str], facets: Dict[str, str]) -> Query:
+    return query.filter(*search_filters(q, category, facets))
+
+def facet_counts(db: Session, q: Optional[str], category: Optional[str], facets: Dict[str, str]) -> Dict:
+    """Count matches per category and per meta_data facet value in one query.
+    
+    GROUPING SETS aggregates each facet separately, plus the empty set
+    for the overall total, in a single pass over the matching rows.
+    """
+    dimensions = {"category": Scenario.category}
+    dimensions.update({key: Scenario.meta_data[key].astext for key in FACET_KEYS})
+    columns = list(dimensions.values())
+    
+    stmt = select(
+        *columns,
+        *[func.grouping(column) for column in columns],
+        func.count()
+    ).where(*search_filters(q, category, facets)).group_by(
+        func.grouping_sets(*[tuple_(column) for column in columns], tuple_())
+    )
+    
+    result = {"total": 0, "facets": {name: {} for name in dimensions}}
+    width = len(columns)
+    for row in db.execute(stmt):
+        values, grouped, count = row[:width], row[width:2 * width], row[-1]
+        if all(grouped):
+            result["total"] = count
+            continue
+        # Exactly one dimension is ungrouped in each single-column set
+        index = list(grouped).index(0)
+        if values[index] is not None:
+            result["facets"][list(dimensions)[index]][values[index]] = count
+    return result
@@ -0,0 +1,63 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.cache import TTLCache
+from ..models.session import Session as SessionModel, Experiment, ScenarioResponse
+
+# Experiments are immutable once created, so their resolved sequences can be shared
+_sequence_cache = TTLCache(maxsize=1024, ttl=3600)
+
+async def get_scenario_sequence(db: AsyncSession, experiment_id: uuid.UUID) -> Optional[Tuple[uuid.UUID, ...]]:
+    """Return the experiment's scenario ids as UUIDs, cached per experiment"""
+    sequence = _sequence_cache.get(experiment_id)
+    if sequence is None:
+        raw = await db.scalar(select(Experiment.scenario_sequence).where(Experiment.id == experiment_id))
+        if raw is None:
+            return None
+        sequence = tuple(uuid.UUID(str(sid)) for sid in raw)
+        _sequence_cache.set(experiment_id, sequence)
+    return sequence
+
+async def read_cursor(db: AsyncSession, session_id: uuid.UUID, for_update: bool = False) -> Optional[Tuple[int, uuid.UUID]]:
+    """Return (steps completed, experiment id) for a session"""
+    query = select(SessionModel.current_step, SessionModel.experiment_id).where(SessionModel.id == session_id)
+    if for_update:
+        query = query.with_for_update()
+    row = (await db.execute(query)).first()
+    return tuple(row) if row else None
+
+async def advance_cursor(db: AsyncSession, session_id: uuid.UUID, count: int = 1) -> Optional[Tuple[int, uuid.UUID]]:
+    """Atomically claim the next `count` steps for a session.
+
+    Returns (last claimed step number, experiment id). The row stays
+    locked until the caller commits or rolls back, so concurrent submits
+    are serialized and each one gets distinct steps.
+    """
+    row = (await db.execute(
+        update(SessionModel)
+        .where(SessionModel.id == session_id)
+        .values(current_step=SessionModel.current_step + count)
+        .returning(SessionModel.current_step, SessionModel.experiment_id)
+    )).first()
+    return tuple(row) if row else None
+
+async def finish_session(db: AsyncSession, session_id: uuid.UUID, ended_at: datetime):
+    """Mark a session completed once its last step is recorded"""
+    await db.execute(
+        update(SessionModel).where(SessionModel.id == session_id).values(status="completed", end_time=ended_at)
+    )
+
+async def find_recorded_steps(db: AsyncSession, session_id: uuid.UUID, idempotency_keys: Iterable[str]) -> Dict[str, int]:
+    """Map idempotency keys that were already recorded for a session to their step"""
+    keys = list(set(idempotency_keys))
+    if not keys:
+        return {}
+    rows = await db.execute(
+        select(ScenarioResponse.idempotency_key, ScenarioResponse.step_number).where(
+            ScenarioResponse.session_id == session_id,
+            ScenarioResponse.idempotency_key.in_(keys)
+        )
+    )
+    return {key: step for key, step in rows}
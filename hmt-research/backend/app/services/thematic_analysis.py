@@ -1,107 +1,143 @@
-import openai
-from typing import Dict, List, Optional
-import json
-from datetime import datetime
-from sqlalchemy.orm import Session
-from ..models.scenario import ThematicAnalysis, ScenarioResponse
-from ..core.config import settings
-
-class ThematicAnalyzer:
-    def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-    
-    async def analyze_transcript(self, transcript: str, context: Dict) -> Dict:
-        """Perform thematic analysis on think-aloud transcript"""
-        
-        if not transcript or len(transcript.strip()) < 50:
-            return {
-                "themes": [],
-                "codes": [],
-                "key_concepts": [],
-                "sentiment": {"score": 0, "magnitude": 0}
-            }
-        
-        prompt = f"""
-        Perform a thematic analysis on this cybersecurity decision-making transcript.
-        
-        Context:
-        Scenario: {context.get('scenario_title', 'Unknown')}
-        Decision Made: {context.get('selected_option', 'Unknown')}
-        
-        Transcript: {transcript[:3000]}
-        
-        Identify and return in JSON format:
-        1. themes: Main themes as an array of objects with 'theme' and 'evidence' (quote from transcript)
-        2. codes: Specific codes identified (array of strings)
-        3. key_concepts: Important domain-specific concepts mentioned (array of strings)
-        4. cognitive_strategies: Decision-making strategies used
-        5. uncertainty_expressions: Phrases indicating uncertainty or doubt
-        6. risk_factors: Risk-related considerations mentioned
-        """
-        
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are an expert in thematic analysis of cybersecurity decision-making. Always respond with valid JSON."
-                    },
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
-            
-            analysis = json.loads(response.choices[0].message.content)
-            
-            # Ensure all expected fields exist
-            return {
-                "themes": analysis.get("themes", []),
-                "codes": analysis.get("codes", []),
-                "key_concepts": analysis.get("key_concepts", []),
-                "cognitive_strategies": analysis.get("cognitive_strategies", []),
-                "uncertainty_expressions": analysis.get("uncertainty_expressions", []),
-                "risk_factors": analysis.get("risk_factors", []),
-                "sentiment": {"score": 0.5, "magnitude": 1.0}  # Placeholder
-            }
-            
-        except Exception as e:
-            print(f"Thematic analysis error: {e}")
-            return {
-                "themes": [{"theme": "Error in analysis", "evidence": str(e)}],
-                "codes": [],
-                "key_concepts": [],
-                "sentiment": {"score": 0, "magnitude": 0}
-            }
-    
-    async def transcribe_audio(self, audio_file_path: str) -> str:
-        """Transcribe audio using OpenAI Whisper API"""
-        try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = self.client.audio.transcriptions.create(
-                    model=settings.WHISPER_MODEL,
-                    file=audio_file,
-                    response_format="text"
-                )
-            return transcript
-        except Exception as e:
-            print(f"Transcription error: {e}")
-            return ""
-    
-    def save_analysis(self, db: Session, response_id: str, analysis_data: Dict, user_id: str) -> ThematicAnalysis:
-        """Save thematic analysis to database"""
-        analysis = ThematicAnalysis(
-            response_id=response_id,
-            themes=analysis_data.get("themes", []),
-            codes=analysis_data.get("codes", {}),
-            key_concepts=analysis_data.get("key_concepts", []),
-            sentiment=analysis_data.get("sentiment", {}),
-            analyzed_by=user_id
-        )
-        
-        db.add(analysis)
-        db.commit()
-        db.refresh(analysis)
-        
-        return analysis
\ No newline at end of file
+import openai
+from typing import Dict, List, Optional
+import hashlib
+import json
+from ..core.config import settings
+from .analysis_cache import AnalysisCache, analysis_cache
+
+# Part of every cache key; bump whenever build_messages or the parsing of
+# the reply changes so earlier results stop being reused
+PROMPT_VERSION = "1"
+
+# Transcripts shorter than this are recorded as empty analyses without a request
+MIN_TRANSCRIPT_LENGTH = 50
+MAX_TRANSCRIPT_CHARS = 3000
+
+# Transient failures worth retrying; anything else fails the transcript
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,  # Includes APITimeoutError
+    openai.InternalServerError,
+    json.JSONDecodeError,
+)
+
+def empty_analysis() -> Dict:
+    return {
+        "themes": [],
+        "codes": [],
+        "key_concepts": [],
+        "cognitive_strategies": [],
+        "uncertainty_expressions": [],
+        "risk_factors": [],
+        "sentiment": {"score": 0, "magnitude": 0}
+    }
+
+def retry_after(error: Exception) -> Optional[float]:
+    """Seconds the server asked us to wait, if it sent Retry-After"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def cache_key(transcript: str, context: Dict, model: str, prompt_version: str = PROMPT_VERSION) -> str:
+    """sha256 over everything that determines the model's answer"""
+    payload = [prompt_version, model, context.get("scenario_title"), context.get("selected_option"), transcript]
+    return hashlib.sha256(json.dumps(payload, separators=(",", ":")).encode()).hexdigest()
+
+class ThematicAnalyzer:
+    def __init__(
+        self,
+        client: Optional[openai.AsyncOpenAI] = None,
+        model: Optional[str] = None,
+        cache: Optional[AnalysisCache] = None
+    ):
+        # Retries are left to the caller so they can share one rate limit
+        self.client = client or openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL,
+            timeout=settings.ANALYSIS_REQUEST_TIMEOUT,
+            max_retries=0
+        )
+        self.model = model or settings.ANALYSIS_MODEL
+        self.cache = cache or (analysis_cache if settings.ANALYSIS_CACHE_ENABLED else None)
+    
+    @staticmethod
+    def needs_request(transcript: Optional[str]) -> bool:
+        return bool(transcript) and len(transcript.strip()) >= MIN_TRANSCRIPT_LENGTH
+    
+    def build_messages(self, transcript: str, context: Dict) -> List[Dict]:
+        prompt = f"""
+        Perform a thematic analysis on this cybersecurity decision-making transcript.
+        
+        Context:
+        Scenario: {context.get('scenario_title', 'Unknown')}
+        Decision Made: {context.get('selected_option', 'Unknown')}
+        
+        Transcript: {transcript[:MAX_TRANSCRIPT_CHARS]}
+        
+        Identify and return in JSON format:
+        1. themes: Main themes as an array of objects with 'theme' and 'evidence' (quote from transcript)
+        2. codes: Specific codes identified (array of strings)
+        3. key_concepts: Important domain-specific concepts mentioned (array of strings)
+        4. cognitive_strategies: Decision-making strategies used
+        5. uncertainty_expressions: Phrases indicating uncertainty or doubt
+        6. risk_factors: Risk-related considerations mentioned
+        """
+        return [
+            {
+                "role": "system",
+                "content": "You are an expert in thematic analysis of cybersecurity decision-making. Always respond with valid JSON."
+            },
+            {"role": "user", "content": prompt}
+        ]
+    
+    async def lookup(self, transcript: str, context: Dict) -> Optional[Dict]:
+        """A cached analysis for this input, without calling the API"""
+        if self.cache is None or not self.needs_request(transcript):
+            return None
+        return await self.cache.get(cache_key(transcript, context, self.model))
+    
+    async def analyze_transcript(self, transcript: str, context: Dict, check_cache: bool = True) -> Dict:
+        """Perform thematic analysis on think-aloud transcript.
+        
+        Cached results are returned without an API call; pass
+        check_cache=False if lookup() already missed. Makes a single
+        attempt; API and JSON errors propagate so the caller can retry the
+        RETRYABLE_ERRORS.
+        """
+        if not self.needs_request(transcript):
+            return empty_analysis()
+        
+        key = cache_key(transcript, context, self.model)
+        if self.cache is not None and check_cache:
+            cached = await self.cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=self.build_messages(transcript, context),
+            temperature=0.3,
+            response_format={"type": "json_object"}
+        )
+        analysis = json.loads(response.choices[0].message.content)
+        
+        # Ensure all expected fields exist
+        result = {
+            "themes": analysis.get("themes", []),
+            "codes": analysis.get("codes", []),
+            "key_concepts": analysis.get("key_concepts", []),
+            "cognitive_strategies": analysis.get("cognitive_strategies", []),
+            "uncertainty_expressions": analysis.get("uncertainty_expressions", []),
+            "risk_factors": analysis.get("risk_factors", []),
+            "sentiment": {"score": 0.5, "magnitude": 1.0}  # Placeholder
+        }
+        if self.cache is not None:
+            await self.cache.put(key, self.model, PROMPT_VERSION, result)
+        return result
+    
+    async def close(self):
+        await self.client.close()
@@ -0,0 +1,287 @@
+import math
+import openai
+import os
+import re
+import shutil
+import threading
+import uuid
+import wave
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import BinaryIO, List, Optional
+from sqlalchemy import delete, update
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.job import TranscriptionJob
+from ..models.session import ScenarioResponse, ThematicAnalysis
+
+try:
+    from pydub import AudioSegment
+except ImportError:  # Installed with ffmpeg in the image; without them only WAV is split
+    AudioSegment = None
+
+CHUNK_SIZE = 1024 * 1024
+# Whisper rejects larger uploads, so unsplit files must stay under it
+MAX_SEGMENT_BYTES = 25 * 1024 * 1024
+AUDIO_EXTENSIONS = (".wav", ".webm", ".mp3", ".m4a", ".mp4", ".mpeg", ".mpga", ".ogg")
+# Words compared when removing text repeated across a segment overlap
+MAX_OVERLAP_WORDS = 50
+# A one-word match is as likely to be chance ("the", "I") as overlapped audio
+MIN_OVERLAP_WORDS = 2
+# Brisk think-aloud speech; bounds how many words an overlap can repeat
+MAX_WORDS_PER_SECOND = 4
+
+class TranscriptionError(Exception):
+    pass
+
+def pydub_available() -> bool:
+    # pydub imports without ffmpeg but can't decode anything
+    return AudioSegment is not None and shutil.which(AudioSegment.converter) is not None
+
+class WhisperBackend:
+    """OpenAI (or OpenAI-compatible, via OPENAI_BASE_URL) speech to text"""
+    
+    def __init__(self):
+        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY, base_url=settings.OPENAI_BASE_URL)
+    
+    def transcribe(self, path: str) -> str:
+        with open(path, "rb") as audio_file:
+            return self.client.audio.transcriptions.create(
+                model=settings.WHISPER_MODEL,
+                file=audio_file,
+                response_format="text"
+            )
+
+class StubBackend:
+    """Offline stand-in that names the segment instead of transcribing it"""
+    
+    def transcribe(self, path: str) -> str:
+        return f"[{os.path.basename(path)}]"
+
+BACKENDS = {"whisper": WhisperBackend, "stub": StubBackend}
+
+def get_backend(name: str):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown transcription backend: {name}")
+    return BACKENDS[name]()
+
+def split_audio(path: str, out_dir: str, segment_seconds: float, overlap_seconds: float) -> List[str]:
+    """Split a recording into overlapping segment files, in order.
+    
+    WAV is split frame-accurately with the standard library, reading one
+    segment at a time. Other formats need pydub (and ffmpeg); without it
+    a file small enough for one request is sent whole.
+    """
+    if overlap_seconds >= segment_seconds:
+        raise ValueError("Segment overlap must be shorter than the segment")
+    os.makedirs(out_dir, exist_ok=True)
+    
+    if path.lower().endswith(".wav"):
+        try:
+            return _split_wav(path, out_dir, segment_seconds, overlap_seconds)
+        except (wave.Error, EOFError) as e:
+            raise TranscriptionError(f"Invalid WAV file: {str(e) or 'unexpected end of file'}")
+    if pydub_available():
+        return _split_pydub(path, out_dir, segment_seconds, overlap_seconds)
+    if os.path.getsize(path) <= MAX_SEGMENT_BYTES:
+        return [path]
+    raise TranscriptionError("Splitting compressed audio requires pydub; upload WAV instead")
+
+def _split_wav(path: str, out_dir: str, segment_seconds: float, overlap_seconds: float) -> List[str]:
+    segments = []
+    with wave.open(path, "rb") as source:
+        params = source.getparams()
+        segment_frames = int(segment_seconds * params.framerate)
+        step_frames = segment_frames - int(overlap_seconds * params.framerate)
+        start = 0
+        while start < params.nframes:
+            source.setpos(start)
+            segment_path = os.path.join(out_dir, f"segment_{len(segments):04d}.wav")
+            with wave.open(segment_path, "wb") as out:
+                out.setparams(params)
+                out.writeframes(source.readframes(segment_frames))
+            segments.append(segment_path)
+            if start + segment_frames >= params.nframes:
+                break
+            start += step_frames
+    return segments
+
+def _split_pydub(path: str, out_dir: str, segment_seconds: float, overlap_seconds: float) -> List[str]:
+    audio = AudioSegment.from_file(path)
+    segment_ms = int(segment_seconds * 1000)
+    step_ms = segment_ms - int(overlap_seconds * 1000)
+    segments = []
+    start = 0
+    while start < len(audio):
+        segment_path = os.path.join(out_dir, f"segment_{len(segments):04d}.mp3")
+        audio[start:start + segment_ms].export(segment_path, format="mp3")
+        segments.append(segment_path)
+        if start + segment_ms >= len(audio):
+            break
+        start += step_ms
+    return segments
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+def overlap_word_limit(overlap_seconds: float) -> int:
+    """Most words the overlapped audio could plausibly contain"""
+    return min(MAX_OVERLAP_WORDS, max(MIN_OVERLAP_WORDS, math.ceil(overlap_seconds * MAX_WORDS_PER_SECOND)))
+
+def stitch(texts: List[str], max_overlap: int = MAX_OVERLAP_WORDS) -> str:
+    """Join segment transcripts, dropping words repeated across each overlap.
+    
+    The longest run of words ending one segment that also starts the
+    next is assumed to be the overlapped audio and kept only once. Only
+    runs of MIN_OVERLAP_WORDS up to max_overlap words (what the overlap
+    could hold) are considered, so a word that merely recurs at the
+    boundary is kept.
+    """
+    words: List[str] = []
+    for text in texts:
+        incoming = text.split()
+        tail = [_normalize(word) for word in words[-max_overlap:]]
+        head = [_normalize(word) for word in incoming[:max_overlap]]
+        overlap = 0
+        for size in range(min(len(tail), len(head)), MIN_OVERLAP_WORDS - 1, -1):
+            if tail[-size:] == head[:size]:
+                overlap = size
+                break
+        words.extend(incoming[overlap:])
+    return " ".join(words)
+
+class Transcriber:
+    """Background transcription of uploaded think-aloud recordings.
+    
+    The upload is spooled to disk by the request. A job worker splits it
+    into overlapping segments, a shared pool transcribes segments
+    concurrently through the configured backend, and the stitched text
+    replaces the response's think_aloud_transcript. Any earlier thematic
+    analysis of that response is dropped so it is redone on the new text.
+    """
+    
+    def __init__(self, max_workers: int, concurrency: int, audio_dir: str, backend_name: str):
+        self.audio_dir = audio_dir
+        self.backend_name = backend_name
+        self._backend = None
+        self._backend_lock = threading.Lock()
+        self._workers = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="transcription-job")
+        self._segments = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="transcription-segment")
+        self._started = datetime.utcnow()
+    
+    @property
+    def backend(self):
+        # Built on first use so a missing API key only matters when transcribing;
+        # the lock keeps job workers starting together from building two clients
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = get_backend(self.backend_name)
+        return self._backend
+    
+    def spool(self, job_id: uuid.UUID, upload: BinaryIO, extension: str) -> str:
+        """Copy an upload to the audio directory without reading it into memory"""
+        os.makedirs(self.audio_dir, exist_ok=True)
+        path = os.path.join(self.audio_dir, f"audio_{job_id}{extension}")
+        with open(path, "wb") as out:
+            while True:
+                chunk = upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+        return path
+    
+    def submit(self, job_id: uuid.UUID):
+        self._workers.submit(self._run, job_id)
+    
+    def recover(self):
+        """Settle jobs that an earlier server process left unfinished.
+        
+        Queued jobs whose audio is still spooled are submitted again;
+        running ones died with their process and are marked failed. Only
+        jobs created before this process started are touched, and _run
+        claims a job atomically, so workers starting together never run
+        one twice.
+        """
+        db = SessionLocal()
+        try:
+            stale = db.query(TranscriptionJob.id, TranscriptionJob.status, TranscriptionJob.file_path).filter(
+                TranscriptionJob.status.in_(("queued", "running")), TranscriptionJob.created_at < self._started
+            ).all()
+            for job_id, status, file_path in stale:
+                if status == "queued" and file_path and os.path.exists(file_path):
+                    self.submit(job_id)
+                    continue
+                db.execute(update(TranscriptionJob).where(
+                    TranscriptionJob.id == job_id, TranscriptionJob.status == status
+                ).values(
+                    status="failed",
+                    error="Audio upload was lost" if status == "queued" else "Interrupted by a server restart",
+                    finished_at=datetime.utcnow()
+                ))
+                shutil.rmtree(os.path.join(self.audio_dir, f"segments_{job_id}"), ignore_errors=True)
+                if file_path and os.path.exists(file_path):
+                    os.remove(file_path)
+            db.commit()
+        finally:
+            db.close()
+    
+    def _run(self, job_id: uuid.UUID):
+        db = SessionLocal()
+        job = db.get(TranscriptionJob, job_id)
+        file_path = job.file_path
+        segment_dir = os.path.join(self.audio_dir, f"segments_{job_id}")
+        # Claim the job so a resubmitted one only runs once
+        claimed = db.execute(update(TranscriptionJob).where(
+            TranscriptionJob.id == job_id, TranscriptionJob.status == "queued"
+        ).values(status="running", started_at=datetime.utcnow()))
+        db.commit()
+        if not claimed.rowcount:
+            db.close()
+            return
+        
+        try:
+            segments = split_audio(
+                file_path, segment_dir, settings.TRANSCRIPTION_SEGMENT_SECONDS, settings.TRANSCRIPTION_OVERLAP_SECONDS
+            )
+            db.execute(update(TranscriptionJob).where(TranscriptionJob.id == job_id).values(segments_total=len(segments)))
+            db.commit()
+            
+            texts: List[Optional[str]] = [None] * len(segments)
+            futures = {self._segments.submit(self.backend.transcribe, segment): index for index, segment in enumerate(segments)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                texts[futures[future]] = future.result().strip()
+                db.execute(update(TranscriptionJob).where(TranscriptionJob.id == job_id).values(segments_done=done))
+                db.commit()
+            
+            transcript = stitch(texts, overlap_word_limit(settings.TRANSCRIPTION_OVERLAP_SECONDS))
+            db.execute(update(ScenarioResponse).where(ScenarioResponse.id == job.response_id).values(
+                think_aloud_transcript=transcript
+            ))
+            db.execute(delete(ThematicAnalysis).where(ThematicAnalysis.response_id == job.response_id))
+            db.execute(update(TranscriptionJob).where(TranscriptionJob.id == job_id).values(
+                status="completed", transcript_length=len(transcript), finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            db.execute(update(TranscriptionJob).where(TranscriptionJob.id == job_id).values(
+                status="failed", error=str(e), finished_at=datetime.utcnow()
+            ))
+            db.commit()
+        finally:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+            if file_path and os.path.exists(file_path):
+                os.remove(file_path)
+            db.close()
+    
+    def shutdown(self):
+        self._workers.shutdown(wait=False)
+        self._segments.shutdown(wait=False)
+
+transcriber = Transcriber(
+    max_workers=settings.TRANSCRIPTION_WORKERS,
+    concurrency=settings.TRANSCRIPTION_CONCURRENCY,
+    audio_dir=settings.AUDIO_DIR,
+    backend_name=settings.TRANSCRIPTION_BACKEND
+)
@@ -0,0 +1,126 @@
+"""Benchmark TraceExporter query count and wall time against session length.
+
+Seeds a throwaway experiment into the configured DATABASE_URL, exports
+sessions of increasing length, and compares the exporter against the
+old per-response lazy load. Everything it creates is removed afterwards.
+
+    python benchmark_export.py --lengths 10 50 200 1000
+"""
+import argparse
+import json
+import time
+from sqlalchemy import event
+from app.core.database import engine, SessionLocal, Base
+from app.models.scenario import Scenario
+from app.models.session import Experiment, Session as SessionModel, ScenarioResponse
+from app.services.export import TraceExporter
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+def seed(db, steps: int, distinct_scenarios: int):
+    scenarios = [
+        Scenario(
+            title=f"Benchmark scenario {i}",
+            category="benchmark",
+            description="Benchmark",
+            context="Context " * 200,
+            decision_point="How would you respond?",
+            options=[{"id": "A", "label": "Accept", "description": "Accept"}],
+            meta_data={}
+        )
+        for i in range(distinct_scenarios)
+    ]
+    db.add_all(scenarios)
+    db.flush()
+
+    sequence = [scenarios[i % distinct_scenarios].id for i in range(steps)]
+    experiment = Experiment(name="benchmark", description="", scenario_sequence=[str(s) for s in sequence])
+    db.add(experiment)
+    db.flush()
+
+    session = SessionModel(experiment_id=experiment.id, participant_id="bench", operator_id="bench", current_step=steps)
+    db.add(session)
+    db.flush()
+
+    db.add_all([
+        ScenarioResponse(
+            session_id=session.id,
+            scenario_id=scenario_id,
+            step_number=step,
+            selected_option="A",
+            confidence_rating=3,
+            risk_rating=3,
+            think_aloud_transcript="Thinking aloud " * 100
+        )
+        for step, scenario_id in enumerate(sequence, start=1)
+    ])
+    db.commit()
+    return session.id, experiment.id, [s.id for s in scenarios]
+
+def cleanup(db, session_id, experiment_id, scenario_ids):
+    db.query(ScenarioResponse).filter(ScenarioResponse.session_id == session_id).delete()
+    db.query(SessionModel).filter(SessionModel.id == session_id).delete()
+    db.query(Experiment).filter(Experiment.id == experiment_id).delete()
+    db.query(Scenario).filter(Scenario.id.in_(scenario_ids)).delete(synchronize_session=False)
+    db.commit()
+
+def export_lazy(db, session_id):
+    """The pre-prefetch behaviour: one scenario load and one obs_t build per response"""
+    exporter = TraceExporter(db)
+    session = db.query(SessionModel).filter_by(id=session_id).first()
+    responses = db.query(ScenarioResponse).filter_by(session_id=session_id).order_by(ScenarioResponse.step_number).all()
+    traces = []
+    for response in responses:
+        scenario = response.scenario
+        obs_t = {
+            "scenario_title": scenario.title,
+            "scenario_context": scenario.context,
+            "decision_point": scenario.decision_point,
+            "available_options": scenario.options
+        }
+        traces.append(exporter._build_trace(session, response, obs_t))
+    return "\n".join(json.dumps(trace) for trace in traces)
+
+def export_streaming(db, session_id):
+    return sum(1 for _ in TraceExporter(db).stream_session_jsonl(str(session_id)))
+
+def measure(fn, session_id):
+    db = SessionLocal()
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter)
+    try:
+        started = time.perf_counter()
+        fn(db, session_id)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    finally:
+        event.remove(engine, "before_cursor_execute", counter)
+        db.close()
+    return counter.count, elapsed_ms
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 200, 1000])
+    parser.add_argument("--distinct-scenarios", type=int, default=None,
+                        help="Scenarios shared by the sequence (default: one per step)")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print(f"{'steps':>6} {'lazy queries':>13} {'lazy ms':>9} {'export queries':>15} {'export ms':>10}")
+    for steps in args.lengths:
+        db = SessionLocal()
+        seeded = seed(db, steps, min(args.distinct_scenarios or steps, steps))
+        try:
+            lazy_queries, lazy_ms = measure(export_lazy, seeded[0])
+            export_queries, export_ms = measure(export_streaming, seeded[0])
+            print(f"{steps:>6} {lazy_queries:>13} {lazy_ms:>9.1f} {export_queries:>15} {export_ms:>10.1f}")
+        finally:
+            cleanup(db, *seeded)
+            db.close()
+
+if __name__ == "__main__":
+    main()
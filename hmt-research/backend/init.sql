@@ -9,7 +9,7 @@ CREATE TABLE users (
     full_name VARCHAR(255),
     role VARCHAR(50) DEFAULT 'user',
     is_active BOOLEAN DEFAULT true,
-    created_at TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     last_login TIMESTAMP,
     preferences TEXT DEFAULT '{}'
 );
@@ -19,6 +19,14 @@ CREATE TABLE users (
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Drop tables if they exist (for clean rebuild)
+DROP TABLE IF EXISTS response_time_rollups CASCADE;
+DROP TABLE IF EXISTS response_rollups CASCADE;
+DROP TABLE IF EXISTS analysis_cache CASCADE;
+DROP TABLE IF EXISTS thematic_analyses CASCADE;
+DROP TABLE IF EXISTS transcription_jobs CASCADE;
+DROP TABLE IF EXISTS import_jobs CASCADE;
+DROP TABLE IF EXISTS export_jobs CASCADE;
+DROP TABLE IF EXISTS presentation_events CASCADE;
 DROP TABLE IF EXISTS scenario_responses CASCADE;
 DROP TABLE IF EXISTS sessions CASCADE;
 DROP TABLE IF EXISTS experiments CASCADE;
@@ -33,9 +41,15 @@ CREATE TABLE scenarios (
     decision_point TEXT NOT NULL,
     options JSONB NOT NULL,
     meta_data JSONB DEFAULT '{}',
-    created_at TIMESTAMP DEFAULT NOW(),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
     created_by UUID,
-    is_active BOOLEAN DEFAULT true
+    is_active BOOLEAN DEFAULT true,
+    import_key VARCHAR(64),
+    content_hash VARCHAR(64),
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' ||
+            coalesce(context, '') || ' ' || coalesce(decision_point, ''))
+    ) STORED
 );
 
 CREATE TABLE experiments (
@@ -57,6 +71,7 @@ CREATE TABLE sessions (
     start_time TIMESTAMP DEFAULT NOW(),
     end_time TIMESTAMP,
     status VARCHAR(20) DEFAULT 'active',
+    current_step INTEGER NOT NULL DEFAULT 0,
     meta_data JSONB DEFAULT '{}'
 );
 
@@ -72,11 +87,140 @@ CREATE TABLE scenario_responses (
     confidence_rating INTEGER CHECK (confidence_rating BETWEEN 1 AND 5),
     risk_rating INTEGER CHECK (risk_rating BETWEEN 1 AND 5),
     response_time_ms INTEGER,
-    think_aloud_transcript TEXT
+    client_response_time_ms INTEGER,
+    think_aloud_transcript TEXT,
+    idempotency_key VARCHAR(64),
+    recorded_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    recorded_xid BIGINT NOT NULL DEFAULT pg_current_xact_id()::text::bigint,
+    CONSTRAINT uq_responses_session_step UNIQUE (session_id, step_number),
+    CONSTRAINT uq_responses_session_idempotency_key UNIQUE (session_id, idempotency_key)
+);
+
+CREATE TABLE presentation_events (
+    session_id UUID REFERENCES sessions(id),
+    step_number INTEGER,
+    scenario_id UUID REFERENCES scenarios(id),
+    presented_at TIMESTAMP NOT NULL,
+    PRIMARY KEY (session_id, step_number)
+);
+
+CREATE TABLE export_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    experiment_id UUID REFERENCES experiments(id),
+    start_date TIMESTAMP,
+    end_date TIMESTAMP,
+    format VARCHAR(10) NOT NULL DEFAULT 'jsonl',
+    compression VARCHAR(10) NOT NULL DEFAULT 'gzip',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    total_sessions INTEGER NOT NULL DEFAULT 0,
+    completed_sessions INTEGER NOT NULL DEFAULT 0,
+    file_path TEXT,
+    file_size BIGINT,
+    error TEXT,
+    created_by UUID,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE import_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    filename VARCHAR(255) NOT NULL,
+    format VARCHAR(10) NOT NULL DEFAULT 'json',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    items_parsed INTEGER NOT NULL DEFAULT 0,
+    items_inserted INTEGER NOT NULL DEFAULT 0,
+    items_unchanged INTEGER NOT NULL DEFAULT 0,
+    items_failed INTEGER NOT NULL DEFAULT 0,
+    errors JSONB DEFAULT '[]',
+    file_path TEXT,
+    error TEXT,
+    created_by UUID,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE transcription_jobs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    response_id UUID NOT NULL REFERENCES scenario_responses(id),
+    filename VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    segments_total INTEGER NOT NULL DEFAULT 0,
+    segments_done INTEGER NOT NULL DEFAULT 0,
+    transcript_length INTEGER,
+    file_path TEXT,
+    error TEXT,
+    created_by UUID,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE thematic_analyses (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    response_id UUID NOT NULL UNIQUE REFERENCES scenario_responses(id),
+    status VARCHAR(20) NOT NULL DEFAULT 'completed',
+    themes JSON DEFAULT '[]',
+    codes JSON DEFAULT '[]',
+    key_concepts JSON DEFAULT '[]',
+    cognitive_strategies JSON DEFAULT '[]',
+    uncertainty_expressions JSON DEFAULT '[]',
+    risk_factors JSON DEFAULT '[]',
+    sentiment JSON DEFAULT '{}',
+    cta_phase VARCHAR(50),
+    kdm_cues JSON DEFAULT '[]',
+    kdm_heuristic VARCHAR(50),
+    model VARCHAR(100),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    analyzed_by UUID,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE analysis_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    model VARCHAR(100) NOT NULL,
+    prompt_version VARCHAR(20) NOT NULL,
+    result JSON NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE TABLE response_rollups (
+    experiment_id UUID REFERENCES experiments(id),
+    scenario_id UUID REFERENCES scenarios(id),
+    option VARCHAR(50),
+    responses BIGINT NOT NULL DEFAULT 0,
+    confidence_n BIGINT NOT NULL DEFAULT 0,
+    confidence_sum BIGINT NOT NULL DEFAULT 0,
+    confidence_sumsq BIGINT NOT NULL DEFAULT 0,
+    risk_n BIGINT NOT NULL DEFAULT 0,
+    risk_sum BIGINT NOT NULL DEFAULT 0,
+    risk_sumsq BIGINT NOT NULL DEFAULT 0,
+    response_time_n BIGINT NOT NULL DEFAULT 0,
+    response_time_sum BIGINT NOT NULL DEFAULT 0,
+    response_time_sumsq DOUBLE PRECISION NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (experiment_id, scenario_id, option)
+);
+
+CREATE TABLE response_time_rollups (
+    experiment_id UUID REFERENCES experiments(id),
+    scenario_id UUID REFERENCES scenarios(id),
+    bucket INTEGER,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (experiment_id, scenario_id, bucket)
 );
 
 -- Create indexes
 CREATE INDEX idx_sessions_experiment ON sessions(experiment_id);
 CREATE INDEX idx_responses_session ON scenario_responses(session_id);
 CREATE INDEX idx_responses_scenario ON scenario_responses(scenario_id);
+CREATE INDEX idx_responses_recorded_at_id ON scenario_responses(recorded_at, id);
+CREATE INDEX idx_responses_recorded_xid_id ON scenario_responses(recorded_xid, id);
+CREATE INDEX idx_scenarios_created_at_id ON scenarios(created_at, id);
+CREATE INDEX idx_scenarios_search_vector ON scenarios USING GIN (search_vector);
+CREATE INDEX idx_scenarios_meta_data ON scenarios USING GIN (meta_data jsonb_path_ops);
+CREATE UNIQUE INDEX uq_scenarios_import_key_active ON scenarios(import_key) WHERE is_active;
+CREATE INDEX idx_users_created_at_id ON users(created_at, id);
 
@@ -0,0 +1,21 @@
+from logging.config import fileConfig
+from alembic import context
+from app.core.database import Base, engine
+from app.models import scenario, session, user, job, rollup  # noqa: F401 - registers every table on Base
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_online():
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    # Revisions inspect the live schema to skip what create_all already built
+    raise SystemExit("Migrations must run against a database; --sql is not supported")
+run_migrations_online()
@@ -0,0 +1,17 @@
+"""Baseline: the schema of init.sql and create_all before migrations existed
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    pass
+
+def downgrade():
+    pass
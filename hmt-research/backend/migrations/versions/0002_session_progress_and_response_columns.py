@@ -0,0 +1,119 @@
+"""Columns and constraints added to existing tables since the baseline
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Each step is skipped when its table doesn't exist yet (create_all builds
+it complete) or when create_all already added the column or constraint,
+so this is safe on databases created at any point since the baseline:
+the session step cursor, idempotency keys, the change-feed watermark,
+import keys, rule-based enrichment and client-side timing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+def _has_table(table):
+    return sa.inspect(op.get_bind()).has_table(table)
+
+def _add_column(table, column):
+    """Add a column unless the table is missing or has it; True if it was added"""
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table(table) or column.name in {c["name"] for c in inspector.get_columns(table)}:
+        return False
+    op.add_column(table, column)
+    return True
+
+def _drop_column(table, name):
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table(table) and name in {c["name"] for c in inspector.get_columns(table)}:
+        op.drop_column(table, name)
+
+def _has_constraint(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return name in {c["name"] for c in inspector.get_unique_constraints(table)}
+
+def upgrade():
+    if not _has_table("scenario_responses"):
+        return
+    
+    # Concurrent submits before the cursor existed could record a step
+    # twice; renumber those sessions in submit order so the step
+    # constraint can be added and the count below matches the steps.
+    if not _has_constraint("scenario_responses", "uq_responses_session_step"):
+        op.execute("""
+            UPDATE scenario_responses r SET step_number = numbered.step
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY session_id ORDER BY step_number, responded_at, id
+                ) AS step
+                FROM scenario_responses
+                WHERE session_id IN (
+                    SELECT session_id FROM scenario_responses
+                    GROUP BY session_id, step_number HAVING count(*) > 1
+                )
+            ) numbered
+            WHERE r.id = numbered.id AND r.step_number <> numbered.step
+        """)
+        op.create_unique_constraint("uq_responses_session_step", "scenario_responses", ["session_id", "step_number"])
+    
+    if _add_column("sessions", sa.Column("current_step", sa.Integer(), nullable=False, server_default="0")):
+        op.execute("""
+            UPDATE sessions SET current_step = counts.responses
+            FROM (
+                SELECT session_id, count(*) AS responses FROM scenario_responses GROUP BY session_id
+            ) counts
+            WHERE counts.session_id = sessions.id
+        """)
+    
+    _add_column("scenario_responses", sa.Column("idempotency_key", sa.String(64)))
+    if not _has_constraint("scenario_responses", "uq_responses_session_idempotency_key"):
+        op.create_unique_constraint(
+            "uq_responses_session_idempotency_key", "scenario_responses", ["session_id", "idempotency_key"]
+        )
+    
+    if _add_column("scenario_responses", sa.Column("recorded_at", sa.DateTime())):
+        op.execute("UPDATE scenario_responses SET recorded_at = coalesce(responded_at, presented_at, now())")
+        op.alter_column("scenario_responses", "recorded_at", nullable=False, server_default=sa.func.now())
+    op.execute("CREATE INDEX IF NOT EXISTS idx_responses_recorded_at_id ON scenario_responses (recorded_at, id)")
+    
+    _add_column("scenario_responses", sa.Column("client_response_time_ms", sa.Integer()))
+    
+    _add_column("scenarios", sa.Column("import_key", sa.String(64)))
+    _add_column("scenarios", sa.Column("content_hash", sa.String(64)))
+    # Only the active version of a re-imported scenario holds its key
+    if _has_constraint("scenarios", "scenarios_import_key_key"):
+        op.drop_constraint("scenarios_import_key_key", "scenarios", type_="unique")
+    op.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_scenarios_import_key_active ON scenarios (import_key) WHERE is_active")
+    
+    _add_column("thematic_analyses", sa.Column("cta_phase", sa.String(50)))
+    _add_column("thematic_analyses", sa.Column("kdm_cues", sa.JSON(), server_default="[]"))
+    _add_column("thematic_analyses", sa.Column("kdm_heuristic", sa.String(50)))
+    
+    _add_column("export_jobs", sa.Column("format", sa.String(10), nullable=False, server_default="jsonl"))
+    _add_column("import_jobs", sa.Column("items_unchanged", sa.Integer(), nullable=False, server_default="0"))
+
+def downgrade():
+    if not _has_table("scenario_responses"):
+        return
+    _drop_column("import_jobs", "items_unchanged")
+    _drop_column("export_jobs", "format")
+    _drop_column("thematic_analyses", "kdm_heuristic")
+    _drop_column("thematic_analyses", "kdm_cues")
+    _drop_column("thematic_analyses", "cta_phase")
+    op.execute("DROP INDEX IF EXISTS uq_scenarios_import_key_active")
+    _drop_column("scenarios", "content_hash")
+    _drop_column("scenarios", "import_key")
+    _drop_column("scenario_responses", "client_response_time_ms")
+    op.execute("DROP INDEX IF EXISTS idx_responses_recorded_at_id")
+    _drop_column("scenario_responses", "recorded_at")
+    # Dropping the column drops its unique constraint with it
+    _drop_column("scenario_responses", "idempotency_key")
+    _drop_column("sessions", "current_step")
+    if _has_constraint("scenario_responses", "uq_responses_session_step"):
+        op.drop_constraint("uq_responses_session_step", "scenario_responses", type_="unique")
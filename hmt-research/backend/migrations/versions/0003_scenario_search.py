@@ -0,0 +1,45 @@
+"""Scenario search: JSONB meta_data, generated search_vector and GIN indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+Databases built by create_all before this have meta_data as json, which
+has no containment operators or GIN support; init.sql always used jsonb.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+SEARCH_DOCUMENT = (
+    "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '') || ' ' || "
+    "coalesce(context, '') || ' ' || coalesce(decision_point, ''))"
+)
+
+def _columns(table):
+    return {c["name"]: c for c in sa.inspect(op.get_bind()).get_columns(table)}
+
+def upgrade():
+    if not sa.inspect(op.get_bind()).has_table("scenarios"):
+        return
+    columns = _columns("scenarios")
+    
+    if not isinstance(columns["meta_data"]["type"], JSONB):
+        op.execute("ALTER TABLE scenarios ALTER COLUMN meta_data TYPE jsonb USING meta_data::jsonb")
+    
+    # Stored, so Postgres keeps it current on every insert and update without a trigger
+    if "search_vector" not in columns:
+        op.execute(f"ALTER TABLE scenarios ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ({SEARCH_DOCUMENT}) STORED")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_scenarios_search_vector ON scenarios USING GIN (search_vector)")
+    op.execute("CREATE INDEX IF NOT EXISTS idx_scenarios_meta_data ON scenarios USING GIN (meta_data jsonb_path_ops)")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_scenarios_meta_data")
+    op.execute("DROP INDEX IF EXISTS idx_scenarios_search_vector")
+    op.execute("ALTER TABLE IF EXISTS scenarios DROP COLUMN IF EXISTS search_vector")
+    # meta_data stays jsonb: init.sql databases always had it, and json gains nothing
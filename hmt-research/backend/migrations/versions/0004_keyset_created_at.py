@@ -0,0 +1,37 @@
+"""Keyset pagination on scenarios and users: NOT NULL created_at and its indexes
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+A NULL created_at can't be encoded into a cursor, and the row-value
+comparison that resumes a page never matches it. Rows missing it get
+the migration time, which keeps them last in the listing, as Postgres
+already sorted NULLs.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = {"scenarios": "idx_scenarios_created_at_id", "users": "idx_users_created_at_id"}
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, index in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        op.execute(f"UPDATE {table} SET created_at = now() WHERE created_at IS NULL")
+        op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=False)
+        op.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} (created_at, id)")
+
+def downgrade():
+    inspector = sa.inspect(op.get_bind())
+    for table, index in TABLES.items():
+        if not inspector.has_table(table):
+            continue
+        op.execute(f"DROP INDEX IF EXISTS {index}")
+        op.alter_column(table, "created_at", existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,35 @@
+"""Change feed watermark: the id of the transaction that recorded each response
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+recorded_at is the app server's clock at INSERT time, so a transaction
+that committed late could land below a watermark already handed out.
+Existing rows are backfilled from their xmin; they are all committed,
+so any value below the running transactions serves.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("scenario_responses"):
+        return
+    if "recorded_xid" not in {c["name"] for c in inspector.get_columns("scenario_responses")}:
+        op.add_column("scenario_responses", sa.Column("recorded_xid", sa.BigInteger()))
+        op.execute("UPDATE scenario_responses SET recorded_xid = xmin::text::bigint")
+        op.alter_column(
+            "scenario_responses", "recorded_xid",
+            nullable=False, server_default=sa.text("pg_current_xact_id()::text::bigint")
+        )
+    op.execute("CREATE INDEX IF NOT EXISTS idx_responses_recorded_xid_id ON scenario_responses (recorded_xid, id)")
+
+def downgrade():
+    op.execute("DROP INDEX IF EXISTS idx_responses_recorded_xid_id")
+    op.execute("ALTER TABLE IF EXISTS scenario_responses DROP COLUMN IF EXISTS recorded_xid")
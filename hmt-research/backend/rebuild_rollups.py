@@ -0,0 +1,33 @@
+"""Rebuild the response rollup tables from stored responses.
+
+Needed once after deploying the rollups (to backfill responses recorded
+before them) and after any manual edit to scenario_responses. Submits
+block until the rebuild commits, so run it off-peak on large studies.
+
+    python rebuild_rollups.py                      # every experiment
+    python rebuild_rollups.py --experiment <uuid>  # one experiment
+"""
+import argparse
+import time
+import uuid
+from app.core.database import engine, SessionLocal
+from app.models import rollup
+from app.services.rollups import rebuild_rollups
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--experiment", type=uuid.UUID, default=None,
+                        help="Only rebuild this experiment (default: all)")
+    args = parser.parse_args()
+
+    rollup.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        started = time.perf_counter()
+        written = rebuild_rollups(db, args.experiment)
+        print(f"Wrote {written} rollup rows in {(time.perf_counter() - started):.1f}s")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from app.services.kdma_enrichment import KdmaEnricher, kdma_enricher
+
+def test_fields_match_independently():
+    assert kdma_enricher.enrich("I will trust the AI") == {
+        "cta_phase": "decision",
+        "kdm_cues": ["ai_recommendation"],
+        "kdm_heuristic": "trust_automation",
+    }
+
+def test_matching_ignores_case_and_curly_apostrophes():
+    enrichment = kdma_enricher.enrich("PHISHING email. I’ll Isolate the host")
+    assert enrichment["kdm_cues"] == ["phishing"]
+    assert enrichment["cta_phase"] == "decision"
+    assert enrichment["kdm_heuristic"] == "containment_first"
+
+def test_non_ascii_case_folding_does_not_raise():
+    # "ſ" and "İ" match "s" and "i" case-insensitively but don't lowercase to them
+    assert kdma_enricher.enrich("ſuspicious email")["kdm_cues"] == []
+    assert kdma_enricher.enrich("İsolate the host")["kdm_heuristic"] is None
+    assert kdma_enricher.enrich("İsolate the host, it's ſpreading; the ai")["kdm_cues"] == ["ai_recommendation"]
+
+def test_ties_go_to_first_mention():
+    enricher = KdmaEnricher(phases={"a": ("alpha",), "b": ("beta",)}, cues={}, heuristics={})
+    assert enricher.enrich("beta alpha")["cta_phase"] == "b"
+    assert enricher.enrich("beta alpha alpha")["cta_phase"] == "a"
+
+def test_batch_matches_single():
+    transcripts = ["the ai is right", None, "", "the ai is right"]
+    assert kdma_enricher.enrich_batch(transcripts) == [kdma_enricher.enrich(t) for t in transcripts]
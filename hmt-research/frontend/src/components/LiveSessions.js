@@ -0,0 +1,116 @@
+import React, { useState, useEffect } from 'react';
+import {
+  Table, TableBody, TableCell, TableContainer, TableHead, TableRow,
+  Typography, LinearProgress, Chip, Box
+} from '@mui/material';
+import { sessionAPI } from '../services/api';
+
+// Fold one pushed event into the sessions being watched, keyed by session id
+const applyEvent = (sessions, event) => {
+  if (event.type === 'snapshot') {
+    return Object.fromEntries(event.sessions.map((session) => [session.session_id, session]));
+  }
+  const session = sessions[event.session_id] || {
+    session_id: event.session_id,
+    experiment_id: event.experiment_id,
+    status: 'active',
+    step_number: 0,
+    total_steps: null,
+  };
+  switch (event.type) {
+    case 'session_started':
+      return {
+        ...sessions,
+        [event.session_id]: { ...session, participant_id: event.participant_id, operator_id: event.operator_id },
+      };
+    case 'step_advanced':
+      return { ...sessions, [event.session_id]: { ...session, total_steps: event.total_steps, title: event.title } };
+    case 'response_submitted':
+      return {
+        ...sessions,
+        [event.session_id]: {
+          ...session,
+          step_number: event.step_number,
+          total_steps: event.total_steps,
+          last_option: event.selected_option || 'custom',
+          last_response_time_ms: event.response_time_ms,
+        },
+      };
+    case 'session_ended':
+      return { ...sessions, [event.session_id]: { ...session, status: 'completed' } };
+    default:
+      return sessions;
+  }
+};
+
+function LiveSessions({ sessionId, experimentId }) {
+  const [sessions, setSessions] = useState({});
+
+  useEffect(() => {
+    setSessions({});
+    return sessionAPI.watch(
+      { session_id: sessionId, experiment_id: experimentId },
+      (event) => setSessions((current) => applyEvent(current, event))
+    );
+  }, [sessionId, experimentId]);
+
+  const rows = Object.values(sessions);
+  if (!rows.length) {
+    return (
+      <Typography variant="body2" color="text.secondary">
+        No active sessions
+      </Typography>
+    );
+  }
+
+  return (
+    <TableContainer>
+      <Table size="small">
+        <TableHead>
+          <TableRow>
+            <TableCell>Participant</TableCell>
+            <TableCell>Operator</TableCell>
+            <TableCell>Progress</TableCell>
+            <TableCell>Current Scenario</TableCell>
+            <TableCell>Last Choice</TableCell>
+            <TableCell>Status</TableCell>
+          </TableRow>
+        </TableHead>
+        <TableBody>
+          {rows.map((session) => (
+            <TableRow key={session.session_id}>
+              <TableCell>{session.participant_id || session.session_id.slice(0, 8)}</TableCell>
+              <TableCell>{session.operator_id}</TableCell>
+              <TableCell sx={{ minWidth: 160 }}>
+                <Box sx={{ display: 'flex', alignItems: 'center' }}>
+                  <LinearProgress
+                    variant="determinate"
+                    value={session.total_steps ? (session.step_number / session.total_steps) * 100 : 0}
+                    sx={{ flexGrow: 1, mr: 1 }}
+                  />
+                  <Typography variant="body2">
+                    {session.step_number} / {session.total_steps ?? '?'}
+                  </Typography>
+                </Box>
+              </TableCell>
+              <TableCell>{session.title}</TableCell>
+              <TableCell>
+                {session.last_option}
+                {session.last_response_time_ms != null && ` (${(session.last_response_time_ms / 1000).toFixed(1)}s)`}
+              </TableCell>
+              <TableCell>
+                <Chip
+                  label={session.status}
+                  size="small"
+                  color={session.status === 'completed' ? 'success' : 'primary'}
+                />
+              </TableCell>
+            </TableRow>
+          ))}
+        </TableBody>
+      </Table>
+    </TableContainer>
+  );
+}
+
+export default LiveSessions;
@@ -1,179 +1,189 @@
-import React, { useState, useEffect } from 'react';
-import {
-  Container, Typography, Paper, Table, TableBody, TableCell,
-  TableContainer, TableHead, TableRow, IconButton, Chip,
-  Button, Dialog, DialogTitle, DialogContent, DialogActions,
-  TextField, Select, MenuItem, FormControl, InputLabel, Box
-} from '@mui/material';
-import {
-  Block, CheckCircle, Delete, Add
-} from '@mui/icons-material';
-import axios from 'axios';
-
-function Users() {
-  const [users, setUsers] = useState([]);
-  const [openDialog, setOpenDialog] = useState(false);
-  const [newUser, setNewUser] = useState({
-    email: '',
-    password: '',
-    full_name: '',
-    role: 'user'
-  });
-
-  useEffect(() => {
-    loadUsers();
-  }, []);
-
-  const loadUsers = async () => {
-    try {
-      const response = await axios.get('http://localhost:8000/api/v1/auth/users');
-      setUsers(response.data);
-    } catch (error) {
-      console.error('Error loading users:', error);
-    }
-  };
-
-  const handleCreateUser = async () => {
-    try {
-      await axios.post('http://localhost:8000/api/v1/auth/register', newUser);
-      setOpenDialog(false);
-      setNewUser({ email: '', password: '', full_name: '', role: 'user' });
-      loadUsers();
-    } catch (error) {
-      alert('Error creating user');
-    }
-  };
-
-  const toggleUserActive = async (userId) => {
-    try {
-      await axios.put(`http://localhost:8000/api/v1/auth/users/${userId}/toggle-active`);
-      loadUsers();
-    } catch (error) {
-      alert('Error toggling user status');
-    }
-  };
-
-  const deleteUser = async (userId) => {
-    if (window.confirm('Are you sure you want to delete this user?')) {
-      try {
-        await axios.delete(`http://localhost:8000/api/v1/auth/users/${userId}`);
-        loadUsers();
-      } catch (error) {
-        alert('Error deleting user');
-      }
-    }
-  };
-
-  return (
-    <Container maxWidth="lg">
-      <Box sx={{ mb: 4, display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
-        <Typography variant="h4">User Management</Typography>
-        <Button
-          variant="contained"
-          startIcon={<Add />}
-          onClick={() => setOpenDialog(true)}
-        >
-          Add User
-        </Button>
-      </Box>
-
-      <TableContainer component={Paper}>
-        <Table>
-          <TableHead>
-            <TableRow>
-              <TableCell>Name</TableCell>
-              <TableCell>Email</TableCell>
-              <TableCell>Role</TableCell>
-              <TableCell>Status</TableCell>
-              <TableCell>Created</TableCell>
-              <TableCell align="right">Actions</TableCell>
-            </TableRow>
-          </TableHead>
-          <TableBody>
-            {users.map((user) => (
-              <TableRow key={user.id}>
-                <TableCell>{user.full_name}</TableCell>
-                <TableCell>{user.email}</TableCell>
-                <TableCell>
-                  <Chip
-                    label={user.role}
-                    color={user.role === 'admin' ? 'primary' : 'default'}
-                    size="small"
-                  />
-                </TableCell>
-                <TableCell>
-                  <Chip
-                    label={user.is_active ? 'Active' : 'Disabled'}
-                    color={user.is_active ? 'success' : 'error'}
-                    size="small"
-                  />
-                </TableCell>
-                <TableCell>{new Date(user.created_at).toLocaleDateString()}</TableCell>
-                <TableCell align="right">
-                  <IconButton
-                    onClick={() => toggleUserActive(user.id)}
-                    color={user.is_active ? 'error' : 'success'}
-                  >
-                    {user.is_active ? <Block /> : <CheckCircle />}
-                  </IconButton>
-                  <IconButton
-                    onClick={() => deleteUser(user.id)}
-                    color="error"
-                  >
-                    <Delete />
-                  </IconButton>
-                </TableCell>
-              </TableRow>
-            ))}
-          </TableBody>
-        </Table>
-      </TableContainer>
-
-      <Dialog open={openDialog} onClose={() => setOpenDialog(false)} maxWidth="sm" fullWidth>
-        <DialogTitle>Create New User</DialogTitle>
-        <DialogContent>
-          <TextField
-            fullWidth
-            label="Full Name"
-            value={newUser.full_name}
-            onChange={(e) => setNewUser({ ...newUser, full_name: e.target.value })}
-            margin="normal"
-          />
-          <TextField
-            fullWidth
-            label="Email"
-            type="email"
-            value={newUser.email}
-            onChange={(e) => setNewUser({ ...newUser, email: e.target.value })}
-            margin="normal"
-          />
-          <TextField
-            fullWidth
-            label="Password"
-            type="password"
-            value={newUser.password}
-            onChange={(e) => setNewUser({ ...newUser, password: e.target.value })}
-            margin="normal"
-          />
-          <FormControl fullWidth margin="normal">
-            <InputLabel>Role</InputLabel>
-            <Select
-              value={newUser.role}
-              label="Role"
-              onChange={(e) => setNewUser({ ...newUser, role: e.target.value })}
-            >
-              <MenuItem value="user">User</MenuItem>
-              <MenuItem value="admin">Admin</MenuItem>
-            </Select>
-          </FormControl>
-        </DialogContent>
-        <DialogActions>
-          <Button onClick={() => setOpenDialog(false)}>Cancel</Button>
-          <Button onClick={handleCreateUser} variant="contained">Create</Button>
-        </DialogActions>
-      </Dialog>
-    </Container>
-  );
-}
-
-export default Users;
+import React, { useState, useEffect } from 'react';
+import {
+  Container, Typography, Paper, Table, TableBody, TableCell,
+  TableContainer, TableHead, TableRow, IconButton, Chip,
+  Button, Dialog, DialogTitle, DialogContent, DialogActions,
+  TextField, Select, MenuItem, FormControl, InputLabel, Box
+} from '@mui/material';
+import {
+  Block, CheckCircle, Delete, Add
+} from '@mui/icons-material';
+import axios from 'axios';
+
+function Users() {
+  const [users, setUsers] = useState([]);
+  const [openDialog, setOpenDialog] = useState(false);
+  const [newUser, setNewUser] = useState({
+    email: '',
+    password: '',
+    full_name: '',
+    role: 'user'
+  });
+
+  useEffect(() => {
+    loadUsers();
+  }, []);
+
+  const loadUsers = async () => {
+    try {
+      // Follow the keyset cursor across pages, skipping the preferences column
+      const params = { fields: 'id,email,full_name,role,is_active,created_at', limit: 1000 };
+      const allUsers = [];
+      let cursor = null;
+      do {
+        const response = await axios.get('http://localhost:8000/api/v1/auth/users', {
+          params: { ...params, ...(cursor && { cursor }) },
+        });
+        allUsers.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+      } while (cursor);
+      setUsers(allUsers);
+    } catch (error) {
+      console.error('Error loading users:', error);
+    }
+  };
+
+  const handleCreateUser = async () => {
+    try {
+      await axios.post('http://localhost:8000/api/v1/auth/register', newUser);
+      setOpenDialog(false);
+      setNewUser({ email: '', password: '', full_name: '', role: 'user' });
+      loadUsers();
+    } catch (error) {
+      alert('Error creating user');
+    }
+  };
+
+  const toggleUserActive = async (userId) => {
+    try {
+      await axios.put(`http://localhost:8000/api/v1/auth/users/${userId}/toggle-active`);
+      loadUsers();
+    } catch (error) {
+      alert('Error toggling user status');
+    }
+  };
+
+  const deleteUser = async (userId) => {
+    if (window.confirm('Are you sure you want to delete this user?')) {
+      try {
+        await axios.delete(`http://localhost:8000/api/v1/auth/users/${userId}`);
+        loadUsers();
+      } catch (error) {
+        alert('Error deleting user');
+      }
+    }
+  };
+
+  return (
+    <Container maxWidth="lg">
+      <Box sx={{ mb: 4, display: 'flex', justifyContent: 'space-between', alignItems: 'center' }}>
+        <Typography variant="h4">User Management</Typography>
+        <Button
+          variant="contained"
+          startIcon={<Add />}
+          onClick={() => setOpenDialog(true)}
+        >
+          Add User
+        </Button>
+      </Box>
+
+      <TableContainer component={Paper}>
+        <Table>
+          <TableHead>
+            <TableRow>
+              <TableCell>Name</TableCell>
+              <TableCell>Email</TableCell>
+              <TableCell>Role</TableCell>
+              <TableCell>Status</TableCell>
+              <TableCell>Created</TableCell>
+              <TableCell align="right">Actions</TableCell>
+            </TableRow>
+          </TableHead>
+          <TableBody>
+            {users.map((user) => (
+              <TableRow key={user.id}>
+                <TableCell>{user.full_name}</TableCell>
+                <TableCell>{user.email}</TableCell>
+                <TableCell>
+                  <Chip
+                    label={user.role}
+                    color={user.role === 'admin' ? 'primary' : 'default'}
+                    size="small"
+                  />
+                </TableCell>
+                <TableCell>
+                  <Chip
+                    label={user.is_active ? 'Active' : 'Disabled'}
+                    color={user.is_active ? 'success' : 'error'}
+                    size="small"
+                  />
+                </TableCell>
+                <TableCell>{new Date(user.created_at).toLocaleDateString()}</TableCell>
+                <TableCell align="right">
+                  <IconButton
+                    onClick={() => toggleUserActive(user.id)}
+                    color={user.is_active ? 'error' : 'success'}
+                  >
+                    {user.is_active ? <Block /> : <CheckCircle />}
+                  </IconButton>
+                  <IconButton
+                    onClick={() => deleteUser(user.id)}
+                    color="error"
+                  >
+                    <Delete />
+                  </IconButton>
+                </TableCell>
+              </TableRow>
+            ))}
+          </TableBody>
+        </Table>
+      </TableContainer>
+
+      <Dialog open={openDialog} onClose={() => setOpenDialog(false)} maxWidth="sm" fullWidth>
+        <DialogTitle>Create New User</DialogTitle>
+        <DialogContent>
+          <TextField
+            fullWidth
+            label="Full Name"
+            value={newUser.full_name}
+            onChange={(e) => setNewUser({ ...newUser, full_name: e.target.value })}
+            margin="normal"
+          />
+          <TextField
+            fullWidth
+            label="Email"
+            type="email"
+            value={newUser.email}
+            onChange={(e) => setNewUser({ ...newUser, email: e.target.value })}
+            margin="normal"
+          />
+          <TextField
+            fullWidth
+            label="Password"
+            type="password"
+            value={newUser.password}
+            onChange={(e) => setNewUser({ ...newUser, password: e.target.value })}
+            margin="normal"
+          />
+          <FormControl fullWidth margin="normal">
+            <InputLabel>Role</InputLabel>
+            <Select
+              value={newUser.role}
+              label="Role"
+              onChange={(e) => setNewUser({ ...newUser, role: e.target.value })}
+            >
+              <MenuItem value="user">User</MenuItem>
+              <MenuItem value="admin">Admin</MenuItem>
+            </Select>
+          </FormControl>
+        </DialogContent>
+        <DialogActions>
+          <Button onClick={() => setOpenDialog(false)}>Cancel</Button>
+          <Button onClick={handleCreateUser} variant="contained">Create</Button>
+        </DialogActions>
+      </Dialog>
+    </Container>
+  );
+}
+
+export default Users;
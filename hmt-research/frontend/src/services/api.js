@@ -1,46 +1,91 @@
-import axios from 'axios';
-
-const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
-
-const api = axios.create({
-  baseURL: API_URL,
-  headers: {
-    'Content-Type': 'application/json',
-  },
-});
-
-// Token will be set by AuthContext after login
-
-export const scenarioAPI = {
-  list: () => api.get('/api/v1/scenarios/'),
-  get: (id) => api.get(`/api/v1/scenarios/${id}`),
-  create: (data) => api.post('/api/v1/scenarios/', data),
-  update: (id, data) => api.put(`/api/v1/scenarios/${id}`, data),
-  delete: (id) => api.delete(`/api/v1/scenarios/${id}`),
-  import: (file) => {
-    const formData = new FormData();
-    formData.append('file', file);
-    return api.post('/api/v1/scenarios/import', formData, {
-      headers: { 'Content-Type': 'multipart/form-data' },
-    });
-  },
-};
-
-export const experimentAPI = {
-  create: (data) => api.post('/api/v1/sessions/experiments', data),
-};
-
-export const sessionAPI = {
-  create: (data) => api.post('/api/v1/sessions/', data),
-  getNextScenario: (sessionId) => api.get(`/api/v1/sessions/${sessionId}/next-scenario`),
-  submitResponse: (sessionId, scenarioId, data) => 
-    api.post(`/api/v1/sessions/${sessionId}/responses`, data, {
-      params: { scenario_id: scenarioId }
-    }),
-  exportJSONL: (sessionId) => 
-    api.get(`/api/v1/sessions/${sessionId}/export/jsonl`, {
-      responseType: 'blob'
-    }),
-};
-
-export default api;
+import axios from 'axios';
+
+const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+const api = axios.create({
+  baseURL: API_URL,
+  headers: {
+    'Content-Type': 'application/json',
+  },
+});
+
+// Token will be set by AuthContext after login
+
+// Live session events over a WebSocket, reconnecting until the returned
+// function is called. Browsers can't send headers here, so the token goes
+// in the query string.
+const watchSessions = (params, onEvent) => {
+  let socket = null;
+  let retry = null;
+  let stopped = false;
+  const connect = () => {
+    const query = new URLSearchParams({ token: localStorage.getItem('token') || '' });
+    Object.entries(params).forEach(([key, value]) => value && query.append(key, value));
+    socket = new WebSocket(`${API_URL.replace(/^http/, 'ws')}/api/v1/sessions/live?${query}`);
+    socket.onmessage = (message) => onEvent(JSON.parse(message.data));
+    socket.onclose = () => {
+      if (!stopped) retry = setTimeout(connect, 3000);
+    };
+  };
+  connect();
+  return () => {
+    stopped = true;
+    clearTimeout(retry);
+    socket.close();
+  };
+};
+
+// Follow X-Next-Cursor across keyset pages of a list endpoint
+export const fetchAllPages = async (url, params = {}) => {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await api.get(url, { params: { ...params, ...(cursor && { cursor }) } });
+    items.push(...response.data);
+    cursor = response.headers['x-next-cursor'];
+  } while (cursor);
+  return { data: items };
+};
+
+export const scenarioAPI = {
+  list: (fields, filters = {}) => fetchAllPages('/api/v1/scenarios/', fields ? { ...filters, fields, limit: 1000 } : filters),
+  facets: (filters = {}) => api.get('/api/v1/scenarios/facets', { params: filters }),
+  get: (id) => api.get(`/api/v1/scenarios/${id}`),
+  create: (data) => api.post('/api/v1/scenarios/', data),
+  update: (id, data) => api.put(`/api/v1/scenarios/${id}`, data),
+  delete: (id) => api.delete(`/api/v1/scenarios/${id}`),
+  import: (file) => {
+    const formData = new FormData();
+    formData.append('file', file);
+    return api.post('/api/v1/scenarios/import', formData, {
+      headers: { 'Content-Type': 'multipart/form-data' },
+    });
+  },
+  getImportJob: (jobId) => api.get(`/api/v1/scenarios/import/${jobId}`),
+  cancelImportJob: (jobId) => api.post(`/api/v1/scenarios/import/${jobId}/cancel`),
+};
+
+export const experimentAPI = {
+  create: (data) => api.post('/api/v1/sessions/experiments', data),
+  getBundle: (experimentId) => api.get(`/api/v1/sessions/experiments/${experimentId}/bundle`),
+};
+
+export const sessionAPI = {
+  create: (data) => api.post('/api/v1/sessions/', data),
+  getNextScenario: (sessionId) => api.get(`/api/v1/sessions/${sessionId}/next-scenario`),
+  markPresented: (sessionId, stepNumber) =>
+    api.post(`/api/v1/sessions/${sessionId}/steps/${stepNumber}/presented`),
+  submitResponse: (sessionId, scenarioId, data) => 
+    api.post(`/api/v1/sessions/${sessionId}/responses`, data, {
+      params: { scenario_id: scenarioId }
+    }),
+  submitResponses: (sessionId, responses) =>
+    api.post(`/api/v1/sessions/${sessionId}/responses/batch`, { responses }),
+  watch: watchSessions,
+  exportJSONL: (sessionId) => 
+    api.get(`/api/v1/sessions/${sessionId}/export/jsonl`, {
+      responseType: 'blob'
+    }),
+};
+
+export default api;